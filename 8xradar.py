@@ -4,13 +4,24 @@
 Real-time Cell Tower, WiFi, Bluetooth, GPS monitoring
 """
 
-import subprocess
-import json
 import os
+import sys
 import time
 import threading
-from datetime import datetime
-from collections import deque
+from datetime import datetime, timedelta
+
+import bands
+import broker
+import classifier
+import collector
+import coverage
+import export
+import handover
+import operators
+import recording
+import screen
+import session_store
+import snapshot
 
 # ============== SIMPLE COLORS (Termux Compatible) ==============
 class C:
@@ -26,71 +37,13 @@ class C:
     E = '\033[0m'    # End/Reset
 
 # ============== GLOBAL DATA ==============
-DATA = {
-    'cell': [], 'wifi': [], 'bluetooth': [],
-    'gps': None, 'sim1': None, 'sim2': None,
-    'history': deque(maxlen=20),
-    'start_time': datetime.now()
-}
-
-# ============== INDIA OPERATORS (Complete) ==============
-OPERATORS = {
-    # Airtel
-    (404, 2): "Airtel", (404, 3): "Airtel", (404, 10): "Airtel",
-    (404, 31): "Airtel", (404, 40): "Airtel", (404, 45): "Airtel",
-    (404, 49): "Airtel", (404, 70): "Airtel", (404, 90): "Airtel",
-    (404, 92): "Airtel", (404, 93): "Airtel", (404, 94): "Airtel",
-    (404, 95): "Airtel", (404, 96): "Airtel", (404, 97): "Airtel",
-    (404, 98): "Airtel",
-    # Vi (Vodafone Idea)
-    (404, 4): "Vi", (404, 5): "Vi", (404, 11): "Vi", (404, 12): "Vi",
-    (404, 13): "Vi", (404, 14): "Vi", (404, 15): "Vi", (404, 16): "Vi",
-    (404, 17): "Vi", (404, 18): "Vi", (404, 19): "Vi", (404, 20): "Vi",
-    (404, 21): "Vi", (404, 22): "Vi", (404, 24): "Vi", (404, 25): "Vi",
-    (404, 27): "Vi", (404, 28): "Vi", (404, 30): "Vi", (404, 43): "Vi",
-    (404, 46): "Vi", (404, 56): "Vi", (404, 60): "Vi", (404, 78): "Vi",
-    (404, 82): "Vi", (404, 84): "Vi", (404, 86): "Vi", (404, 87): "Vi",
-    (404, 88): "Vi", (404, 89): "Vi",
-    # Jio
-    (405, 840): "Jio", (405, 854): "Jio", (405, 855): "Jio",
-    (405, 856): "Jio", (405, 857): "Jio", (405, 858): "Jio",
-    (405, 859): "Jio", (405, 860): "Jio", (405, 861): "Jio",
-    (405, 862): "Jio", (405, 863): "Jio", (405, 864): "Jio",
-    (405, 865): "Jio", (405, 866): "Jio", (405, 867): "Jio",
-    (405, 868): "Jio", (405, 869): "Jio", (405, 870): "Jio",
-    (405, 871): "Jio", (405, 872): "Jio", (405, 873): "Jio",
-    (405, 874): "Jio",
-    # BSNL
-    (404, 34): "BSNL", (404, 36): "BSNL", (404, 38): "BSNL",
-    (404, 51): "BSNL", (404, 52): "BSNL", (404, 53): "BSNL",
-    (404, 54): "BSNL", (404, 55): "BSNL", (404, 57): "BSNL",
-    (404, 58): "BSNL", (404, 59): "BSNL", (404, 62): "BSNL",
-    (404, 64): "BSNL", (404, 66): "BSNL", (404, 71): "BSNL",
-    (404, 72): "BSNL", (404, 73): "BSNL", (404, 74): "BSNL",
-    (404, 75): "BSNL", (404, 76): "BSNL", (404, 77): "BSNL",
-    (404, 79): "BSNL", (404, 80): "BSNL", (404, 81): "BSNL",
-    # MTNL
-    (404, 68): "MTNL", (404, 69): "MTNL",
-}
-
-# ============== LTE BANDS ==============
-def get_band_name(band_num):
-    bands = {
-        1: "B1 (2100 MHz)",
-        3: "B3 (1800 MHz)", 
-        5: "B5 (850 MHz)",
-        8: "B8 (900 MHz)",
-        40: "B40 (2300 MHz TDD)",
-        41: "B41 (2500 MHz TDD)",
-    }
-    return bands.get(band_num, f"B{band_num}")
-
-def cmd(c):
-    try:
-        r = subprocess.run(c, shell=True, capture_output=True, text=True, timeout=30)
-        return r.stdout.strip()
-    except:
-        return ""
+# Scanners publish, the render loop reads STORE.get() (see snapshot.py)
+STORE = snapshot.SnapshotStore(
+    cell=[], wifi=[], bluetooth=[], neighbors=[],
+    gps=None, sim1=None, sim2=None,
+    handovers=[], handover_summary='', coverage_summary='',
+    start_time=datetime.now(),
+)
 
 def clear():
     os.system('clear')
@@ -148,16 +101,25 @@ def calc_distance(ta, rsrp=None):
     
     return "Unknown"
 
+# Every scan cycle is also recorded to SQLite (session_store.DB_PATH) and
+# streamed to rotating export files (export.EXPORT_DIR)
+SESSION = session_store.SessionStore('8xradar')
+EXPORT = export.Exporter('8xradar')
+# --record: dashboard snapshots for later playback (--play FILE)
+RECORDER = recording.Recorder('8xradar')
+# Serving-cell changes per SIM (python handover.py replays a whole session)
+TIMELINE = handover.Timeline()
+# Signal per operator / band on a 100 m grid (python coverage.py rebuilds it from the DB)
+COVERAGE = coverage.Heatmap()
+
 # ============== SCANNERS ==============
-def scan_cell():
+def scan_cell(out=None):
     """Scan cell towers - handles dual SIM"""
-    out = cmd("termux-telephony-cellinfo")
-    if not out:
+    cells = broker.cell_info(out)
+    if not cells:
         return
     
     try:
-        cells = json.loads(out)
-        DATA['cell'] = cells
         
         # Separate by SIM (registered cells)
         sim1_cells = []
@@ -175,48 +137,60 @@ def scan_cell():
             else:
                 neighbors.append(cell)
         
-        DATA['sim1'] = sim1_cells[0] if sim1_cells else None
-        DATA['sim2'] = sim2_cells[0] if sim2_cells else None
-        DATA['neighbors'] = neighbors
+        SESSION.observe('cell', cells)
+        EXPORT.observe('cell', cells)
+        gps = STORE.get().get('gps')
+        position = session_store.fix_position(gps) if gps else None
+        events = TIMELINE.observe(cells, position=position)
+        COVERAGE.observe(cells, position)
+        if events:
+            SESSION.observe('handover', events)
+            EXPORT.observe('handover', events)
+        latest = {'handovers': TIMELINE.recent(3)} if events else {}
+        STORE.publish(cell=cells,
+                      sim1=sim1_cells[0] if sim1_cells else None,
+                      sim2=sim2_cells[0] if sim2_cells else None,
+                      neighbors=neighbors,
+                      handover_summary=TIMELINE.summary_line(),
+                      coverage_summary=COVERAGE.summary_line(),
+                      **latest)
         
     except Exception as e:
         pass
 
-def scan_wifi():
+def scan_wifi(out=None):
     """Scan WiFi networks"""
-    out = cmd("termux-wifi-scaninfo")
-    if out and out != "[]":
-        try:
-            DATA['wifi'] = json.loads(out)
-        except:
-            DATA['wifi'] = []
+    networks = broker.wifi_scan(out)
+    if networks:
+        SESSION.observe('wifi', networks)
+        EXPORT.observe('wifi', networks)
+        STORE.publish(wifi=networks)
 
-def scan_bluetooth():
+def scan_bluetooth(out=None):
     """Scan Bluetooth devices"""
-    out = cmd("termux-bluetooth-scaninfo")
-    if out and out != "[]":
-        try:
-            DATA['bluetooth'] = json.loads(out)
-        except:
-            DATA['bluetooth'] = []
+    devices = broker.bluetooth_scan(out)
+    if devices:
+        SESSION.observe('bluetooth', devices)
+        EXPORT.observe('bluetooth', devices)
+        STORE.publish(bluetooth=devices)
 
-def scan_gps():
+def scan_gps(out=None):
     """Get GPS location"""
-    out = cmd("termux-location -p gps")
-    if out:
-        try:
-            DATA['gps'] = json.loads(out)
-        except:
-            pass
+    fix = broker.location('gps', out=out)
+    if fix:
+        SESSION.observe('gps', fix)
+        EXPORT.observe('gps', fix)
+        STORE.publish(gps=fix)
 
 
 # ============== DISPLAY FUNCTIONS (Simple ASCII) ==============
-def render_header():
-    now = datetime.now().strftime("%H:%M:%S")
-    uptime = datetime.now() - DATA['start_time']
+def render_header(snap, out=print):
+    clock = recording.clock(snap)
+    now = clock.strftime("%H:%M:%S")
+    uptime = max(clock - snap['start_time'], timedelta(0))
     uptime_str = str(uptime).split('.')[0]
     
-    print(f"""
+    out(f"""
 {C.C}+===========================================================+
 |                    8xRADAR v2.0                           |
 |              Signal Intelligence Toolkit                  |
@@ -225,20 +199,25 @@ def render_header():
 +===========================================================+{C.E}
 """)
 
-def render_sim_card(sim_num, cell):
+def render_sim_card(sim_num, cell, out=print):
     """Render single SIM card details"""
     if not cell:
-        print(f"  {C.DIM}SIM {sim_num}: Not detected{C.E}")
+        out(f"  {C.DIM}SIM {sim_num}: Not detected{C.E}")
         return
     
     mcc = cell.get('mcc', 0)
     mnc = cell.get('mnc', 0)
-    operator = OPERATORS.get((mcc, mnc), f"Unknown ({mcc}/{mnc})")
-    
-    # Get band from bands array
-    bands = cell.get('bands', [])
-    band_num = bands[0] if bands else None
-    band_name = get_band_name(band_num) if band_num else "Unknown"
+    operator = operators.name(mcc, mnc, f"Unknown ({mcc}/{mnc})")
+    
+    # Exact channel from the EARFCN, else the first entry of the bands array
+    ch = bands.channel(cell)
+    band_nums = cell.get('bands', [])
+    if ch:
+        band_name = ch['label']
+    elif band_nums:
+        band_name = bands.lte_band(band_nums[0])
+    else:
+        band_name = "Unknown"
     
     rsrp = cell.get('rsrp')
     rsrq = cell.get('rsrq')
@@ -268,7 +247,7 @@ def render_sim_card(sim_num, cell):
     else:
         op_color = C.W
     
-    print(f"""
+    out(f"""
   {C.G}[SIM {sim_num}] {op_color}{C.BOLD}{operator}{C.E}
   +-------------------------------------------------------+
   | Network: 4G LTE                                       |
@@ -286,42 +265,56 @@ def render_sim_card(sim_num, cell):
   | TA:      {ta if ta is not None else 'N/A':<10} Distance: {C.Y}{distance}{C.E:<30}|
   +-------------------------------------------------------+""")
 
-def render_cell_section():
+def render_cell_section(snap, out=print):
     """Render cell tower section with dual SIM support"""
-    print(f"\n{C.M}[CELL TOWERS]{C.E}")
-    print(f"  Total towers detected: {len(DATA.get('cell', []))}")
+    out(f"\n{C.M}[CELL TOWERS]{C.E}")
+    out(f"  Total towers detected: {len(snap.get('cell', []))}")
     
     # SIM 1
-    render_sim_card(1, DATA.get('sim1'))
+    render_sim_card(1, snap.get('sim1'), out)
     
     # SIM 2
-    render_sim_card(2, DATA.get('sim2'))
+    render_sim_card(2, snap.get('sim2'), out)
+    
+    # Serving-cell changes
+    if snap.get('handover_summary'):
+        out(f"\n  {C.BOLD}Handovers:{C.E} {snap['handover_summary']}")
+        for ev in snap.get('handovers', []):
+            when = datetime.fromtimestamp(ev['ts']).strftime('%H:%M:%S')
+            before = f"{ev['before']:.0f}" if ev['before'] is not None else '?'
+            after = f"{ev['after']:.0f}" if ev['after'] is not None else '?'
+            mark = f" {C.R}PING-PONG{C.E}" if ev['ping_pong'] else ""
+            out(f"    {when} SIM{ev['sim']} {ev['from']} -> {ev['to']} ({ev['kind']}) "
+                f"after {handover.format_dwell(ev['dwell'])}  {before}->{after}dBm{mark}")
+    if snap.get('coverage_summary'):
+        out(f"  {C.DIM}Coverage: {snap['coverage_summary']}{C.E}")
     
     # Neighbors summary
-    neighbors = DATA.get('neighbors', [])
+    neighbors = snap.get('neighbors', [])
     if neighbors:
-        print(f"\n  {C.DIM}Neighbor Cells: {len(neighbors)}{C.E}")
-        for i, n in enumerate(neighbors[:5]):
+        out(f"\n  {C.DIM}Neighbor Cells: {len(neighbors)}{C.E}")
+        shown = neighbors[:5]
+        for i, (n, ch) in enumerate(zip(shown, bands.resolve_all(shown))):
             rsrp = n.get('rsrp', 'N/A')
             pci = n.get('pci', '?')
-            bands = n.get('bands', [])
-            band = bands[0] if bands else '?'
-            print(f"    [{i+1}] PCI:{pci} Band:B{band} RSRP:{rsrp}dBm")
+            band_nums = n.get('bands', [])
+            band = ch['name'] if ch else f"B{band_nums[0]}" if band_nums else '?'
+            out(f"    [{i+1}] PCI:{pci} Band:{band} RSRP:{rsrp}dBm")
 
-def render_wifi_section():
+def render_wifi_section(snap, out=print):
     """Render WiFi section"""
-    wifi = DATA.get('wifi', [])
+    wifi = snap.get('wifi', [])
     
-    print(f"\n{C.G}[WiFi NETWORKS]{C.E}")
+    out(f"\n{C.G}[WiFi NETWORKS]{C.E}")
     
     if not wifi:
-        print(f"  {C.Y}No WiFi data - Grant location permission to Termux:API{C.E}")
-        print(f"  {C.DIM}Settings > Apps > Termux:API > Permissions > Location{C.E}")
+        out(f"  {C.Y}No WiFi data - Grant location permission to Termux:API{C.E}")
+        out(f"  {C.DIM}Settings > Apps > Termux:API > Permissions > Location{C.E}")
         return
     
-    print(f"  Found: {len(wifi)} networks\n")
-    print(f"  {'SSID':<25} {'Signal':<15} {'Ch':>3} {'Security'}")
-    print(f"  {'-'*25} {'-'*15} {'-'*3} {'-'*15}")
+    out(f"  Found: {len(wifi)} networks\n")
+    out(f"  {'SSID':<25} {'Signal':<15} {'Ch':>3} {'Security'}")
+    out(f"  {'-'*25} {'-'*15} {'-'*3} {'-'*15}")
     
     # Sort by signal strength
     wifi_sorted = sorted(wifi, key=lambda x: x.get('rssi', -100), reverse=True)
@@ -341,47 +334,40 @@ def render_wifi_section():
         else:
             sig_color = C.R
         
-        print(f"  {ssid:<25} {sig_color}{rssi:>4}dBm{C.E}       {ch:>3} {sec}")
+        out(f"  {ssid:<25} {sig_color}{rssi:>4}dBm{C.E}       {ch:>3} {sec}")
 
-def render_bluetooth_section():
+def render_bluetooth_section(snap, out=print):
     """Render Bluetooth section"""
-    bt = DATA.get('bluetooth', [])
+    bt = snap.get('bluetooth', [])
     
-    print(f"\n{C.B}[BLUETOOTH DEVICES]{C.E}")
+    out(f"\n{C.B}[BLUETOOTH DEVICES]{C.E}")
     
     if not bt:
-        print(f"  {C.Y}No Bluetooth devices found{C.E}")
-        print(f"  {C.DIM}Make sure Bluetooth is ON and devices are nearby{C.E}")
+        out(f"  {C.Y}No Bluetooth devices found{C.E}")
+        out(f"  {C.DIM}Make sure Bluetooth is ON and devices are nearby{C.E}")
         return
     
-    print(f"  Found: {len(bt)} devices\n")
+    out(f"  Found: {len(bt)} devices\n")
     
     for dev in bt[:6]:
         name = dev.get('name', 'Unknown')[:30]
         rssi = dev.get('rssi', 'N/A')
         mac = dev.get('address', '?')
         
-        # Device type icon (simple)
-        n = name.lower()
-        if any(x in n for x in ['airpod', 'buds', 'earphone', 'headphone']):
-            icon = "[Audio]"
-        elif any(x in n for x in ['band', 'watch', 'fit']):
-            icon = "[Watch]"
-        elif any(x in n for x in ['phone', 'iphone', 'samsung']):
-            icon = "[Phone]"
-        else:
-            icon = "[Device]"
+        # Device type tag (ASCII, no emoji)
+        kind = classifier.classify(mac, dev.get('name') or '')[1]
+        icon = f"[{kind}]" if kind != 'Unknown' else "[Device]"
         
-        print(f"  {icon} {name:<25} {rssi}dBm")
+        out(f"  {icon} {name:<25} {rssi}dBm")
 
-def render_gps_section():
+def render_gps_section(snap, out=print):
     """Render GPS section"""
-    gps = DATA.get('gps')
+    gps = snap.get('gps')
     
-    print(f"\n{C.Y}[GPS LOCATION]{C.E}")
+    out(f"\n{C.Y}[GPS LOCATION]{C.E}")
     
     if not gps:
-        print(f"  {C.DIM}Getting GPS fix...{C.E}")
+        out(f"  {C.DIM}Getting GPS fix...{C.E}")
         return
     
     lat = gps.get('latitude', 0)
@@ -389,37 +375,55 @@ def render_gps_section():
     alt = gps.get('altitude', 0)
     acc = gps.get('accuracy', 0)
     
-    print(f"  Latitude:  {lat:.6f}")
-    print(f"  Longitude: {lon:.6f}")
-    print(f"  Altitude:  {alt:.1f}m")
-    print(f"  Accuracy:  +/-{acc:.1f}m")
+    out(f"  Latitude:  {lat:.6f}")
+    out(f"  Longitude: {lon:.6f}")
+    out(f"  Altitude:  {alt:.1f}m")
+    out(f"  Accuracy:  +/-{acc:.1f}m")
 
 
 # ============== MAIN ==============
+# Target interval per source (seconds); the scheduler backs off when idle
+SCAN_TARGETS = {'cell': 3, 'wifi': 6, 'bluetooth': 6, 'gps': 5}
+COLLECTOR = collector.Collector()
+
 def background_scanner():
-    """Background scanning"""
-    while True:
-        try:
-            scan_cell()
-            scan_wifi()
-            scan_bluetooth()
-            if int(time.time()) % 5 == 0:
-                scan_gps()
-            time.sleep(3)
-        except:
-            time.sleep(3)
+    """Background scanning (adaptive per-source schedule)"""
+    COLLECTOR.add('cell', collector.source('cell'), scan_cell, SCAN_TARGETS['cell'], deadline=15)
+    COLLECTOR.add('wifi', collector.source('wifi'), scan_wifi, SCAN_TARGETS['wifi'], deadline=15)
+    COLLECTOR.add('bluetooth', collector.source('bluetooth'), scan_bluetooth,
+                  SCAN_TARGETS['bluetooth'], deadline=15)
+    COLLECTOR.add('gps', collector.location_source('gps'), scan_gps, SCAN_TARGETS['gps'], deadline=35)
+    COLLECTOR.run()
+
+SCREEN = screen.Screen()
 
 def render_dashboard():
-    """Render full dashboard"""
-    clear()
-    render_header()
-    render_cell_section()
-    render_wifi_section()
-    render_bluetooth_section()
-    render_gps_section()
-    print(f"\n{C.DIM}  Auto-refresh every 3 seconds...{C.E}")
+    """Render full dashboard from one consistent snapshot (changed lines only)"""
+    snap = STORE.get()
+    frame = SCREEN.frame()
+    out = frame.print
+    render_header(snap, out)
+    render_cell_section(snap, out)
+    render_wifi_section(snap, out)
+    render_bluetooth_section(snap, out)
+    render_gps_section(snap, out)
+    if snap.get('playback'):
+        out(f"\n{C.DIM}  Playback {snap['playback']}  {recording.KEYS_HELP}{C.E}")
+    else:
+        out(f"\n{C.DIM}  Live - redraws on new data...  {COLLECTOR.summary()}  {SESSION.summary()}  {EXPORT.summary()}  {RECORDER.summary()}{C.E}")
+    SCREEN.draw(frame)
+
+def render_clock():
+    """Cheap tick: redraw only the header (clock / uptime)"""
+    frame = SCREEN.frame()
+    render_header(STORE.get(), frame.print)
+    SCREEN.patch(frame)
 
 def main():
+    replay = recording.playback_args(sys.argv[1:])
+    if replay:
+        recording.play(replay[0], STORE, SCREEN, render_dashboard, replay[1], replay[2])
+        return
     clear()
     print(f"""
 {C.C}
@@ -440,6 +444,16 @@ def main():
 {C.E}""")
     
     print(f"  {C.Y}Initializing...{C.E}")
+    SESSION.start()
+    if SESSION.error:
+        print(f"  {C.R}Session DB unavailable ({SESSION.error}) - not recording{C.E}")
+    EXPORT.start()
+    if EXPORT.error:
+        print(f"  {C.R}Export unavailable ({EXPORT.error}) - not exporting{C.E}")
+    if '--record' in sys.argv:
+        RECORDER.start(STORE)
+        if RECORDER.error:
+            print(f"  {C.R}Recording unavailable ({RECORDER.error}){C.E}")
     
     # Initial scans
     print(f"  {C.DIM}[1/4] Scanning Cell Towers...{C.E}")
@@ -463,40 +477,46 @@ def main():
     
     # Main loop
     try:
-        while True:
-            render_dashboard()
-            time.sleep(3)
+        screen.run(SCREEN, STORE, render_dashboard, tick=render_clock)
     except KeyboardInterrupt:
-        clear()
+        SCREEN.leave()
+        SESSION.close()
+        EXPORT.close()
+        RECORDER.close()
+        coverage_path = save_coverage()
+        snap = STORE.export()
         print(f"""
 {C.G}
 +===========================================================+
 |                   8xRadar Stopped                         |
 +===========================================================+
 |  Session Summary:                                         |
-|    Cell Towers: {len(DATA.get('cell', [])):>3}                                      |
-|    WiFi Networks: {len(DATA.get('wifi', [])):>3}                                    |
-|    Bluetooth: {len(DATA.get('bluetooth', [])):>3}                                       |
+|    Cell Towers: {len(snap.get('cell', [])):>3}                                      |
+|    WiFi Networks: {len(snap.get('wifi', [])):>3}                                    |
+|    Bluetooth: {len(snap.get('bluetooth', [])):>3}                                       |
 +===========================================================+
 {C.E}""")
         
-        # Export option
-        try:
-            export = input(f"  {C.Y}Export data? (y/n): {C.E}").strip().lower()
-            if export == 'y':
-                filename = f"8xradar_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                with open(filename, 'w') as f:
-                    json.dump({
-                        'cell': DATA.get('cell', []),
-                        'wifi': DATA.get('wifi', []),
-                        'bluetooth': DATA.get('bluetooth', []),
-                        'gps': DATA.get('gps'),
-                    }, f, indent=2)
-                print(f"  {C.G}Saved: {filename}{C.E}")
-        except:
-            pass
+        # Everything was streamed while running
+        for path in EXPORT.files + ([RECORDER.path] if RECORDER.frames else []) + \
+                ([coverage_path] if coverage_path else []):
+            print(f"  {C.G}Saved: {path}{C.E}")
         
         print(f"\n  {C.G}Goodbye!{C.E}\n")
 
+def save_coverage():
+    """Coverage bins to the export directory (mergeable: python coverage.py a.csv b.csv)"""
+    if not len(COVERAGE):
+        return None
+    path = os.path.join(export.EXPORT_DIR,
+                        f"coverage_8xradar_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    try:
+        os.makedirs(export.EXPORT_DIR, exist_ok=True)
+        COVERAGE.to_csv(path)
+    except OSError as e:
+        print(f"  {C.R}Coverage not saved: {e}{C.E}")
+        return None
+    return path
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+📈 ANALYTICS - Batch signal analytics over columns of cell samples
+Quality scores, path-loss distances, per-cell stats and rolling windows;
+NumPy when installed, array('d') fallback otherwise
+
+  python analytics.py [radar_sessions.db] [--session N] [--since MINUTES]
+"""
+
+import bisect
+import math
+import sqlite3
+import sys
+import time
+from array import array
+from collections import deque
+
+import bands
+import session_store
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NAN = float('nan')
+
+# ============== SCORING TABLES ==============
+# (threshold, points): a value strictly above the threshold earns the points.
+# Shared with cell_intelligence.signal_quality so scalar and batch agree.
+RSRP_STEPS = ((-110, 10), (-100, 20), (-90, 30), (-80, 40))
+RSRQ_STEPS = ((-20, 10), (-15, 20), (-10, 30))
+SINR_STEPS = ((0, 10), (10, 20), (20, 30))
+LABELS = ((80, 'Excellent'), (60, 'Good'), (40, 'Fair'), (20, 'Poor'), (0, 'Very Poor'))
+
+TX_POWER = 43          # dBm, macro cell (path-loss estimate)
+MIN_RSRP_DIST = -40    # stronger than this: too close to estimate
+PERCENTILES = (10, 50, 90)
+
+
+def _table(steps):
+    return [t for t, _ in steps], [0] + [p for _, p in steps]
+
+
+_TABLES = [_table(s) for s in (RSRP_STEPS, RSRQ_STEPS, SINR_STEPS)]
+_LABEL_CUTS = [c for c, _ in reversed(LABELS)]
+_LABEL_NAMES = [n for _, n in reversed(LABELS)]
+
+
+# ============== COLUMNS ==============
+def column(values):
+    """Float column from any iterable; None / missing -> NaN"""
+    values = [NAN if v is None else v for v in values]
+    if np is not None:
+        return np.asarray(values, dtype=float)
+    return array('d', values)
+
+
+def columns(cells):
+    """rsrp / rsrq / sinr / freq columns from raw Termux or parsed cell records"""
+    rsrp, rsrq, sinr, freq = [], [], [], []
+    for c in cells:
+        rsrp.append(c.get('rsrp') or c.get('ssRsrp') or c.get('ss_rsrp'))
+        rsrq.append(c.get('rsrq') or c.get('ssRsrq') or c.get('ss_rsrq'))
+        sinr.append(c.get('rssnr') or c.get('sinr') or c.get('ssSinr') or c.get('ss_sinr'))
+        ch = c.get('frequency') or (bands.channel(c) or {}).get('dl')
+        freq.append(ch)
+    return {'rsrp': column(rsrp), 'rsrq': column(rsrq), 'sinr': column(sinr),
+            'freq': column(freq)}
+
+
+# ============== SCORES ==============
+def score(rsrp=None, rsrq=None, sinr=None):
+    """0-100 quality score of one sample (missing metrics earn nothing)"""
+    total = 0
+    for value, (cuts, points) in zip((rsrp, rsrq, sinr), _TABLES):
+        if value:
+            total += points[bisect.bisect_left(cuts, value)]
+    return total
+
+
+def label(value):
+    """'Excellent' / 'Good' / 'Fair' / 'Poor' / 'Very Poor' for a score"""
+    return _LABEL_NAMES[bisect.bisect_right(_LABEL_CUTS, value) - 1]
+
+
+def scores(rsrp, rsrq, sinr):
+    """Quality score of every sample"""
+    if np is not None:
+        total = np.zeros(len(rsrp))
+        for col, (cuts, points) in zip((rsrp, rsrq, sinr), _TABLES):
+            col = np.asarray(col, dtype=float)
+            earned = np.asarray(points)[np.searchsorted(cuts, col, side='left')]
+            # NaN (missing) and 0 (Android's "unknown") earn nothing, as in score()
+            total += np.where(np.isnan(col) | (col == 0), 0, earned)
+        return total
+    out = array('d', bytes(8 * len(rsrp)))
+    for col, (cuts, points) in zip((rsrp, rsrq, sinr), _TABLES):
+        find = bisect.bisect_left
+        for i, v in enumerate(col):
+            if v == v and v:
+                out[i] += points[find(cuts, v)]
+    return out
+
+
+def labels(values):
+    """Label of every score"""
+    if np is not None:
+        return [_LABEL_NAMES[i] for i in np.searchsorted(_LABEL_CUTS, values, side='right') - 1]
+    return [label(v) for v in values]
+
+
+def distances(rsrp, freq_mhz=1800):
+    """Free-space path-loss distance (m) per sample; NaN where not estimable.
+    freq_mhz is one frequency or a column (NaN -> 1800 MHz)"""
+    if np is not None:
+        rsrp = np.asarray(rsrp, dtype=float)
+        freq = np.broadcast_to(np.asarray(freq_mhz, dtype=float), rsrp.shape)
+        freq = np.where(np.isnan(freq) | (freq <= 0), 1800.0, freq)
+        d = 10 ** ((TX_POWER - rsrp - 20 * np.log10(freq) - 32.44) / 20) * 1000
+        return np.where(np.isnan(rsrp) | (rsrp > MIN_RSRP_DIST), np.nan, d)
+    if isinstance(freq_mhz, (int, float)):
+        freq_mhz = [freq_mhz] * len(rsrp)
+    out = array('d')
+    log10 = math.log10
+    for r, f in zip(rsrp, freq_mhz):
+        if r != r or r > MIN_RSRP_DIST:
+            out.append(NAN)
+            continue
+        if not f == f or f <= 0:
+            f = 1800.0
+        out.append(10 ** ((TX_POWER - r - 20 * log10(f) - 32.44) / 20) * 1000)
+    return out
+
+
+# ============== STATISTICS ==============
+def _percentile(ordered, q):
+    """Linear interpolation between closest ranks (NumPy's default)"""
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summary(values):
+    """{n, mean, min, max, p10, p50, p90} of a column, NaN ignored (None if empty)"""
+    if np is not None:
+        col = np.asarray(values, dtype=float)
+        col = col[~np.isnan(col)]
+        if not len(col):
+            return None
+        stats = {'n': int(len(col)), 'mean': float(col.mean()),
+                 'min': float(col.min()), 'max': float(col.max())}
+        for q, v in zip(PERCENTILES, np.percentile(col, PERCENTILES)):
+            stats[f'p{q}'] = float(v)
+        return stats
+    ordered = sorted(v for v in values if v == v)
+    if not ordered:
+        return None
+    stats = {'n': len(ordered), 'mean': math.fsum(ordered) / len(ordered),
+             'min': ordered[0], 'max': ordered[-1]}
+    for q in PERCENTILES:
+        stats[f'p{q}'] = _percentile(ordered, q)
+    return stats
+
+
+def _codes(keys):
+    """Dense integer code per key (first-seen order) and the distinct keys"""
+    index = {}
+    codes = [index.setdefault(k, len(index)) for k in keys]
+    return codes, list(index)
+
+
+def by_key(keys, values):
+    """summary() per key (e.g. per cell), keys aligned with values"""
+    codes, uniq = _codes(keys)
+    if np is not None:
+        codes = np.asarray(codes)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.cumsum(np.bincount(codes, minlength=len(uniq)))[:-1]
+        groups = zip(uniq, np.split(np.asarray(values, dtype=float)[order], bounds))
+    else:
+        grouped = [array('d') for _ in uniq]
+        for c, v in zip(codes, values):
+            grouped[c].append(v)
+        groups = zip(uniq, grouped)
+    result = {}
+    for k, g in groups:
+        stats = summary(g)
+        if stats:
+            result[k] = stats
+    return result
+
+
+def rolling(ts, values, window):
+    """Trailing time-window (seconds) mean / min / max at every sample.
+    ts must be ascending; NaN samples are skipped. Returns (mean, min, max)."""
+    n = len(values)
+    if np is not None:
+        ts = np.asarray(ts, dtype=float)
+        vals = np.asarray(values, dtype=float)
+        ok = ~np.isnan(vals)
+        csum = np.concatenate(([0.0], np.cumsum(np.where(ok, vals, 0.0))))
+        ccnt = np.concatenate(([0], np.cumsum(ok)))
+        start = np.searchsorted(ts, ts - window, side='right')
+        end = np.arange(1, n + 1)
+        count = ccnt[end] - ccnt[start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (csum[end] - csum[start]) / count
+        empty = count == 0
+        lo = _range_reduce(np.minimum, np.where(ok, vals, np.inf), start, end)
+        hi = _range_reduce(np.maximum, np.where(ok, vals, -np.inf), start, end)
+        return mean, np.where(empty, np.nan, lo), np.where(empty, np.nan, hi)
+    mean, lo, hi = array('d'), array('d'), array('d')
+    total = 0.0
+    count = 0
+    left = 0
+    for i in range(n):
+        v = values[i]
+        if v == v:
+            total += v
+            count += 1
+        while ts[left] <= ts[i] - window:
+            u = values[left]
+            if u == u:
+                total -= u
+                count -= 1
+            left += 1
+        mean.append(total / count if count else NAN)
+    lo, hi = _window_extremes(ts, values, window)
+    return mean, array('d', lo), array('d', hi)
+
+
+def _range_reduce(op, vals, start, end):
+    """op (np.minimum / np.maximum) over every vals[start:end] at once:
+    sparse table of power-of-two blocks, two overlapping lookups per range"""
+    length = np.maximum(end - start, 1)
+    level = np.floor(np.log2(length)).astype(int)
+    result = np.empty(len(start))
+    table = vals
+    span = 1
+    for k in range(int(level.max()) + 1 if len(level) else 0):
+        hit = level == k
+        if hit.any():
+            s, e = start[hit], end[hit]
+            result[hit] = op(table[np.minimum(s, len(table) - 1)], table[np.maximum(e - span, 0)])
+        if span * 2 > len(vals):
+            break
+        table = op(table[:-span], table[span:])
+        span *= 2
+    return result
+
+
+def _window_extremes(ts, values, window):
+    """Sliding-window min / max with monotonic deques, O(n) overall"""
+    lo, hi = [], []
+    dmin, dmax = deque(), deque()   # indexes, values increasing / decreasing
+    for i, v in enumerate(values):
+        if v == v:
+            while dmin and values[dmin[-1]] >= v:
+                dmin.pop()
+            dmin.append(i)
+            while dmax and values[dmax[-1]] <= v:
+                dmax.pop()
+            dmax.append(i)
+        cutoff = ts[i] - window
+        while dmin and ts[dmin[0]] <= cutoff:
+            dmin.popleft()
+        while dmax and ts[dmax[0]] <= cutoff:
+            dmax.popleft()
+        lo.append(values[dmin[0]] if dmin else NAN)
+        hi.append(values[dmax[0]] if dmax else NAN)
+    return lo, hi
+
+
+# ============== SESSION DATABASE ==============
+def load(conn, since=None, session=None):
+    """Cell sample columns from a session database (session_store.connect()):
+    {'key', 'ts', 'rsrp', 'rsrq', 'sinr', 'freq'}, oldest first"""
+    sql = ("SELECT e.key, o.ts, o.level, "
+           "COALESCE(json_extract(o.data, '$.rsrq'), json_extract(o.data, '$.ssRsrq'), "
+           "json_extract(o.data, '$.ss_rsrq')), "
+           "COALESCE(json_extract(o.data, '$.rssnr'), json_extract(o.data, '$.sinr'), "
+           "json_extract(o.data, '$.ssSinr'), json_extract(o.data, '$.ss_sinr')), "
+           "json_extract(o.data, '$.earfcn'), json_extract(o.data, '$.nrarfcn') "
+           "FROM observations o JOIN entities e ON e.id = o.entity WHERE e.kind = 'cell'")
+    args = []
+    if since is not None:
+        sql += " AND o.ts >= ?"
+        args.append(since)
+    if session is not None:
+        sql += " AND o.session = ?"
+        args.append(session)
+    rows = conn.execute(sql + " ORDER BY o.ts", args).fetchall()
+    freqs = {}   # one band lookup per distinct channel
+    freq = []
+    for row in rows:
+        ch = (row[5], row[6])
+        if ch not in freqs:
+            hit = bands.lte(ch[0]) if ch[0] is not None else bands.nr(ch[1])
+            freqs[ch] = hit['dl'] if hit else None
+        freq.append(freqs[ch])
+    return {'key': [r[0] for r in rows], 'ts': column(r[1] for r in rows),
+            'rsrp': column(r[2] for r in rows), 'rsrq': column(r[3] for r in rows),
+            'sinr': column(r[4] for r in rows), 'freq': column(freq)}
+
+
+def report(cols):
+    """Per-cell summary rows: {key: {samples, rsrp stats, quality, distance}}"""
+    q = scores(cols['rsrp'], cols['rsrq'], cols['sinr'])
+    d = distances(cols['rsrp'], cols['freq'])
+    rsrp = by_key(cols['key'], cols['rsrp'])
+    quality = by_key(cols['key'], q)
+    dist = by_key(cols['key'], d)
+    return {k: {'rsrp': s, 'quality': quality.get(k), 'distance': dist.get(k)}
+            for k, s in rsrp.items()}
+
+
+# ============== CLI ==============
+def main():
+    args = sys.argv[1:]
+    opts = {}
+    for flag in ('--session', '--since'):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i:i + 2]
+    path = args[0] if args else session_store.DB_PATH
+    since = time.time() - float(opts['--since']) * 60 if '--since' in opts else None
+    session = int(opts['--session']) if '--session' in opts else None
+    try:
+        conn = session_store.connect(path)
+    except sqlite3.Error as e:
+        print(f"  Cannot open {path}: {e}")
+        return
+    started = time.perf_counter()
+    cols = load(conn, since, session)
+    loaded = time.perf_counter()
+    rows = report(cols)
+    done = time.perf_counter()
+    print(f"  {len(cols['key']):,} cell samples, {len(rows)} cells "
+          f"(load {(loaded - started) * 1000:.0f} ms, analyse {(done - loaded) * 1000:.0f} ms, "
+          f"{'numpy' if np is not None else 'array'})")
+    print(f"  {'Cell':<28} {'n':>6} {'RSRP mean':>9} {'p10':>6} {'p50':>6} {'p90':>6} "
+          f"{'min':>5} {'max':>5} {'Quality':>9} {'Dist':>7}")
+    for key, r in sorted(rows.items(), key=lambda kv: -kv[1]['rsrp']['n']):
+        s, qs, ds = r['rsrp'], r['quality'], r['distance']
+        dist = f"{ds['p50'] / 1000:.1f}km" if ds else '?'
+        print(f"  {key[:28]:<28} {s['n']:>6} {s['mean']:>9.1f} {s['p10']:>6.0f} {s['p50']:>6.0f} "
+              f"{s['p90']:>6.0f} {s['min']:>5.0f} {s['max']:>5.0f} "
+              f"{label(qs['mean']) if qs else '?':>9} {dist:>7}")
+
+
+if __name__ == "__main__":
+    main()
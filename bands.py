@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+📡 BANDS - EARFCN / NR-ARFCN to band resolver for every 3GPP LTE and NR band
+Tables are compiled once into sorted interval indexes and looked up by bisect
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+from types import MappingProxyType
+
+# ============== LTE (TS 36.101 Table 5.7.3-1) ==============
+# band, F_DL_low MHz, N_Offs-DL, N_DL max, F_UL_low MHz, N_Offs-UL, duplex
+# F_DL = F_DL_low + 0.1 * (N_DL - N_Offs-DL); TDD bands share one raster
+LTE = (
+    (1, 2110, 0, 599, 1920, 18000, 'FDD'),
+    (2, 1930, 600, 1199, 1850, 18600, 'FDD'),
+    (3, 1805, 1200, 1949, 1710, 19200, 'FDD'),
+    (4, 2110, 1950, 2399, 1710, 19950, 'FDD'),
+    (5, 869, 2400, 2649, 824, 20400, 'FDD'),
+    (6, 875, 2650, 2749, 830, 20650, 'FDD'),
+    (7, 2620, 2750, 3449, 2500, 20750, 'FDD'),
+    (8, 925, 3450, 3799, 880, 21450, 'FDD'),
+    (9, 1844.9, 3800, 4149, 1749.9, 21800, 'FDD'),
+    (10, 2110, 4150, 4749, 1710, 22150, 'FDD'),
+    (11, 1475.9, 4750, 4949, 1427.9, 22750, 'FDD'),
+    (12, 729, 5010, 5179, 699, 23010, 'FDD'),
+    (13, 746, 5180, 5279, 777, 23180, 'FDD'),
+    (14, 758, 5280, 5379, 788, 23280, 'FDD'),
+    (17, 734, 5730, 5849, 704, 23730, 'FDD'),
+    (18, 860, 5850, 5999, 815, 23850, 'FDD'),
+    (19, 875, 6000, 6149, 830, 24000, 'FDD'),
+    (20, 791, 6150, 6449, 832, 24150, 'FDD'),
+    (21, 1495.9, 6450, 6599, 1447.9, 24450, 'FDD'),
+    (22, 3510, 6600, 7399, 3410, 24600, 'FDD'),
+    (23, 2180, 7500, 7699, 2000, 25500, 'FDD'),
+    (24, 1525, 7700, 8039, 1626.5, 25700, 'FDD'),
+    (25, 1930, 8040, 8689, 1850, 26040, 'FDD'),
+    (26, 859, 8690, 9039, 814, 26690, 'FDD'),
+    (27, 852, 9040, 9209, 807, 27040, 'FDD'),
+    (28, 758, 9210, 9659, 703, 27210, 'FDD'),
+    (29, 717, 9660, 9769, None, None, 'SDL'),
+    (30, 2350, 9770, 9869, 2305, 27660, 'FDD'),
+    (31, 462.5, 9870, 9919, 452.5, 27760, 'FDD'),
+    (32, 1452, 9920, 10359, None, None, 'SDL'),
+    (33, 1900, 36000, 36199, 1900, 36000, 'TDD'),
+    (34, 2010, 36200, 36349, 2010, 36200, 'TDD'),
+    (35, 1850, 36350, 36949, 1850, 36350, 'TDD'),
+    (36, 1930, 36950, 37549, 1930, 36950, 'TDD'),
+    (37, 1910, 37550, 37749, 1910, 37550, 'TDD'),
+    (38, 2570, 37750, 38249, 2570, 37750, 'TDD'),
+    (39, 1880, 38250, 38649, 1880, 38250, 'TDD'),
+    (40, 2300, 38650, 39649, 2300, 38650, 'TDD'),
+    (41, 2496, 39650, 41589, 2496, 39650, 'TDD'),
+    (42, 3400, 41590, 43589, 3400, 41590, 'TDD'),
+    (43, 3600, 43590, 45589, 3600, 43590, 'TDD'),
+    (44, 703, 45590, 46589, 703, 45590, 'TDD'),
+    (45, 1447, 46590, 46789, 1447, 46590, 'TDD'),
+    (46, 5150, 46790, 54539, 5150, 46790, 'TDD'),
+    (47, 5855, 54540, 55239, 5855, 54540, 'TDD'),
+    (48, 3550, 55240, 56739, 3550, 55240, 'TDD'),
+    (49, 3550, 56740, 58239, 3550, 56740, 'TDD'),
+    (50, 1432, 58240, 59089, 1432, 58240, 'TDD'),
+    (51, 1427, 59090, 59139, 1427, 59090, 'TDD'),
+    (52, 3300, 59140, 60139, 3300, 59140, 'TDD'),
+    (53, 2483.5, 60140, 60254, 2483.5, 60140, 'TDD'),
+    (65, 2110, 65536, 66435, 1920, 131072, 'FDD'),
+    (66, 2110, 66436, 67335, 1710, 131972, 'FDD'),
+    (67, 738, 67336, 67535, None, None, 'SDL'),
+    (68, 753, 67536, 67835, 698, 132672, 'FDD'),
+    (69, 2570, 67836, 68335, None, None, 'SDL'),
+    (70, 1995, 68336, 68585, 1695, 132972, 'FDD'),
+    (71, 617, 68586, 68935, 663, 133122, 'FDD'),
+    (72, 461, 68936, 68985, 451, 133472, 'FDD'),
+    (73, 460, 68986, 69035, 450, 133522, 'FDD'),
+    (74, 1475, 69036, 69465, 1427, 133572, 'FDD'),
+    (75, 1432, 69466, 70315, None, None, 'SDL'),
+    (76, 1427, 70316, 70365, None, None, 'SDL'),
+    (85, 728, 70366, 70545, 698, 134002, 'FDD'),
+    (87, 420, 70546, 70595, 410, 134182, 'FDD'),
+    (88, 422, 70596, 70645, 412, 134232, 'FDD'),
+    (103, 757, 70646, 70655, 787, 134282, 'FDD'),
+    (106, 935, 70656, 70705, 896, 134292, 'FDD'),
+)
+
+# ============== NR (TS 38.101-1 / 38.101-2 Table 5.2-1) ==============
+# band, UL low-high MHz, DL low-high MHz, duplex (SUL bands have no DL)
+NR = (
+    (1, 1920, 1980, 2110, 2170, 'FDD'),
+    (2, 1850, 1910, 1930, 1990, 'FDD'),
+    (3, 1710, 1785, 1805, 1880, 'FDD'),
+    (5, 824, 849, 869, 894, 'FDD'),
+    (7, 2500, 2570, 2620, 2690, 'FDD'),
+    (8, 880, 915, 925, 960, 'FDD'),
+    (12, 699, 716, 729, 746, 'FDD'),
+    (13, 777, 787, 746, 756, 'FDD'),
+    (14, 788, 798, 758, 768, 'FDD'),
+    (18, 815, 830, 860, 875, 'FDD'),
+    (20, 832, 862, 791, 821, 'FDD'),
+    (24, 1626.5, 1660.5, 1525, 1559, 'FDD'),
+    (25, 1850, 1915, 1930, 1995, 'FDD'),
+    (26, 814, 849, 859, 894, 'FDD'),
+    (28, 703, 748, 758, 803, 'FDD'),
+    (29, None, None, 717, 728, 'SDL'),
+    (30, 2305, 2315, 2350, 2360, 'FDD'),
+    (34, 2010, 2025, 2010, 2025, 'TDD'),
+    (38, 2570, 2620, 2570, 2620, 'TDD'),
+    (39, 1880, 1920, 1880, 1920, 'TDD'),
+    (40, 2300, 2400, 2300, 2400, 'TDD'),
+    (41, 2496, 2690, 2496, 2690, 'TDD'),
+    (46, 5150, 5925, 5150, 5925, 'TDD'),
+    (47, 5855, 5925, 5855, 5925, 'TDD'),
+    (48, 3550, 3700, 3550, 3700, 'TDD'),
+    (50, 1432, 1517, 1432, 1517, 'TDD'),
+    (51, 1427, 1432, 1427, 1432, 'TDD'),
+    (53, 2483.5, 2495, 2483.5, 2495, 'TDD'),
+    (54, 1670, 1675, 1670, 1675, 'TDD'),
+    (65, 1920, 2010, 2110, 2200, 'FDD'),
+    (66, 1710, 1780, 2110, 2200, 'FDD'),
+    (67, None, None, 738, 758, 'SDL'),
+    (70, 1695, 1710, 1995, 2020, 'FDD'),
+    (71, 663, 698, 617, 652, 'FDD'),
+    (74, 1427, 1470, 1475, 1518, 'FDD'),
+    (75, None, None, 1432, 1517, 'SDL'),
+    (76, None, None, 1427, 1432, 'SDL'),
+    (77, 3300, 4200, 3300, 4200, 'TDD'),
+    (78, 3300, 3800, 3300, 3800, 'TDD'),
+    (79, 4400, 5000, 4400, 5000, 'TDD'),
+    (80, 1710, 1785, None, None, 'SUL'),
+    (81, 880, 915, None, None, 'SUL'),
+    (82, 832, 862, None, None, 'SUL'),
+    (83, 703, 748, None, None, 'SUL'),
+    (84, 1920, 1980, None, None, 'SUL'),
+    (85, 698, 716, 728, 746, 'FDD'),
+    (86, 1710, 1780, None, None, 'SUL'),
+    (89, 824, 849, None, None, 'SUL'),
+    (90, 2496, 2690, 2496, 2690, 'TDD'),
+    (91, 832, 862, 1427, 1432, 'FDD'),
+    (92, 832, 862, 1432, 1517, 'FDD'),
+    (93, 880, 915, 1427, 1432, 'FDD'),
+    (94, 880, 915, 1432, 1517, 'FDD'),
+    (95, 2010, 2025, None, None, 'SUL'),
+    (96, 5925, 7125, 5925, 7125, 'TDD'),
+    (97, 2300, 2400, None, None, 'SUL'),
+    (98, 1880, 1920, None, None, 'SUL'),
+    (99, 1626.5, 1660.5, None, None, 'SUL'),
+    (100, 874.4, 880, 919.4, 925, 'FDD'),
+    (101, 1900, 1910, 1900, 1910, 'TDD'),
+    (102, 5925, 6425, 5925, 6425, 'TDD'),
+    (104, 6425, 7125, 6425, 7125, 'TDD'),
+    (105, 663, 703, 612, 652, 'FDD'),
+    (106, 896, 901, 935, 940, 'FDD'),
+    (109, 703, 733, 1432, 1517, 'FDD'),
+    (257, 26500, 29500, 26500, 29500, 'TDD'),
+    (258, 24250, 27500, 24250, 27500, 'TDD'),
+    (259, 39500, 43500, 39500, 43500, 'TDD'),
+    (260, 37000, 40000, 37000, 40000, 'TDD'),
+    (261, 27500, 28350, 27500, 28350, 'TDD'),
+    (262, 47200, 48200, 47200, 48200, 'TDD'),
+    (263, 57000, 71000, 57000, 71000, 'TDD'),
+)
+
+# Bands deployed in India win where NR bands overlap (n78 over n48/n77,
+# n1 over n65/n66); anything else falls back to the narrowest band
+HOME_NR_BANDS = {1, 3, 5, 8, 28, 40, 41, 77, 78, 258}
+
+# NR global frequency raster (TS 38.104 5.4.2.1), all in kHz:
+# (first N-REF, delta F_global, F_REF-Offs)
+NR_RASTER = ((0, 5, 0), (600000, 15, 3000000), (2016667, 60, 24250080))
+NR_ARFCN_MAX = 3279165
+
+
+# ============== RASTER ==============
+def nr_freq(arfcn):
+    """NR-ARFCN -> F_REF in MHz"""
+    for n_ref, step, offset in reversed(NR_RASTER):
+        if arfcn >= n_ref:
+            return (offset + step * (arfcn - n_ref)) / 1000
+    return None
+
+
+def nr_arfcn(mhz, up=False):
+    """F_REF in MHz -> nearest NR-ARFCN at or below (or above, with up=True)"""
+    khz = round(mhz * 1000)
+    for (n_ref, step, offset), nxt in zip(NR_RASTER, NR_RASTER[1:] + (None,)):
+        if nxt is None or khz < nxt[2]:
+            n, rem = divmod(khz - offset, step)
+            return n_ref + n + (1 if up and rem else 0)
+
+
+# ============== INTERVAL INDEX ==============
+class IntervalIndex:
+    """Sorted, non-overlapping segments built from possibly-overlapping ranges;
+    every segment holds its candidates best-first, found by one bisect"""
+
+    def __init__(self, ranges, rank):
+        edges = sorted({lo for lo, hi, _ in ranges} | {hi + 1 for lo, hi, _ in ranges})
+        self.starts = []
+        self.hits = []
+        for lo, nxt in zip(edges, edges[1:]):
+            inside = sorted((item for a, b, item in ranges if a <= lo and nxt - 1 <= b), key=rank)
+            if self.starts and not inside and not self.hits[-1]:
+                continue
+            self.starts.append(lo)
+            self.hits.append(tuple(inside))
+        self.starts.append(edges[-1] if edges else 0)
+        self.hits.append(())
+
+    def find(self, value):
+        """Candidates for value, best first (empty tuple when outside every range)"""
+        i = bisect_right(self.starts, value) - 1
+        return self.hits[i] if i >= 0 else ()
+
+
+def _lte_ranges():
+    ranges = []
+    for row in LTE:
+        band, f_dl, n_dl, n_max, f_ul, n_ul, duplex = row
+        ranges.append((n_dl, n_max, (row, 'DL')))
+        if duplex == 'FDD':
+            ranges.append((n_ul, n_ul + n_max - n_dl, (row, 'UL')))
+    return ranges
+
+
+def _nr_ranges():
+    ranges = []
+    for row in NR:
+        band, ul_lo, ul_hi, dl_lo, dl_hi, duplex = row
+        if dl_lo is not None:
+            ranges.append((nr_arfcn(dl_lo, up=True), nr_arfcn(dl_hi), row))
+    return ranges
+
+
+def _nr_rank(row):
+    band, ul_lo, ul_hi, dl_lo, dl_hi, duplex = row
+    return (band not in HOME_NR_BANDS, dl_hi - dl_lo, band)
+
+
+_lte_index = None
+_nr_index = None
+
+
+def _indexes():
+    global _lte_index, _nr_index
+    if _lte_index is None:
+        _nr_index = IntervalIndex(_nr_ranges(), _nr_rank)
+        _lte_index = IntervalIndex(_lte_ranges(), lambda hit: hit[0][0])
+    return _lte_index, _nr_index
+
+
+# ============== RESOLVERS ==============
+def _label(name, mhz):
+    return f"{name} ({round(mhz, 1):g} MHz)"
+
+
+@lru_cache(maxsize=4096)
+def lte(earfcn):
+    """EARFCN (DL or UL) -> {band, name, duplex, link, dl, ul, label} or None"""
+    try:
+        earfcn = int(earfcn)
+    except (TypeError, ValueError):
+        return None
+    hits = _indexes()[0].find(earfcn)
+    if not hits:
+        return None
+    (band, f_dl, n_dl, n_max, f_ul, n_ul, duplex), link = hits[0]
+    offset = earfcn - (n_dl if link == 'DL' else n_ul)
+    dl = round(f_dl + 0.1 * offset, 1)
+    ul = round(f_ul + 0.1 * offset, 1) if f_ul is not None else None
+    name = f"B{band}"
+    return MappingProxyType({
+        'rat': 'LTE', 'band': band, 'name': name, 'duplex': duplex, 'link': link,
+        'arfcn': earfcn, 'dl': dl, 'ul': ul, 'label': _label(name, dl),
+    })
+
+
+@lru_cache(maxsize=4096)
+def nr(arfcn):
+    """DL NR-ARFCN -> {band, name, duplex, dl, ul, label, alt} or None;
+    alt lists the other bands that also contain this channel"""
+    try:
+        arfcn = int(arfcn)
+    except (TypeError, ValueError):
+        return None
+    if not 0 <= arfcn <= NR_ARFCN_MAX:
+        return None
+    hits = _indexes()[1].find(arfcn)
+    if not hits:
+        return None
+    band, ul_lo, ul_hi, dl_lo, dl_hi, duplex = hits[0]
+    dl = round(nr_freq(arfcn), 3)
+    if duplex == 'TDD':
+        ul = dl
+    elif duplex == 'FDD':
+        ul = round(dl - (dl_lo - ul_lo), 3)
+    else:
+        ul = None
+    name = f"n{band}"
+    return MappingProxyType({
+        'rat': 'NR', 'band': band, 'name': name, 'duplex': duplex, 'link': 'DL',
+        'arfcn': arfcn, 'dl': dl, 'ul': ul, 'label': _label(name, dl),
+        'alt': tuple(f"n{row[0]}" for row in hits[1:]),
+    })
+
+
+def lte_band(band):
+    """Label for a bare LTE band number (e.g. CellIdentityLte.getBands())"""
+    for row in LTE:
+        if row[0] == band:
+            return f"B{band} ({row[1]:g}-{row[1] + 0.1 * (row[3] - row[2] + 1):g} MHz)"
+    return f"B{band}"
+
+
+def channel(cell):
+    """Resolve one Termux cell record by its type: LTE earfcn or NR nrarfcn"""
+    ctype = cell.get('type', '').lower()
+    if 'lte' in ctype:
+        return lte(cell.get('earfcn'))
+    if 'nr' in ctype or '5g' in ctype:
+        return nr(cell.get('nrarfcn'))
+    return None
+
+
+def resolve_all(cells):
+    """Batch resolve a serving + neighbour list; result is aligned with cells"""
+    return [channel(cell) for cell in cells]
+
+
+def cache_info():
+    return {'lte': lte.cache_info()._asdict(), 'nr': nr.cache_info()._asdict()}
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+📡 TERMUX:API BROKER - Shared collection layer for all 8xRadar tools
+No /bin/sh per poll, long-lived location and heading readers, parsed results
+"""
+
+import asyncio
+import json
+import math
+import os
+import shutil
+import subprocess
+import threading
+import time
+import urllib.request
+
+# ============== TERMUX:API ENDPOINTS ==============
+PREFIX = os.environ.get('PREFIX', '/data/data/com.termux/files/usr')
+TERMUX_API = os.path.join(PREFIX, 'libexec', 'termux-api')
+
+# termux-sensor -s takes partial, comma-separated sensor names
+HEADING_SENSORS = os.environ.get('RADAR_HEADING_SENSORS', 'orientation,rotation vector')
+HEADING_DELAY = 100   # ms between sensor events
+
+# name: (wrapper argv, termux-api method argv or None)
+# The termux-* wrappers are tiny sh scripts around libexec/termux-api;
+# calling the binary directly saves one fork + exec per poll.
+SOURCES = {
+    'wifi': (['termux-wifi-scaninfo'], ['WifiScanInfo']),
+    'bluetooth': (['termux-bluetooth-scaninfo'], None),
+    'cell': (['termux-telephony-cellinfo'], ['TelephonyCellInfo']),
+    'gps': (['termux-location', '-p', 'gps'],
+            ['Location', '--es', 'provider', 'gps', '--es', 'request', 'once']),
+    'network_location': (['termux-location', '-p', 'network'],
+                         ['Location', '--es', 'provider', 'network', '--es', 'request', 'once']),
+    'heading': (['termux-sensor', '-s', HEADING_SENSORS, '-n', '1'], None),
+}
+
+# Last measured latency (seconds) per source / executable
+LATENCY = {}
+
+# Optional record/replay/synthetic backend (see sources.py)
+BACKEND = None
+
+_argv_cache = {}
+
+
+def _resolve(name):
+    """Pick the cheapest argv for a source (direct binary > wrapper)"""
+    if name in _argv_cache:
+        return _argv_cache[name]
+    wrapper, method = SOURCES[name]
+    if method and os.access(TERMUX_API, os.X_OK):
+        argv = [TERMUX_API] + method
+    else:
+        exe = shutil.which(wrapper[0])
+        argv = [exe] + wrapper[1:] if exe else None
+    _argv_cache[name] = argv
+    return argv
+
+
+def run(argv, timeout=15, label=None):
+    """Run a command without a shell and return its stdout ('' on failure)"""
+    start = time.monotonic()
+    try:
+        r = subprocess.run(argv, stdin=subprocess.DEVNULL, capture_output=True,
+                           text=True, timeout=timeout)
+        out = r.stdout
+    except subprocess.TimeoutExpired as e:
+        # Keep whatever was printed before the deadline (e.g. lescan)
+        out = e.stdout or ''
+        if isinstance(out, bytes):
+            out = out.decode(errors='replace')
+    except (OSError, ValueError):
+        out = ''
+    LATENCY[label or os.path.basename(str(argv[0]))] = time.monotonic() - start
+    return out.strip()
+
+
+def set_backend(backend):
+    """Route every source through a backend (None = live device)"""
+    global BACKEND
+    BACKEND = backend
+
+
+def _dispatch(name, live):
+    """Let the active backend record, replay or synthesise a source"""
+    if BACKEND is None:
+        return live()
+    return BACKEND.fetch(name, live)
+
+
+def _argv(name, arg=None):
+    """argv for a source; 'route' and 'nmap' are plain executables"""
+    if name == 'route':
+        exe = shutil.which('ip')
+        return [exe, 'route'] if exe else None
+    if name == 'nmap':
+        exe = shutil.which('nmap')
+        return [exe, '-sn', arg] if exe and arg else None
+    return _resolve(name)
+
+
+def _live_fetch(name, timeout, arg=None):
+    argv = _argv(name, arg)
+    if not argv:
+        return ''
+    return run(argv, timeout=timeout, label=name)
+
+
+def fetch(name, timeout=15, arg=None):
+    """Raw output of a Termux:API source ('' if unavailable)"""
+    return _dispatch(name, lambda: _live_fetch(name, timeout, arg))
+
+
+# ============== ASYNC PATH (collector.py) ==============
+async def arun(argv, timeout=15, label=None):
+    """Async twin of run(): the child is killed on deadline or cancellation"""
+    start = time.monotonic()
+    label = label or os.path.basename(str(argv[0]))
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL)
+    except (OSError, ValueError):
+        LATENCY[label] = time.monotonic() - start
+        return ''
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        out = b''
+    finally:
+        # Never leave a stuck termux-api call behind
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        LATENCY[label] = time.monotonic() - start
+    return out.decode(errors='replace').strip()
+
+
+async def afetch(name, timeout=15, arg=None):
+    """Async fetch; replay/synthetic backends answer inline, record wraps the live call"""
+    if BACKEND is not None and not getattr(BACKEND, 'passthrough', False):
+        return BACKEND.fetch(name, lambda: '')
+    argv = _argv(name, arg)
+    out = await arun(argv, timeout=timeout, label=name) if argv else ''
+    if BACKEND is not None:
+        BACKEND.save(name, out)
+    return out
+
+
+def parse_json(out, default):
+    """Decode JSON output, falling back to default on errors/API_ERROR"""
+    if not out:
+        return default
+    try:
+        value = json.loads(out)
+    except ValueError:
+        return default
+    if default is not None and not isinstance(value, type(default)):
+        return default
+    return value
+
+
+def _json_objects(lines):
+    """Split a stream of pretty-printed JSON objects (termux-location / termux-sensor)"""
+    decoder = json.JSONDecoder()
+    buf = ''
+    for line in lines:
+        buf += line
+        stripped = buf.lstrip()
+        try:
+            obj, end = decoder.raw_decode(stripped)
+        except ValueError:
+            continue
+        buf = stripped[end:]
+        yield obj
+
+
+# ============== LONG-LIVED LOCATION READER ==============
+class LocationStream:
+    """Keeps one `termux-location -r updates` process alive and caches fixes"""
+
+    def __init__(self, provider='gps'):
+        self.provider = provider
+        self.fix = None
+        self.raw = ''
+        self.fix_time = 0
+        self.proc = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.proc and self.proc.poll() is None:
+                return True
+            if os.access(TERMUX_API, os.X_OK):
+                argv = [TERMUX_API, 'Location', '--es', 'provider', self.provider,
+                        '--es', 'request', 'updates']
+            else:
+                exe = shutil.which('termux-location')
+                if not exe:
+                    return False
+                argv = [exe, '-p', self.provider, '-r', 'updates']
+            try:
+                self.proc = subprocess.Popen(argv, stdin=subprocess.DEVNULL,
+                                             stdout=subprocess.PIPE,
+                                             stderr=subprocess.DEVNULL, text=True)
+            except OSError:
+                self.proc = None
+                return False
+        threading.Thread(target=self._reader, args=(self.proc,), daemon=True).start()
+        return True
+
+    def _reader(self, proc):
+        """Split the pretty-printed JSON object stream into fixes"""
+        for obj in _json_objects(proc.stdout):
+            if isinstance(obj, dict) and 'latitude' in obj:
+                self.raw = json.dumps(obj)
+                self.fix = obj
+                self.fix_time = time.monotonic()
+
+    def latest(self, max_age=30):
+        if self.fix and time.monotonic() - self.fix_time <= max_age:
+            return self.fix
+        return None
+
+    def stop(self):
+        with self.lock:
+            if self.proc and self.proc.poll() is None:
+                self.proc.terminate()
+            self.proc = None
+
+
+_streams = {}
+
+
+def location_stream(provider='gps'):
+    """Shared LocationStream per provider (started on first use)"""
+    stream = _streams.get(provider)
+    if stream is None:
+        stream = _streams[provider] = LocationStream(provider)
+    stream.start()
+    return stream
+
+
+# ============== LONG-LIVED HEADING READER ==============
+def azimuth(event):
+    """Device heading (deg clockwise from north) from one termux-sensor event, or None.
+    Orientation gives it directly; a rotation vector is a quaternion (Android's
+    getRotationMatrixFromVector + getOrientation). Game rotation has no north."""
+    found = None
+    for name, reading in event.items():
+        values = reading.get('values') if isinstance(reading, dict) else None
+        name = name.lower()
+        if not values:
+            continue
+        if 'orientation' in name:
+            return values[0] % 360
+        if 'rotation' in name and 'game' not in name and len(values) >= 3:
+            x, y, z = values[:3]
+            w = values[3] if len(values) > 3 else math.sqrt(max(0.0, 1 - x * x - y * y - z * z))
+            found = math.degrees(math.atan2(2 * (x * y - z * w), 1 - 2 * (x * x + z * z))) % 360
+    return found
+
+
+class HeadingStream:
+    """Keeps one `termux-sensor` process alive and smooths its compass heading.
+    wait() blocks until the next reading, so a compass can redraw at sensor rate."""
+
+    SMOOTHING = 0.35   # weight of a new reading (circular mean, no 359/0 jump)
+
+    def __init__(self, sensors=None, delay=HEADING_DELAY):
+        self.sensors = sensors or HEADING_SENSORS
+        self.delay = delay
+        self.heading = None
+        self.heading_time = 0
+        self.vector = None
+        self.readings = 0
+        self.proc = None
+        self.polling = False
+        self.changed = threading.Condition()
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.polling or (self.proc and self.proc.poll() is None):
+                return True
+            if BACKEND is not None and not getattr(BACKEND, 'passthrough', False):
+                # Replay / synthetic: poll the backend at the sensor rate
+                self.polling = True
+                threading.Thread(target=self._poll, daemon=True).start()
+                return True
+            exe = shutil.which('termux-sensor')
+            if not exe:
+                return False
+            try:
+                self.proc = subprocess.Popen([exe, '-s', self.sensors, '-d', str(self.delay)],
+                                             stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                             stderr=subprocess.DEVNULL, text=True)
+            except OSError:
+                self.proc = None
+                return False
+        threading.Thread(target=self._reader, args=(self.proc,), daemon=True).start()
+        return True
+
+    def _reader(self, proc):
+        for obj in _json_objects(proc.stdout):
+            if isinstance(obj, dict):
+                self._update(obj)
+
+    def _poll(self):
+        while self.polling:
+            self._update(parse_json(fetch('heading'), {}))
+            time.sleep(self.delay / 1000)
+
+    def _update(self, event):
+        az = azimuth(event)
+        if az is None:
+            return
+        a = math.radians(az)
+        if self.vector is None:
+            self.vector = (math.sin(a), math.cos(a))
+        else:
+            k = self.SMOOTHING
+            self.vector = (self.vector[0] + k * (math.sin(a) - self.vector[0]),
+                           self.vector[1] + k * (math.cos(a) - self.vector[1]))
+        with self.changed:
+            self.heading = math.degrees(math.atan2(*self.vector)) % 360
+            self.heading_time = time.monotonic()
+            self.readings += 1
+            self.changed.notify_all()
+
+    def latest(self, max_age=2):
+        if self.heading is not None and time.monotonic() - self.heading_time <= max_age:
+            return self.heading
+        return None
+
+    def wait(self, timeout):
+        """Block until the next reading (or timeout); returns latest()"""
+        with self.changed:
+            seen = self.readings
+            self.changed.wait_for(lambda: self.readings != seen, timeout)
+        return self.latest()
+
+    def stop(self):
+        with self.lock:
+            self.polling = False
+            if self.proc and self.proc.poll() is None:
+                self.proc.terminate()
+                # termux-sensor keeps the sensors registered until told otherwise
+                exe = shutil.which('termux-sensor')
+                if exe:
+                    run([exe, '-c'], timeout=5, label='heading')
+            self.proc = None
+
+
+_heading = None
+
+
+def heading_stream():
+    """Shared HeadingStream (started on first use)"""
+    global _heading
+    if _heading is None:
+        _heading = HeadingStream()
+    _heading.start()
+    return _heading
+
+
+# ============== TYPED RESULTS ==============
+# Each accepts already-fetched raw output (e.g. from collector.py)
+def wifi_scan(out=None):
+    """Access points as a list of dicts (bssid, ssid, rssi, frequency, capabilities)"""
+    return parse_json(fetch('wifi') if out is None else out, [])
+
+
+def bluetooth_scan(out=None):
+    """Bluetooth devices as a list of dicts (address, name, rssi)"""
+    return parse_json(fetch('bluetooth') if out is None else out, [])
+
+
+def cell_info(out=None):
+    """Serving + neighbour cells as a list of dicts"""
+    return parse_json(fetch('cell') if out is None else out, [])
+
+
+def _location_name(provider):
+    return 'gps' if provider == 'gps' else 'network_location'
+
+
+def location(provider='gps', stream=True, max_age=30, out=None):
+    """Latest location dict, from the long-lived reader when fresh"""
+    if out is not None:
+        return parse_json(out, {}) or None
+    if stream and BACKEND is None:
+        fix = location_stream(provider).latest(max_age)
+        if fix:
+            return fix
+    return parse_json(fetch(_location_name(provider), timeout=30), {}) or None
+
+
+async def alocation(provider='gps', stream=True, max_age=30):
+    """Raw location JSON; a fresh streamed fix costs no subprocess"""
+    if stream and BACKEND is None:
+        s = location_stream(provider)
+        if s.latest(max_age):
+            return s.raw
+    return await afetch(_location_name(provider), timeout=30)
+
+
+def default_gateway(out=None):
+    """Default IPv4 gateway from `ip route` (parsed in Python, no grep/awk)"""
+    if out is None:
+        out = fetch('route')
+    for line in out.splitlines():
+        parts = line.split()
+        if parts[:2] == ['default', 'via'] and len(parts) > 2:
+            return parts[2]
+    return None
+
+
+def _subnet(gateway):
+    return '.'.join(gateway.split('.')[:3]) + '.0/24'
+
+
+def ping_sweep(subnet, timeout=60):
+    """Raw `nmap -sn` output for a subnet"""
+    return fetch('nmap', timeout=timeout, arg=subnet)
+
+
+def network_sweep(timeout=60):
+    """Raw `nmap -sn` output for the default gateway's /24 ('' if offline)"""
+    gw = default_gateway()
+    return ping_sweep(_subnet(gw), timeout) if gw else ''
+
+
+async def anetwork_sweep(timeout=60):
+    """Async network_sweep()"""
+    gw = default_gateway(await afetch('route'))
+    return await afetch('nmap', timeout=timeout, arg=_subnet(gw)) if gw else ''
+
+
+def http_json(url, timeout=10):
+    """GET a JSON document in-process (replaces `curl -s`)"""
+    start = time.monotonic()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as r:
+            return json.loads(r.read().decode())
+    except Exception:
+        return None
+    finally:
+        LATENCY['http'] = time.monotonic() - start
+
+
+# ============== PLUGGABLE SOURCES ==============
+if os.environ.get('RADAR_SOURCE'):
+    import sources
+    set_backend(sources.from_spec(os.environ['RADAR_SOURCE']))
@@ -5,12 +5,18 @@
 LTE-A / LTE-A Pro / 5G NR CA Analysis
 """
 
-import subprocess
 import json
 import os
+import sqlite3
+import sys
 import time
+from array import array
 from datetime import datetime
 
+import bands
+import operators
+import session_store
+
 # ============== COLORS ==============
 class C:
     R = '\033[91m'; G = '\033[92m'; Y = '\033[93m'; B = '\033[94m'
@@ -97,70 +103,10 @@ CA_COMBINATIONS = {
     },
 }
 
-def cmd(c):
-    try:
-        r = subprocess.run(c, shell=True, capture_output=True, text=True, timeout=15)
-        return r.stdout + r.stderr
-    except:
-        return ""
-
 def clear():
     os.system('clear' if os.name != 'nt' else 'cls')
 
 
-# ============== EARFCN TO BAND MAPPING ==============
-def earfcn_to_band(earfcn):
-    """Convert EARFCN to band number and frequency"""
-    bands = [
-        (0, 599, 1, 2100, "FDD"),
-        (600, 1199, 2, 1900, "FDD"),
-        (1200, 1949, 3, 1800, "FDD"),
-        (1950, 2399, 4, 1700, "FDD"),
-        (2400, 2649, 5, 850, "FDD"),
-        (2650, 2749, 6, 800, "FDD"),
-        (2750, 3449, 7, 2600, "FDD"),
-        (3450, 3799, 8, 900, "FDD"),
-        (6150, 6449, 20, 800, "FDD"),
-        (36200, 36349, 33, 1900, "TDD"),
-        (36350, 36949, 34, 2000, "TDD"),
-        (36950, 37549, 35, 1900, "TDD"),
-        (37550, 37749, 36, 1900, "TDD"),
-        (37750, 38249, 37, 1900, "TDD"),
-        (38250, 38649, 38, 2600, "TDD"),
-        (38650, 39649, 39, 1900, "TDD"),
-        (39650, 41589, 40, 2300, "TDD"),
-        (41590, 43589, 41, 2500, "TDD"),
-        (43590, 45589, 42, 3500, "TDD"),
-        (45590, 46589, 43, 3700, "TDD"),
-    ]
-    
-    for start, end, band, freq, duplex in bands:
-        if start <= earfcn <= end:
-            return {"band": band, "freq": freq, "duplex": duplex, "earfcn": earfcn}
-    
-    return {"band": None, "freq": None, "duplex": None, "earfcn": earfcn}
-
-def nrarfcn_to_band(nrarfcn):
-    """Convert NR-ARFCN to band"""
-    bands = [
-        (422000, 434000, "n1", 2100),
-        (361000, 376000, "n3", 1800),
-        (173800, 178800, "n5", 850),
-        (185000, 192000, "n8", 900),
-        (151600, 160600, "n28", 700),
-        (460000, 480000, "n40", 2300),
-        (499200, 537999, "n41", 2500),
-        (620000, 653333, "n77", 3700),
-        (620000, 653333, "n78", 3500),
-        (2054166, 2104165, "n258", 26000),
-    ]
-    
-    for start, end, band, freq in bands:
-        if start <= nrarfcn <= end:
-            return {"band": band, "freq": freq, "nrarfcn": nrarfcn}
-    
-    return {"band": None, "freq": None, "nrarfcn": nrarfcn}
-
 # ============== BANDWIDTH CALCULATION ==============
 def calculate_bandwidth(earfcn, nrb=None):
     """Calculate bandwidth from number of resource blocks"""
@@ -175,120 +121,470 @@ def calculate_bandwidth(earfcn, nrb=None):
     return None
 
 # ============== CA DETECTION ==============
+# Android reports the PCell as the registered cell; SCells only show up as
+# neighbours, so a neighbour counts as an SCell once it is on another channel
+# of the same operator, strong enough, seen on consecutive scans, and its band
+# completes a combination the operator actually deploys.
+SCELL_MIN_RSRP = -115   # dBm; weaker neighbours are not configured as SCells
+CONFIRM_SCANS = 2       # consecutive scans before a neighbour becomes an SCell
+MISS_SCANS = 2          # scans absent before it is dropped again
+MBPS_PER_MHZ = 7.5      # rough peak throughput per MHz of aggregated spectrum
+
+
+def _combo_bandwidths(entry):
+    """{'B3': 20, 'n78': 100} from a table entry ("20+100=120MHz" per band)"""
+    names = entry['combo'].split('+')
+    widths = entry['max_bw'].split('=')[0].split('+')
+    return dict(zip(names, (float(w) for w in widths)))
+
+
+def build_combo_index(table=None):
+    """{operator: {frozenset(bands): (name, kind, entry)}} plus each operator's band set"""
+    index, op_bands = {}, {}
+    for op, kinds in (table or CA_COMBINATIONS).items():
+        combos = index[op] = {}
+        for kind, entries in kinds.items():
+            for entry in entries:
+                key = frozenset(entry['combo'].split('+'))
+                combos[key] = (entry['combo'], kind, entry)
+        op_bands[op] = frozenset().union(*combos) if combos else frozenset()
+    return index, op_bands
+
+
+COMBO_INDEX, OPERATOR_BANDS = build_combo_index()
+
+
+def cell_bandwidth(cell):
+    """Reported channel bandwidth in MHz (Android gives kHz), or None"""
+    bw = cell.get('bandwidth')
+    if not bw or bw >= 2147483647:
+        return None
+    return bw / 1000 if bw > 1000 else float(bw)
+
+
+def nominal_bandwidth(band):
+    """Widest bandwidth deployed in India for 'B3' / 'n78' (MHz), or None"""
+    if band and band.startswith('B'):
+        info = LTE_BANDS_INDIA.get(int(band[1:]))
+    else:
+        info = NR_BANDS_INDIA.get(band)
+    return float(max(info['bw'])) if info else None
+
+
+def _carrier(cell, ch):
+    """Per-carrier dict as shown by the analyzers"""
+    cell_type = cell.get('type', '').lower()
+    ch = ch or {}
+    if 'lte' in cell_type:
+        return {
+            'type': 'LTE',
+            'earfcn': cell.get('earfcn', 0),
+            'band': ch.get('band'),
+            'name': ch.get('name'),
+            'freq': ch.get('dl'),
+            'ul_freq': ch.get('ul'),
+            'duplex': ch.get('duplex'),
+            'pci': cell.get('pci'),
+            'rsrp': cell.get('rsrp'),
+            'rsrq': cell.get('rsrq'),
+            'registered': cell.get('registered', False),
+            'bandwidth': cell_bandwidth(cell),
+            'mcc': cell.get('mcc'), 'mnc': cell.get('mnc'),
+        }
+    if 'nr' in cell_type or '5g' in cell_type:
+        return {
+            'type': 'NR',
+            'nrarfcn': cell.get('nrarfcn', 0),
+            'band': ch.get('name'),
+            'name': ch.get('name'),
+            'freq': ch.get('dl'),
+            'ul_freq': ch.get('ul'),
+            'duplex': ch.get('duplex'),
+            'pci': cell.get('pci'),
+            'ss_rsrp': cell.get('ssRsrp') or cell.get('csiRsrp') or cell.get('ss_rsrp'),
+            'ss_rsrq': cell.get('ssRsrq') or cell.get('csiRsrq') or cell.get('ss_rsrq'),
+            'registered': cell.get('registered', False),
+            'bandwidth': cell_bandwidth(cell),
+            'mcc': cell.get('mcc'), 'mnc': cell.get('mnc'),
+        }
+    return None
+
+
+def _level(carrier):
+    level = carrier.get('rsrp') if carrier['type'] == 'LTE' else carrier.get('ss_rsrp')
+    return level if level is not None else -999
+
+
+def _plmn(carrier):
+    mcc, mnc = carrier.get('mcc'), carrier.get('mnc')
+    # Neighbours usually come without a PLMN: Android's 2147483647 in raw
+    # records, 0 in the parsed ones ultimate_radar stores
+    if not mcc or mnc is None or mcc >= 2147483647 or mnc >= 2147483647:
+        return None
+    return (mcc, mnc)
+
+
+class CAEngine:
+    """Carrier aggregation state across scans: PCell, confirmed SCells, the
+    matched combination and how long each combination has been active"""
+
+    def __init__(self, confirm=CONFIRM_SCANS, miss=MISS_SCANS, index=None):
+        self.confirm = confirm
+        self.miss = miss
+        self.index, self.op_bands = index or (COMBO_INDEX, OPERATOR_BANDS)
+        self.candidates = {}     # (type, channel) -> [hits, misses, carrier]
+        self.combo = None        # combination name while CA is active
+        self.since = None
+        self.durations = {}      # combination name -> seconds active (closed spells)
+        self.changes = 0
+        self.history = CAHistory()
+        self.result = self._empty()
+
+    @staticmethod
+    def _empty():
+        return {'active': False, 'type': None, 'mode': None, 'pcell': None, 'scells': [],
+                'bands': [], 'combo': None, 'known': False, 'combo_kind': None,
+                'total_bandwidth': 0, 'bw_estimated': False, 'max_speed': 0,
+                'nr_nsa': False, 'nr_sa': False, 'lte_cells': [], 'nr_cells': [],
+                'operator': None, 'since': None, 'active_for': 0, 'durations': {}}
+
+    def _track(self, carriers, pcell):
+        """Update neighbour persistence; returns the confirmed ones, strongest per channel"""
+        seen = {}
+        for c in carriers:
+            if c is pcell or c['registered'] and c['type'] == pcell['type']:
+                continue
+            chan = (c['type'], c.get('earfcn') or c.get('nrarfcn'))
+            if chan == (pcell['type'], pcell.get('earfcn') or pcell.get('nrarfcn')):
+                continue   # same channel as the PCell: a neighbour, not a carrier
+            if _level(c) < SCELL_MIN_RSRP or not c.get('name'):
+                continue
+            if chan not in seen or _level(c) > _level(seen[chan]):
+                seen[chan] = c
+        for chan, state in list(self.candidates.items()):
+            if chan not in seen:
+                # A confirmed carrier survives miss - 1 absent scans with its hits
+                state[1] += 1
+                if state[1] >= self.miss or state[0] < self.confirm:
+                    del self.candidates[chan]
+        for chan, c in seen.items():
+            state = self.candidates.setdefault(chan, [0, 0, c])
+            state[0] += 1
+            state[1] = 0
+            state[2] = c
+        return [state[2] for state in self.candidates.values() if state[0] >= self.confirm]
+
+    def _match(self, op, pcell_band, names):
+        """Largest known combination with the PCell band inside the observed band set"""
+        combos = self.index.get(op) or {}
+        # NR bands first so that, size for size, EN-DC combinations win
+        others = sorted(set(names) - {pcell_band}, key=lambda b: (not b.startswith('n'), b))
+        for size in range(len(others), 0, -1):
+            for extra in _subsets(others, size):
+                hit = combos.get(frozenset((pcell_band,) + extra))
+                if hit:
+                    return hit
+        return None
+
+    def update(self, cells, now=None):
+        """Feed one scan (raw Termux:API cells or parsed dicts); returns the result dict"""
+        now = now or time.time()
+        carriers = [c for c in (_carrier(cell, ch) for cell, ch in
+                                zip(cells, bands.resolve_all(cells))) if c]
+        result = self._empty()
+        result['lte_cells'] = [c for c in carriers if c['type'] == 'LTE']
+        result['nr_cells'] = [c for c in carriers if c['type'] == 'NR']
+        registered = [c for c in carriers if c['registered']]
+        pcell = next((c for c in registered if c['type'] == 'LTE'), None) or \
+            next(iter(registered), None)
+        match = None
+        if pcell is not None and pcell.get('name'):
+            plmn = _plmn(pcell)
+            op = operators.name(*plmn) if plmn else None
+            result['operator'] = op
+            result['pcell'] = pcell
+            result['mode'] = 'SA' if pcell['type'] == 'NR' else 'LTE'
+            # Neighbours of another operator, or on bands it never aggregates, are ruled out
+            usable = [c for c in carriers
+                      if (_plmn(c) in (None, plmn)) and c.get('name') in self.op_bands.get(op, ())]
+            confirmed = self._track(usable, pcell)
+            match = self._match(op, pcell['name'], [c['name'] for c in confirmed])
+            if match:
+                name, kind, entry = match
+                members = set(name.split('+'))
+                scells = {}
+                for c in confirmed:
+                    if c['name'] in members and c['name'] != pcell['name'] and \
+                            (c['name'] not in scells or _level(c) > _level(scells[c['name']])):
+                        scells[c['name']] = c
+                # PCell band first, then the table's order
+                order = [pcell['name']] + [b for b in name.split('+') if b != pcell['name']]
+                result['scells'] = [scells[b] for b in order[1:] if b in scells]
+                widths = _combo_bandwidths(entry)
+                total, estimated = 0.0, False
+                for c in [pcell] + result['scells']:
+                    bw = c['bandwidth']
+                    if bw is None:
+                        bw = widths.get(c['name']) or nominal_bandwidth(c['name']) or 0
+                        estimated = True
+                    total += bw
+                result.update(active=True, combo=name, known=True, combo_kind=kind,
+                              bands=order, type=f"{len(order)}CC",
+                              total_bandwidth=round(total, 1), bw_estimated=estimated,
+                              max_speed=round(total * MBPS_PER_MHZ))
+            else:
+                result['bands'] = [pcell['name']]
+                result['total_bandwidth'] = pcell['bandwidth'] or nominal_bandwidth(pcell['name']) or 0
+                result['bw_estimated'] = pcell['bandwidth'] is None
+            # EN-DC: an LTE anchor with a confirmed NR leg, whether or not it is in the combination
+            if pcell['type'] == 'LTE' and any(c['type'] == 'NR' for c in confirmed):
+                result['nr_nsa'] = True
+                result['mode'] = 'NSA'
+            result['nr_sa'] = pcell['type'] == 'NR'
+        else:
+            self.candidates.clear()
+        self._spell(result['combo'], now)
+        result['since'] = self.since
+        result['active_for'] = now - self.since if self.since else 0
+        result['durations'] = self.time_in(now)
+        self.history.observe(result, now)
+        self.result = result
+        return result
+
+    def _spell(self, combo, now):
+        """Close the running combination spell when the combination changes"""
+        if combo == self.combo:
+            return
+        if self.combo is not None:
+            self.durations[self.combo] = self.durations.get(self.combo, 0) + now - self.since
+        self.changes += 1
+        self.combo = combo
+        self.since = now if combo else None
+
+    def time_in(self, now=None):
+        """Seconds each combination has been active, the running spell included"""
+        totals = dict(self.durations)
+        if self.combo is not None:
+            totals[self.combo] = totals.get(self.combo, 0) + (now or time.time()) - self.since
+        return totals
+
+
+def _subsets(items, size):
+    """Combinations of items (sorted tuples) of one size"""
+    if size == 0:
+        yield ()
+        return
+    for i in range(len(items) - size + 1):
+        for rest in _subsets(items[i + 1:], size - 1):
+            yield (items[i],) + rest
+
+
 def detect_carrier_aggregation(cells):
-    """Detect Carrier Aggregation from cell data"""
-    
-    ca_info = {
-        'active': False,
-        'type': None,  # 2CC, 3CC, 4CC, 5CC
-        'pcell': None,  # Primary Cell
-        'scells': [],   # Secondary Cells
-        'total_bandwidth': 0,
-        'bands': [],
-        'max_speed': 0,
-        'nr_nsa': False,  # 5G NSA mode
-        'nr_sa': False,   # 5G SA mode
-    }
-    
-    lte_cells = []
-    nr_cells = []
-    
-    for cell in cells:
-        cell_type = cell.get('type', '').lower()
-        
-        if 'lte' in cell_type:
-            earfcn = cell.get('earfcn', 0)
-            band_info = earfcn_to_band(earfcn)
-            
-            cell_info = {
-                'type': 'LTE',
-                'earfcn': earfcn,
-                'band': band_info.get('band'),
-                'freq': band_info.get('freq'),
-                'duplex': band_info.get('duplex'),
-                'pci': cell.get('pci'),
-                'rsrp': cell.get('rsrp'),
-                'rsrq': cell.get('rsrq'),
-                'registered': cell.get('registered', False),
-                'bandwidth': cell.get('bandwidth'),
-            }
-            lte_cells.append(cell_info)
-            
-        elif 'nr' in cell_type or '5g' in cell_type:
-            nrarfcn = cell.get('nrarfcn', 0)
-            band_info = nrarfcn_to_band(nrarfcn)
-            
-            cell_info = {
-                'type': 'NR',
-                'nrarfcn': nrarfcn,
-                'band': band_info.get('band'),
-                'freq': band_info.get('freq'),
-                'pci': cell.get('pci'),
-                'ss_rsrp': cell.get('ssRsrp') or cell.get('csiRsrp'),
-                'ss_rsrq': cell.get('ssRsrq') or cell.get('csiRsrq'),
-                'registered': cell.get('registered', False),
-            }
-            nr_cells.append(cell_info)
-    
-    # Identify PCell and SCells
-    pcell = None
-    scells = []
-    
-    for cell in lte_cells:
-        if cell['registered']:
-            pcell = cell
+    """Detect Carrier Aggregation from one scan (no history: neighbours count at once)"""
+    return CAEngine(confirm=1).update(cells)
+
+
+def format_duration(seconds):
+    """'45s' / '12m' / '1.5h'"""
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+# ============== ROLLING WINDOWS ==============
+# Time at each CC count, per combination and in NSA, summed over a ring of
+# buckets per window: memory is fixed however long the session runs
+CC_LEVELS = ('1CC', '2CC', '3CC', '4CC', '5CC+')
+WINDOWS = (('1m', 60, 12), ('15m', 900, 15), ('1h', 3600, 12))   # name, span s, buckets
+MAX_GAP_S = 30          # longer silence between scans is not counted as CA time
+TOP_COMBOS = 5
+
+
+class RollingWindow:
+    """Seconds per CC level / combination / NSA over the last span seconds
+    (span None: since the start)"""
+
+    def __init__(self, span=None, buckets=1):
+        self.span = span
+        self.buckets = buckets
+        self.width = span / buckets if span else None
+        self.epoch = array('q', [-1] * buckets)        # bucket number held by each slot
+        self.cc = array('d', bytes(8 * len(CC_LEVELS) * buckets))
+        self.nsa = array('d', bytes(8 * buckets))
+        self.combos = [{} for _ in range(buckets)]
+
+    def _slot(self, now):
+        if self.span is None:
+            return 0
+        n = int(now // self.width)
+        slot = n % self.buckets
+        if self.epoch[slot] != n:
+            self.epoch[slot] = n
+            base = slot * len(CC_LEVELS)
+            for i in range(len(CC_LEVELS)):
+                self.cc[base + i] = 0.0
+            self.nsa[slot] = 0.0
+            self.combos[slot].clear()
+        return slot
+
+    def add(self, level, combo, nsa, seconds, now):
+        slot = self._slot(now)
+        self.cc[slot * len(CC_LEVELS) + level] += seconds
+        if nsa:
+            self.nsa[slot] += seconds
+        if combo:
+            combos = self.combos[slot]
+            combos[combo] = combos.get(combo, 0.0) + seconds
+
+    def summary(self, now):
+        """{'seconds', '1CC'..'5CC+' shares, 'ca', 'nsa', 'top': [[combo, share], ...]}"""
+        cc = [0.0] * len(CC_LEVELS)
+        nsa = 0.0
+        combos = {}
+        oldest = int((now - self.span) // self.width) + 1 if self.span else None
+        for slot in range(self.buckets):
+            if oldest is not None and not oldest <= self.epoch[slot] <= now // self.width:
+                continue
+            base = slot * len(CC_LEVELS)
+            for i in range(len(CC_LEVELS)):
+                cc[i] += self.cc[base + i]
+            nsa += self.nsa[slot]
+            for combo, seconds in self.combos[slot].items():
+                combos[combo] = combos.get(combo, 0.0) + seconds
+        total = sum(cc)
+        share = (lambda x: round(x / total, 4)) if total else (lambda x: 0.0)
+        summary = {'seconds': round(total, 1)}
+        summary.update((name, share(x)) for name, x in zip(CC_LEVELS, cc))
+        summary['ca'] = share(total - cc[0])
+        summary['nsa'] = share(nsa)
+        top = sorted(combos.items(), key=lambda kv: -kv[1])[:TOP_COMBOS]
+        summary['top'] = [[combo, share(x)] for combo, x in top]
+        return summary
+
+
+class CAHistory:
+    """CAEngine results folded into the 1 min / 15 min / 1 h windows and a
+    session total; each scan's state holds until the next scan"""
+
+    def __init__(self, windows=WINDOWS):
+        self.windows = {name: RollingWindow(span, buckets) for name, span, buckets in windows}
+        self.windows['session'] = RollingWindow()
+        self.state = None        # (level, combo, nsa) of the last scan, None without service
+        self.last = None
+
+    def observe(self, result, now):
+        if self.state is not None and self.last is not None and 0 < now - self.last <= MAX_GAP_S:
+            for window in self.windows.values():
+                window.add(*self.state, now - self.last, now)
+        self.last = now
+        if result.get('pcell') is None:
+            self.state = None
         else:
-            scells.append(cell)
-    
-    ca_info['pcell'] = pcell
-    ca_info['scells'] = scells
-    
-    # Count carriers
-    total_carriers = 1 if pcell else 0
-    total_carriers += len(scells)
-    
-    if nr_cells:
-        total_carriers += len(nr_cells)
-        ca_info['nr_nsa'] = True if pcell else False
-        ca_info['nr_sa'] = True if not pcell and nr_cells else False
-    
-    # Determine CA type
-    if total_carriers >= 2:
-        ca_info['active'] = True
-        if total_carriers == 2:
-            ca_info['type'] = '2CC'
-        elif total_carriers == 3:
-            ca_info['type'] = '3CC'
-        elif total_carriers == 4:
-            ca_info['type'] = '4CC'
-        elif total_carriers >= 5:
-            ca_info['type'] = '5CC+'
-    
-    # Collect bands
-    bands = []
-    if pcell and pcell['band']:
-        bands.append(f"B{pcell['band']}")
-    for sc in scells:
-        if sc['band']:
-            bands.append(f"B{sc['band']}")
-    for nr in nr_cells:
-        if nr['band']:
-            bands.append(nr['band'])
-    
-    ca_info['bands'] = bands
-    
-    # Estimate bandwidth and speed
-    total_bw = 0
-    for cell in lte_cells:
-        bw = cell.get('bandwidth') or 20  # Assume 20MHz if unknown
-        total_bw += bw
-    for cell in nr_cells:
-        total_bw += 100  # Assume 100MHz for NR
-    
-    ca_info['total_bandwidth'] = total_bw
-    ca_info['max_speed'] = total_bw * 7.5  # Rough estimate: 7.5 Mbps per MHz
-    
-    ca_info['lte_cells'] = lte_cells
-    ca_info['nr_cells'] = nr_cells
-    
-    return ca_info
+            carriers = 1 + len(result.get('scells', []))
+            self.state = (min(carriers, len(CC_LEVELS)) - 1, result.get('combo'),
+                          bool(result.get('nr_nsa')))
+
+    def summaries(self, now=None):
+        """[{'window': '1m', ...summary}, ...] for every window plus 'session'"""
+        now = now or time.time()
+        return [dict(window=name, **w.summary(now)) for name, w in self.windows.items()]
+
+    def summary_line(self, window='15m', now=None):
+        """'15m: 2CC 40% 3CC 22% NSA 10%  top B3+B40' ('' before any time is counted)"""
+        s = self.windows[window].summary(now or time.time())
+        if not s['seconds']:
+            return ''
+        text = f"{window}: " + ' '.join(f"{name} {s[name]:.0%}" for name in CC_LEVELS if s[name])
+        if s['nsa']:
+            text += f" NSA {s['nsa']:.0%}"
+        if s['top']:
+            text += f"  top {s['top'][0][0]}"
+        return text
+
+
+# ============== SESSION DATABASE ==============
+def stored(conn, window='session', since=None, session=None):
+    """Window summaries recorded as 'ca' observations, oldest first"""
+    for row in session_store.series(conn, 'ca', key=window, since=since, session=session):
+        try:
+            summary = json.loads(row['data'])
+        except ValueError:
+            continue
+        summary['ts'] = row['ts']
+        summary['session'] = row['session']
+        yield summary
+
+
+def replay(conn, since=None, session=None):
+    """Run the recorded cell scans of a session database through a CAEngine"""
+    engine = CAEngine()
+    cycle, cycle_ts = [], None
+    for row in session_store.series(conn, 'cell', since=since, session=session):
+        if row['ts'] != cycle_ts and cycle:
+            engine.update(cycle, cycle_ts)
+            cycle = []
+        cycle_ts = row['ts']
+        try:
+            cycle.append(json.loads(row['data']))
+        except ValueError:
+            continue
+    if cycle:
+        engine.update(cycle, cycle_ts)
+    return engine
+
+
+# ============== CLI ==============
+def _print_summary(label, s):
+    shares = ' '.join(f"{s[name]:>5.0%}" for name in CC_LEVELS)
+    top = ', '.join(f"{combo} {x:.0%}" for combo, x in s['top'][:3])
+    print(f"  {label:<20} {format_duration(s['seconds']):>6} {shares}  {s['nsa']:>4.0%}  {top}")
+
+
+def main():
+    """python carrier_aggregation.py [radar_sessions.db] [--session N] [--since MIN]
+    [--window 1m|15m|1h|session] [--replay]"""
+    args = sys.argv[1:]
+    opts = {}
+    for flag in ('--session', '--since', '--window'):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i:i + 2]
+    rerun = '--replay' in args
+    if rerun:
+        args.remove('--replay')
+    path = args[0] if args else session_store.DB_PATH
+    window = opts.get('--window', 'session')
+    header = f"  {'':<20} {'time':>6} " + ' '.join(f"{name:>5}" for name in CC_LEVELS) + "   NSA  top combinations"
+    try:
+        conn = session_store.connect(path)
+        since = time.time() - float(opts['--since']) * 60 if '--since' in opts else None
+        session = int(opts['--session']) if '--session' in opts else None
+        if rerun:
+            engine = replay(conn, since, session)
+            rows = [(s['window'], s) for s in engine.history.summaries(engine.history.last)]
+        elif session is not None or window != 'session':
+            rows = [(datetime.fromtimestamp(s['ts']).strftime('%m-%d %H:%M') + f" #{s['session']}", s)
+                    for s in stored(conn, window, since, session)]
+        else:
+            # Compare sessions (sites): the last running total of each
+            last = {}
+            for s in stored(conn, 'session', since):
+                last[s['session']] = s
+            tools = dict(conn.execute("SELECT id, tool FROM sessions").fetchall())
+            rows = [(f"#{n} {tools.get(n) or ''}"[:20], s) for n, s in sorted(last.items())]
+    except sqlite3.Error as e:
+        print(f"  Cannot open {path}: {e}")
+        return
+    if not rows:
+        print("  No CA summaries recorded" + ("" if rerun else " (try --replay)"))
+        return
+    print(header)
+    for label, s in rows:
+        _print_summary(label, s)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,71 +4,26 @@
 Coordinates, Direction, Distance, Bands, Satellite View
 """
 
-import subprocess
-import json
 import math
 import os
 import time
-import sqlite3
 from datetime import datetime
 
+import analytics
+import bands
+import broker
+import export
+import operators
+import screen
+import tower_db
+import tower_learn
+
 # ============== COLORS ==============
 class C:
     R = '\033[91m'; G = '\033[92m'; Y = '\033[93m'; B = '\033[94m'
     M = '\033[95m'; C = '\033[96m'; W = '\033[97m'
     BOLD = '\033[1m'; DIM = '\033[2m'; E = '\033[0m'
 
-# ============== INDIA OPERATORS DATABASE ==============
-OPERATORS = {
-    # Airtel
-    (404,10):"Airtel",(404,40):"Airtel",(404,45):"Airtel",(404,49):"Airtel",
-    (404,90):"Airtel",(404,92):"Airtel",(404,93):"Airtel",(404,94):"Airtel",
-    (404,95):"Airtel",(404,96):"Airtel",(404,97):"Airtel",(404,98):"Airtel",
-    (405,51):"Airtel",(405,52):"Airtel",(405,53):"Airtel",(405,54):"Airtel",
-    (405,55):"Airtel",(405,56):"Airtel",
-    # Vi (Vodafone Idea)
-    (404,11):"Vi",(404,12):"Vi",(404,13):"Vi",(404,14):"Vi",(404,15):"Vi",
-    (404,20):"Vi",(404,21):"Vi",(404,22):"Vi",(404,27):"Vi",(404,43):"Vi",
-    (404,46):"Vi",(404,84):"Vi",(404,86):"Vi",(404,88):"Vi",
-    # Jio
-    (405,840):"Jio",(405,854):"Jio",(405,855):"Jio",(405,856):"Jio",
-    (405,857):"Jio",(405,858):"Jio",(405,859):"Jio",(405,860):"Jio",
-    (405,861):"Jio",(405,862):"Jio",(405,863):"Jio",(405,864):"Jio",
-    (405,865):"Jio",(405,866):"Jio",(405,867):"Jio",(405,868):"Jio",
-    (405,869):"Jio",(405,870):"Jio",(405,871):"Jio",(405,872):"Jio",
-    (405,873):"Jio",(405,874):"Jio",
-    # BSNL
-    (404,34):"BSNL",(404,38):"BSNL",(404,51):"BSNL",(404,53):"BSNL",
-    (404,54):"BSNL",(404,55):"BSNL",(404,57):"BSNL",(404,58):"BSNL",
-    (404,59):"BSNL",(404,62):"BSNL",(404,64):"BSNL",(404,66):"BSNL",
-    (404,71):"BSNL",(404,72):"BSNL",(404,73):"BSNL",(404,74):"BSNL",
-    (404,75):"BSNL",(404,76):"BSNL",(404,77):"BSNL",(404,79):"BSNL",
-    (404,80):"BSNL",(404,81):"BSNL",
-    # MTNL
-    (404,68):"MTNL Delhi",(404,69):"MTNL Mumbai",
-}
-
-# ============== LTE BANDS DATABASE ==============
-LTE_BANDS = {
-    # EARFCN to Band mapping (India)
-    range(0, 600): {"band": 1, "freq": 2100, "name": "B1 (2100 MHz)", "ops": ["Airtel", "Vi"]},
-    range(1200, 1950): {"band": 3, "freq": 1800, "name": "B3 (1800 MHz)", "ops": ["Jio", "Airtel", "Vi"]},
-    range(2400, 2650): {"band": 5, "freq": 850, "name": "B5 (850 MHz)", "ops": ["Jio"]},
-    range(2750, 3450): {"band": 8, "freq": 900, "name": "B8 (900 MHz)", "ops": ["Airtel", "Vi"]},
-    range(38650, 39650): {"band": 40, "freq": 2300, "name": "B40 TDD (2300 MHz)", "ops": ["Airtel", "Jio"]},
-    range(39650, 41590): {"band": 41, "freq": 2500, "name": "B41 TDD (2500 MHz)", "ops": ["Jio"]},
-}
-
-# ============== 5G NR BANDS ==============
-NR_BANDS = {
-    range(422000, 434000): {"band": "n1", "freq": 2100, "name": "n1 (2100 MHz)"},
-    range(361000, 376000): {"band": "n3", "freq": 1800, "name": "n3 (1800 MHz)"},
-    range(386000, 398000): {"band": "n5", "freq": 850, "name": "n5 (850 MHz)"},
-    range(496700, 499000): {"band": "n28", "freq": 700, "name": "n28 (700 MHz)"},
-    range(499200, 538000): {"band": "n41", "freq": 2500, "name": "n41 (2500 MHz)"},
-    range(620000, 680000): {"band": "n78", "freq": 3500, "name": "n78 (3500 MHz)"},
-}
-
 # ============== CIRCLE CODES ==============
 CIRCLES = {
     # LAC ranges to Circle (approximate)
@@ -84,29 +39,8 @@ CIRCLES = {
     "Rajasthan": [(451, 500), (1900, 2000)],
 }
 
-def cmd(c):
-    try:
-        r = subprocess.run(c, shell=True, capture_output=True, text=True, timeout=15)
-        return r.stdout + r.stderr
-    except:
-        return ""
-
 
 # ============== CELL TOWER CALCULATIONS ==============
-def get_band_from_earfcn(earfcn):
-    """Get LTE band info from EARFCN"""
-    for earfcn_range, info in LTE_BANDS.items():
-        if earfcn in earfcn_range:
-            return info
-    return {"band": "?", "freq": 0, "name": "Unknown", "ops": []}
-
-def get_nr_band(nrarfcn):
-    """Get 5G NR band from NRARFCN"""
-    for arfcn_range, info in NR_BANDS.items():
-        if nrarfcn in arfcn_range:
-            return info
-    return {"band": "?", "freq": 0, "name": "Unknown"}
-
 def calculate_distance_ta(timing_advance, network_type="LTE"):
     """Calculate distance from Timing Advance"""
     if timing_advance is None or timing_advance < 0:
@@ -154,31 +88,12 @@ def get_direction_arrow(azimuth):
             return arrow
     return "?"
 
+QUALITY_COLORS = {'Excellent': C.G, 'Good': C.G, 'Fair': C.Y, 'Poor': C.Y, 'Very Poor': C.R}
+
 def signal_quality(rsrp=None, rsrq=None, sinr=None):
-    """Calculate overall signal quality"""
-    score = 0
-    
-    if rsrp:
-        if rsrp > -80: score += 40
-        elif rsrp > -90: score += 30
-        elif rsrp > -100: score += 20
-        elif rsrp > -110: score += 10
-    
-    if rsrq:
-        if rsrq > -10: score += 30
-        elif rsrq > -15: score += 20
-        elif rsrq > -20: score += 10
-    
-    if sinr:
-        if sinr > 20: score += 30
-        elif sinr > 10: score += 20
-        elif sinr > 0: score += 10
-    
-    if score >= 80: return f"{C.G}Excellent{C.E}"
-    elif score >= 60: return f"{C.G}Good{C.E}"
-    elif score >= 40: return f"{C.Y}Fair{C.E}"
-    elif score >= 20: return f"{C.Y}Poor{C.E}"
-    else: return f"{C.R}Very Poor{C.E}"
+    """Calculate overall signal quality (scoring tables in analytics.py)"""
+    name = analytics.label(analytics.score(rsrp, rsrq, sinr))
+    return f"{QUALITY_COLORS[name]}{name}{C.E}"
 
 def signal_bars(rsrp):
     """Visual signal bars"""
@@ -194,76 +109,60 @@ def signal_bars(rsrp):
 # ============== LOCATION LOOKUP (OpenCellID Style) ==============
 def lookup_cell_location(mcc, mnc, lac, cid):
     """
-    Lookup cell tower location from local database or API
-    Returns: (lat, lon, accuracy) or None
+    Lookup cell tower location from the local database (tower_db) or the
+    position learned from timing advance this run (tower_learn)
+    Returns: (lat, lon, accuracy) - circle-level estimate when the cell is unknown
     """
-    # Try local database first
-    db_path = "cell_towers.db"
-    if os.path.exists(db_path):
-        try:
-            conn = sqlite3.connect(db_path)
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT lat, lon, range FROM towers 
-                WHERE mcc=? AND mnc=? AND lac=? AND cid=?
-            """, (mcc, mnc, lac, cid))
-            row = cur.fetchone()
-            conn.close()
-            if row:
-                return row
-        except:
-            pass
-    
-    # Try online lookup (if internet available)
-    # Using free APIs
-    apis = [
-        f"http://opencellid.org/cell/get?key=pk.xxx&mcc={mcc}&mnc={mnc}&lac={lac}&cellid={cid}&format=json",
-        f"https://us1.unwiredlabs.com/v2/process.php",  # Requires API key
-    ]
-    
-    # For now, return estimated location based on operator circle
-    return estimate_location(mcc, mnc, lac)
+    key = tower_db.cell_key({'mcc': mcc, 'mnc': mnc, 'lac': lac, 'cid': cid})
+    return (tower_learn.better(tower_db.locate(mcc, mnc, lac, cid), tower_learn.locate(key))
+            or estimate_location(mcc, mnc, lac))
 
 def estimate_location(mcc, mnc, lac):
-    """Estimate rough location from LAC (circle level)"""
-    # Major city coordinates for India operators
+    """Estimate rough location from the operator's circle (capital / main city)"""
     circle_coords = {
-        "Maharashtra": (19.0760, 72.8777),  # Mumbai
+        "Mumbai": (19.0760, 72.8777),
+        "Maharashtra": (18.5204, 73.8567),  # Pune
         "Delhi": (28.6139, 77.2090),
+        "Kolkata": (22.5726, 88.3639),
+        "West Bengal": (22.5726, 88.3639),
+        "Chennai": (13.0827, 80.2707),
+        "Tamil Nadu": (13.0827, 80.2707),
         "Karnataka": (12.9716, 77.5946),  # Bangalore
-        "Tamil Nadu": (13.0827, 80.2707),  # Chennai
         "Gujarat": (23.0225, 72.5714),  # Ahmedabad
-        "UP": (26.8467, 80.9462),  # Lucknow
+        "UP East": (26.8467, 80.9462),  # Lucknow
+        "UP West": (28.9845, 77.7064),  # Meerut
         "Rajasthan": (26.9124, 75.7873),  # Jaipur
-        "West Bengal": (22.5726, 88.3639),  # Kolkata
         "Andhra Pradesh": (17.3850, 78.4867),  # Hyderabad
         "Kerala": (8.5241, 76.9366),  # Trivandrum
         "Punjab": (30.7333, 76.7794),  # Chandigarh
-        "MP": (23.2599, 77.4126),  # Bhopal
+        "Haryana": (30.7333, 76.7794),
+        "Himachal Pradesh": (31.1048, 77.1734),  # Shimla
+        "Jammu Kashmir": (34.0837, 74.7973),  # Srinagar
+        "Madhya Pradesh": (23.2599, 77.4126),  # Bhopal
+        "Bihar": (25.5941, 85.1376),  # Patna
+        "Odisha": (20.2961, 85.8245),  # Bhubaneswar
+        "Assam": (26.1445, 91.7362),  # Guwahati
+        "North East": (25.5788, 91.8933),  # Shillong
+        "Andaman Nicobar": (11.6234, 92.7265),  # Port Blair
     }
+    coords = circle_coords.get(operators.circle(mcc, mnc))
+    if coords:
+        return (coords[0], coords[1], 150000)  # circle level, ~150km
     
     # Return default (India center) if unknown
-    return (20.5937, 78.9629, 50000)  # India center, 50km accuracy
+    return (20.5937, 78.9629, 1500000)
 
 # ============== GPS FUNCTIONS ==============
 def get_current_gps():
     """Get current GPS location from Termux"""
-    out = cmd("termux-location -p gps 2>/dev/null")
-    if out:
-        try:
-            loc = json.loads(out)
-            return (loc.get('latitude'), loc.get('longitude'), loc.get('accuracy', 0))
-        except:
-            pass
+    loc = broker.location('gps')
+    if loc and loc.get('latitude') is not None:
+        return (loc.get('latitude'), loc.get('longitude'), loc.get('accuracy', 0))
     
     # Try network location
-    out = cmd("termux-location -p network 2>/dev/null")
-    if out:
-        try:
-            loc = json.loads(out)
-            return (loc.get('latitude'), loc.get('longitude'), loc.get('accuracy', 0))
-        except:
-            pass
+    loc = broker.location('network')
+    if loc and loc.get('latitude') is not None:
+        return (loc.get('latitude'), loc.get('longitude'), loc.get('accuracy', 0))
     
     return None
 
@@ -301,7 +200,7 @@ def parse_cell_detailed(cell_data):
     """Parse cell data and add detailed info"""
     cells = []
     
-    for cell in cell_data:
+    for cell, ch in zip(cell_data, bands.resolve_all(cell_data)):
         info = {
             'raw': cell,
             'type': cell.get('type', 'Unknown'),
@@ -326,17 +225,14 @@ def parse_cell_detailed(cell_data):
             rssi = cell.get('rssi')
             sinr = cell.get('rssnr') or cell.get('sinr')
             cqi = cell.get('cqi')
-            ta = cell.get('timingAdvance') or cell.get('ta')
-            
-            # Band info
-            band_info = get_band_from_earfcn(earfcn)
+            ta = cell.get('timingAdvance', cell.get('ta'))
             
             # Distance calculation
             distance = None
             if ta and ta >= 0:
                 distance = calculate_distance_ta(ta, "LTE")
             elif rsrp:
-                distance = calculate_distance_rsrp(rsrp, band_info.get('freq', 1800))
+                distance = calculate_distance_rsrp(rsrp, ch['dl'] if ch else 1800)
             
             # eNodeB and Sector
             enodeb = ci // 256 if ci else None
@@ -346,16 +242,16 @@ def parse_cell_detailed(cell_data):
                 'network': '4G LTE',
                 'mcc': mcc,
                 'mnc': mnc,
-                'operator': OPERATORS.get((mcc, mnc), 'Unknown'),
+                'operator': operators.label(mcc, mnc),
                 'tac': tac,
                 'ci': ci,
                 'enodeb': enodeb,
                 'sector': sector,
                 'pci': pci,
                 'earfcn': earfcn,
-                'band': band_info.get('name', 'Unknown'),
-                'band_num': band_info.get('band'),
-                'frequency': band_info.get('freq'),
+                'band': ch['label'] if ch else 'Unknown',
+                'band_num': ch['band'] if ch else None,
+                'frequency': ch['dl'] if ch else None,
                 'rsrp': rsrp,
                 'rsrq': rsrq,
                 'rssi': rssi,
@@ -380,9 +276,6 @@ def parse_cell_detailed(cell_data):
             ss_rsrq = cell.get('ssRsrq') or cell.get('csiRsrq')
             ss_sinr = cell.get('ssSinr') or cell.get('csiSinr')
             
-            # Band
-            nr_band = get_nr_band(nrarfcn)
-            
             # gNodeB
             gnodeb = nci // 4096 if nci else None
             sector = nci % 4096 if nci else None
@@ -391,15 +284,15 @@ def parse_cell_detailed(cell_data):
                 'network': '5G NR',
                 'mcc': mcc,
                 'mnc': mnc,
-                'operator': OPERATORS.get((mcc, mnc), 'Unknown'),
+                'operator': operators.label(mcc, mnc),
                 'tac': tac,
                 'nci': nci,
                 'gnodeb': gnodeb,
                 'sector': sector,
                 'pci': pci,
                 'nrarfcn': nrarfcn,
-                'band': nr_band.get('name', 'Unknown'),
-                'frequency': nr_band.get('freq'),
+                'band': ch['label'] if ch else 'Unknown',
+                'frequency': ch['dl'] if ch else None,
                 'ss_rsrp': ss_rsrp,
                 'ss_rsrq': ss_rsrq,
                 'ss_sinr': ss_sinr,
@@ -436,7 +329,7 @@ def parse_cell_detailed(cell_data):
                 'network': '2G GSM',
                 'mcc': mcc,
                 'mnc': mnc,
-                'operator': OPERATORS.get((mcc, mnc), 'Unknown'),
+                'operator': operators.label(mcc, mnc),
                 'lac': lac,
                 'cid': cid,
                 'arfcn': arfcn,
@@ -468,7 +361,7 @@ def parse_cell_detailed(cell_data):
                 'network': '3G WCDMA',
                 'mcc': mcc,
                 'mnc': mnc,
-                'operator': OPERATORS.get((mcc, mnc), 'Unknown'),
+                'operator': operators.label(mcc, mnc),
                 'lac': lac,
                 'cid': cid,
                 'rnc': rnc,
@@ -481,11 +374,18 @@ def parse_cell_detailed(cell_data):
         
         cells.append(info)
     
+    # Tower positions for the whole list in one indexed query; a position
+    # learned from TA this run wins when its error ellipse is tighter
+    for info, tower in zip(cells, tower_db.locate_cells(cells)):
+        key = tower_db.cell_key(info)
+        info['learned'] = tower_learn.estimate(key) if key else None
+        info['tower'] = tower_learn.better(tower, tower_learn.locate(key))
+    
     return cells
 
 
 # ============== DISPLAY FUNCTIONS ==============
-def display_cell_detailed(cell):
+def display_cell_detailed(cell, out=print):
     """Display detailed cell info like NetMonster"""
     
     is_connected = cell.get('registered', False)
@@ -504,178 +404,306 @@ def display_cell_detailed(cell):
     else:
         net_color = C.R
     
-    print(f"""
+    out(f"""
 {C.BOLD}╔══════════════════════════════════════════════════════════════════╗
 ║ {conn_icon} {net_color}{network}{C.E} - {C.BOLD}{operator}{C.E}{'  [CONNECTED]' if is_connected else ''}
 ╠══════════════════════════════════════════════════════════════════╣{C.E}""")
     
     # ============== IDENTITY ==============
-    print(f"{C.BOLD}│ 📋 IDENTITY{C.E}")
-    print(f"│   MCC: {cell.get('mcc', 'N/A'):<6} MNC: {cell.get('mnc', 'N/A'):<6}")
+    out(f"{C.BOLD}│ 📋 IDENTITY{C.E}")
+    out(f"│   MCC: {cell.get('mcc', 'N/A'):<6} MNC: {cell.get('mnc', 'N/A'):<6}")
     
     if 'LTE' in network:
-        print(f"│   TAC: {cell.get('tac', 'N/A'):<10} CI: {cell.get('ci', 'N/A')}")
-        print(f"│   eNodeB: {cell.get('enodeb', 'N/A'):<8} Sector: {cell.get('sector', 'N/A')}")
-        print(f"│   PCI: {cell.get('pci', 'N/A')}")
+        out(f"│   TAC: {cell.get('tac', 'N/A'):<10} CI: {cell.get('ci', 'N/A')}")
+        out(f"│   eNodeB: {cell.get('enodeb', 'N/A'):<8} Sector: {cell.get('sector', 'N/A')}")
+        out(f"│   PCI: {cell.get('pci', 'N/A')}")
     elif '5G' in network:
-        print(f"│   TAC: {cell.get('tac', 'N/A'):<10} NCI: {cell.get('nci', 'N/A')}")
-        print(f"│   gNodeB: {cell.get('gnodeb', 'N/A'):<8} Sector: {cell.get('sector', 'N/A')}")
-        print(f"│   PCI: {cell.get('pci', 'N/A')}")
+        out(f"│   TAC: {cell.get('tac', 'N/A'):<10} NCI: {cell.get('nci', 'N/A')}")
+        out(f"│   gNodeB: {cell.get('gnodeb', 'N/A'):<8} Sector: {cell.get('sector', 'N/A')}")
+        out(f"│   PCI: {cell.get('pci', 'N/A')}")
     elif 'GSM' in network:
-        print(f"│   LAC: {cell.get('lac', 'N/A'):<10} CID: {cell.get('cid', 'N/A')}")
-        print(f"│   BSIC: {cell.get('bsic', 'N/A')}")
+        out(f"│   LAC: {cell.get('lac', 'N/A'):<10} CID: {cell.get('cid', 'N/A')}")
+        out(f"│   BSIC: {cell.get('bsic', 'N/A')}")
     elif 'WCDMA' in network:
-        print(f"│   LAC: {cell.get('lac', 'N/A'):<10} CID: {cell.get('cid', 'N/A')}")
-        print(f"│   RNC: {cell.get('rnc', 'N/A'):<10} PSC: {cell.get('psc', 'N/A')}")
+        out(f"│   LAC: {cell.get('lac', 'N/A'):<10} CID: {cell.get('cid', 'N/A')}")
+        out(f"│   RNC: {cell.get('rnc', 'N/A'):<10} PSC: {cell.get('psc', 'N/A')}")
     
     # ============== FREQUENCY ==============
-    print(f"│")
-    print(f"{C.BOLD}│ 📡 FREQUENCY{C.E}")
-    print(f"│   Band: {C.C}{cell.get('band', 'N/A')}{C.E}")
-    print(f"│   Frequency: {cell.get('frequency', 'N/A')} MHz")
+    out(f"│")
+    out(f"{C.BOLD}│ 📡 FREQUENCY{C.E}")
+    out(f"│   Band: {C.C}{cell.get('band', 'N/A')}{C.E}")
+    out(f"│   Frequency: {cell.get('frequency', 'N/A')} MHz")
     
     if 'LTE' in network:
-        print(f"│   EARFCN: {cell.get('earfcn', 'N/A')}")
+        out(f"│   EARFCN: {cell.get('earfcn', 'N/A')}")
     elif '5G' in network:
-        print(f"│   NRARFCN: {cell.get('nrarfcn', 'N/A')}")
+        out(f"│   NRARFCN: {cell.get('nrarfcn', 'N/A')}")
     elif 'GSM' in network:
-        print(f"│   ARFCN: {cell.get('arfcn', 'N/A')}")
+        out(f"│   ARFCN: {cell.get('arfcn', 'N/A')}")
     elif 'WCDMA' in network:
-        print(f"│   UARFCN: {cell.get('uarfcn', 'N/A')}")
+        out(f"│   UARFCN: {cell.get('uarfcn', 'N/A')}")
     
     # ============== SIGNAL ==============
-    print(f"│")
-    print(f"{C.BOLD}│ 📶 SIGNAL{C.E}")
+    out(f"│")
+    out(f"{C.BOLD}│ 📶 SIGNAL{C.E}")
     
     if 'LTE' in network:
         rsrp = cell.get('rsrp')
         bars = signal_bars(rsrp)
-        print(f"│   {bars}  Quality: {cell.get('quality', 'N/A')}")
-        print(f"│   RSRP: {rsrp if rsrp else 'N/A'} dBm")
-        print(f"│   RSRQ: {cell.get('rsrq', 'N/A')} dB")
-        print(f"│   RSSI: {cell.get('rssi', 'N/A')} dBm")
-        print(f"│   SINR: {cell.get('sinr', 'N/A')} dB")
-        print(f"│   CQI:  {cell.get('cqi', 'N/A')}")
+        out(f"│   {bars}  Quality: {cell.get('quality', 'N/A')}")
+        out(f"│   RSRP: {rsrp if rsrp else 'N/A'} dBm")
+        out(f"│   RSRQ: {cell.get('rsrq', 'N/A')} dB")
+        out(f"│   RSSI: {cell.get('rssi', 'N/A')} dBm")
+        out(f"│   SINR: {cell.get('sinr', 'N/A')} dB")
+        out(f"│   CQI:  {cell.get('cqi', 'N/A')}")
     elif '5G' in network:
         rsrp = cell.get('ss_rsrp')
         bars = signal_bars(rsrp)
-        print(f"│   {bars}  Quality: {cell.get('quality', 'N/A')}")
-        print(f"│   SS-RSRP: {rsrp if rsrp else 'N/A'} dBm")
-        print(f"│   SS-RSRQ: {cell.get('ss_rsrq', 'N/A')} dB")
-        print(f"│   SS-SINR: {cell.get('ss_sinr', 'N/A')} dB")
+        out(f"│   {bars}  Quality: {cell.get('quality', 'N/A')}")
+        out(f"│   SS-RSRP: {rsrp if rsrp else 'N/A'} dBm")
+        out(f"│   SS-RSRQ: {cell.get('ss_rsrq', 'N/A')} dB")
+        out(f"│   SS-SINR: {cell.get('ss_sinr', 'N/A')} dB")
     elif 'GSM' in network:
         rssi = cell.get('rssi')
         bars = signal_bars(rssi)
-        print(f"│   {bars}")
-        print(f"│   RSSI: {rssi if rssi else 'N/A'} dBm")
+        out(f"│   {bars}")
+        out(f"│   RSSI: {rssi if rssi else 'N/A'} dBm")
     elif 'WCDMA' in network:
         rscp = cell.get('rscp')
         bars = signal_bars(rscp)
-        print(f"│   {bars}")
-        print(f"│   RSCP: {rscp if rscp else 'N/A'} dBm")
-        print(f"│   Ec/No: {cell.get('ecno', 'N/A')} dB")
+        out(f"│   {bars}")
+        out(f"│   RSCP: {rscp if rscp else 'N/A'} dBm")
+        out(f"│   Ec/No: {cell.get('ecno', 'N/A')} dB")
     
     # ============== DISTANCE ==============
-    print(f"│")
-    print(f"{C.BOLD}│ 📍 DISTANCE{C.E}")
+    out(f"│")
+    out(f"{C.BOLD}│ 📍 DISTANCE{C.E}")
     
     ta = cell.get('timing_advance')
     distance = cell.get('distance_m')
     
     if ta is not None:
-        print(f"│   Timing Advance: {ta}")
+        out(f"│   Timing Advance: {ta}")
     
     if distance:
         if distance < 1000:
-            print(f"│   Estimated Distance: {C.Y}{distance:.0f} m{C.E}")
+            out(f"│   Estimated Distance: {C.Y}{distance:.0f} m{C.E}")
         else:
-            print(f"│   Estimated Distance: {C.Y}{distance/1000:.2f} km{C.E}")
+            out(f"│   Estimated Distance: {C.Y}{distance/1000:.2f} km{C.E}")
     else:
-        print(f"│   Estimated Distance: N/A")
+        out(f"│   Estimated Distance: N/A")
     
-    print(f"╚══════════════════════════════════════════════════════════════════╝")
+    tower = cell.get('tower')
+    if tower:
+        lat, lon, rng = tower
+        out(f"│   Tower: {lat:.5f}, {lon:.5f}" + (f" (±{rng} m)" if rng else ""))
+    learned = cell.get('learned')
+    if learned:
+        out(f"│   Learned: {learned['samples']} TA fixes, {learned['sectors']} sector(s), "
+            f"95% ellipse {learned['major']:.0f}×{learned['minor']:.0f} m @{learned['axis']:.0f}°")
+    
+    out(f"╚══════════════════════════════════════════════════════════════════╝")
 
 
 # ============== COMPASS DISPLAY ==============
-def display_compass(cells, gps_location=None):
-    """Display tower directions as compass"""
-    
-    print(f"""
+NEARBY_SITES = 5     # sites listed under the compass
+MAP_SITES = 12       # sites plotted on the satellite view
+OPERATOR_COLORS = {'Airtel': C.R, 'Jio': C.G, 'Vi': C.Y, 'BSNL': C.B, 'MTNL': C.M}
+
+def format_distance(d):
+    """'850m' / '2.4km'"""
+    if d is None:
+        return "?"
+    return f"{d:.0f}m" if d < 1000 else f"{d/1000:.1f}km"
+
+ROSE_RADIUS = 6      # compass ring radius in rows; columns are doubled to look round
+AHEAD = 15           # degrees either side of the phone's top that count as ahead
+
+def compass_targets(cells, gps_location):
+    """Distance / bearing from the fix to every visible tower and the nearest
+    sites, once per scan; a new heading only rotates them.
+    Returns (towers, sites) - towers: [(cell, distance, bearing)], None when unknown"""
+    towers = []
+    for cell in cells:
+        tower = cell.get('tower')
+        if gps_location and tower:
+            lat, lon = gps_location[0], gps_location[1]
+            towers.append((cell, calculate_distance_gps(lat, lon, tower[0], tower[1]),
+                           calculate_bearing(lat, lon, tower[0], tower[1])))
+        else:
+            towers.append((cell, None, None))
+    sites = []
+    if gps_location:
+        sites = tower_db.nearest(gps_location[0], gps_location[1], NEARBY_SITES)
+        seen = set(filter(None, map(tower_db.cell_key, cells)))
+        for site in sites:
+            site['seen'] = (site['mcc'], site['mnc'], site['lac'], site['cid']) in seen
+    return towers, sites
+
+def draw_rose(points, heading=None):
+    """Compass ring as text rows. points: (bearing, distance, mark) drawn later
+    wins; with a heading the phone's top is up, else north is up"""
+    r = ROSE_RADIUS
+    grid = [[" "] * (4 * r + 1) for _ in range(2 * r + 1)]
+    turn = heading or 0.0
+    
+    def put(bearing, radius, mark):
+        a = math.radians(bearing - turn)
+        grid[r - int(round(radius * math.cos(a)))][2 * r + int(round(2 * radius * math.sin(a)))] = mark
+    
+    for b in range(0, 360, 10):
+        put(b, r, f"{C.DIM}·{C.E}")
+    for b, name in ((0, "N"), (90, "E"), (180, "S"), (270, "W")):
+        put(b, r, f"{C.BOLD}{C.R if name == 'N' else C.W}{name}{C.E}")
+    # Nearer towers closer to the centre (square root keeps close ones apart)
+    far = max([d for _, d, _ in points if d] or [1])
+    for bearing, d, mark in points:
+        put(bearing, (r - 1) * (0.3 + 0.7 * math.sqrt((d or far) / far)), mark)
+    grid[r][2 * r] = f"{C.C}{C.BOLD}{'▲' if heading is not None else '+'}{C.E}"
+    return ["".join(row) for row in grid]
+
+def display_compass(cells, gps_location=None, out=print, heading=None, targets=None):
+    """Display tower directions as compass (targets: from compass_targets, so a
+    redraw for a new heading does no tower queries)"""
+    
+    towers, sites = targets if targets is not None else compass_targets(cells, gps_location)
+    
+    out(f"""
 {C.BOLD}╔══════════════════════════════════════════════════════════════════╗
 ║                    🧭 TOWER COMPASS                               ║
 ╠══════════════════════════════════════════════════════════════════╣{C.E}""")
     
     if not gps_location:
-        print(f"│   {C.Y}GPS not available - showing relative positions{C.E}")
-    
-    # ASCII Compass
-    print(f"""│
-│                          {C.BOLD}N{C.E}
-│                          ↑
-│                     NW   │   NE
-│                       ╲  │  ╱
-│                   W ────●──── E
-│                       ╱  │  ╲
-│                     SW   │   SE
-│                          ↓
-│                          {C.BOLD}S{C.E}
-│""")
+        out(f"│   {C.Y}GPS not available - directions unknown, distances estimated{C.E}")
+    else:
+        lat, lon, acc = gps_location
+        out(f"│   You: {lat:.5f}, {lon:.5f}" + (f" (±{acc:.0f} m)" if acc else ""))
+    if heading is None:
+        out(f"│   {C.DIM}No heading sensor - north up{C.E}")
+    else:
+        out(f"│   Heading: {C.BOLD}{heading:3.0f}° {get_direction_arrow(heading).split()[-1]}{C.E}"
+            f"  {C.DIM}(top of the phone is up){C.E}")
+    
+    # Sites first, then scanned towers, the serving cell on top
+    points = []
+    for site in sites:
+        if not site['seen']:
+            name = operators.name(site['mcc'], site['mnc'], '?')
+            points.append((site['bearing'], site['distance'],
+                           f"{OPERATOR_COLORS.get(name, C.W)}{name[0]}{C.E}"))
+    for cell, d, b in sorted(towers, key=lambda t: bool(t[0].get('registered'))):
+        if b is not None:
+            points.append((b, d, f"{C.G}{C.BOLD}◉{C.E}" if cell.get('registered') else f"{C.Y}○{C.E}"))
+    out("│")
+    for row in draw_rose(points, heading):
+        out(f"│                 {row}")
+    out(f"│   {C.G}◉{C.E} serving  {C.Y}○{C.E} neighbour  {C.R}A{C.E}/{C.G}J{C.E}/{C.Y}V{C.E}/{C.B}B{C.E} nearby site")
+    
+    def direction(b):
+        if b is None:
+            return "?"
+        text = f"{get_direction_arrow(b)} {b:3.0f}°"
+        if heading is not None:
+            rel = (b - heading + 180) % 360 - 180
+            text += " ahead" if abs(rel) <= AHEAD else f" {abs(rel):3.0f}° {'right' if rel > 0 else 'left'}"
+        return text
     
     # List towers with direction
-    print(f"│   {C.BOLD}Towers:{C.E}")
-    for i, cell in enumerate(cells[:5]):
+    out(f"│   {C.BOLD}Towers:{C.E}")
+    for cell, d, b in towers[:5]:
         op = cell.get('operator', '?')[:8]
         net = cell.get('network', '?')[:6]
-        dist = cell.get('distance_m')
-        
-        if dist:
-            if dist < 1000:
-                dist_str = f"{dist:.0f}m"
-            else:
-                dist_str = f"{dist/1000:.1f}km"
-        else:
-            dist_str = "?"
-        
-        # Simulated direction (would need real GPS + tower coords)
-        directions = ["↑ N", "↗ NE", "→ E", "↘ SE", "↓ S", "↙ SW", "← W", "↖ NW"]
-        direction = directions[i % 8]
-        
+        dist_str = format_distance(d) if d is not None else "~" + format_distance(cell.get('distance_m'))
         conn = "●" if cell.get('registered') else "○"
-        print(f"│   {conn} {op:<8} {net:<6} {direction:<5} ~{dist_str}")
+        out(f"│   {conn} {op:<8} {net:<6} {direction(b):<21} {dist_str}")
     
-    print(f"╚══════════════════════════════════════════════════════════════════╝")
+    if gps_location:
+        out(f"│")
+        out(f"│   {C.BOLD}Nearest sites:{C.E}" + ("" if sites else f" {C.DIM}none in cell_towers.db{C.E}"))
+        for site in sites:
+            op = operators.name(site['mcc'], site['mnc'])[:8]
+            seen = "●" if site['seen'] else " "
+            out(f"│   {seen} {op:<8} {site['radio'] or '?':<6} {direction(site['bearing']):<21} "
+                f"{format_distance(site['distance'])}  {C.DIM}{site['lac']}-{site['cid']}{C.E}")
+    
+    out(f"╚══════════════════════════════════════════════════════════════════╝")
 
 # ============== SATELLITE VIEW (ASCII) ==============
-def display_satellite_view(cells):
+MAP_COLS = 21        # grid columns (3 characters each)
+MAP_ROWS = 11        # grid rows; a column spans ~1.5 rows of ground distance
+
+def display_satellite_view(cells, gps_location=None, out=print):
     """ASCII satellite/map view of towers"""
     
-    print(f"""
+    out(f"""
 {C.BOLD}╔══════════════════════════════════════════════════════════════════╗
 ║                    🛰️ SATELLITE VIEW                              ║
-╠══════════════════════════════════════════════════════════════════╣{C.E}
-│                                                                  │
-│      ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·            │
-│      ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·            │
-│      ·  ·  ·  ·  ·  {C.R}📡{C.E}  ·  ·  ·  ·  ·  ·  ·  ·  ·            │
-│      ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  {C.G}📡{C.E}  ·  ·  ·            │
-│      ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·            │
-│      ·  ·  ·  {C.Y}📡{C.E}  ·  ·  ·  {C.C}📱{C.E}  ·  ·  ·  ·  ·  ·  ·            │
-│      ·  ·  ·  ·  ·  ·  · YOU ·  ·  ·  ·  ·  ·  ·  ·            │
-│      ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·            │
-│      ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  {C.B}📡{C.E}  ·  ·  ·  ·            │
-│      ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·  ·            │
-│                                                                  │
-│   {C.R}📡{C.E} Airtel   {C.G}📡{C.E} Jio   {C.Y}📡{C.E} Vi   {C.B}📡{C.E} BSNL   {C.C}📱{C.E} You        │
-╚══════════════════════════════════════════════════════════════════╝""")
+╠══════════════════════════════════════════════════════════════════╣{C.E}""")
+    
+    sites = []
+    if gps_location:
+        lat, lon = gps_location[0], gps_location[1]
+        sites = tower_db.nearest(lat, lon, MAP_SITES)
+    if not sites:
+        out(f"│   {C.Y}Needs a GPS fix and cell_towers.db (see tower_import.py){C.E}")
+        out(f"╚══════════════════════════════════════════════════════════════════╝")
+        return
+    
+    # Serving / neighbour towers from the scan are drawn even when farther away
+    serving = {}
+    for cell in cells:
+        key, tower = tower_db.cell_key(cell), cell.get('tower')
+        if key and tower:
+            serving[key] = cell.get('registered')
+            if not any((s['mcc'], s['mnc'], s['lac'], s['cid']) == key for s in sites):
+                sites.append({'mcc': key[0], 'mnc': key[1], 'lac': key[2], 'cid': key[3],
+                              'lat': tower[0], 'lon': tower[1],
+                              'distance': calculate_distance_gps(lat, lon, tower[0], tower[1]),
+                              'bearing': calculate_bearing(lat, lon, tower[0], tower[1])})
+    
+    # North / east offsets in metres, scaled so the farthest site fits
+    points = []
+    for site in sites:
+        a = math.radians(site['bearing'])
+        key = (site['mcc'], site['mnc'], site['lac'], site['cid'])
+        points.append((site['distance'] * math.cos(a), site['distance'] * math.sin(a), key, site))
+    half_rows, half_cols = MAP_ROWS // 2, MAP_COLS // 2
+    row_m = max(max(abs(p[0]) for p in points) / half_rows,
+                max(abs(p[1]) for p in points) / (half_cols * 1.5), 10)
+    
+    grid = [[f"{C.DIM}·{C.E}"] * MAP_COLS for _ in range(MAP_ROWS)]
+    # Farthest first so nearer sites win a shared grid cell; scanned cells last,
+    # the serving cell on top
+    points.sort(key=lambda p: -2 if serving.get(p[2]) else -1 if p[2] in serving
+                else p[3]['distance'], reverse=True)
+    for n, e, key, site in points:
+        row = half_rows - int(round(n / row_m))
+        col = half_cols + int(round(e / (row_m * 1.5)))
+        name = operators.name(site['mcc'], site['mnc'], '?')
+        if key in serving:
+            mark = "◉" if serving[key] else "○"
+        else:
+            mark = name[0]
+        grid[row][col] = f"{OPERATOR_COLORS.get(name, C.W)}{C.BOLD}{mark}{C.E}"
+    grid[half_rows][half_cols] = f"{C.C}{C.BOLD}@{C.E}"
+    
+    out(f"│   {C.BOLD}N ↑{C.E}")
+    for row in grid:
+        out("│   " + "  ".join(row))
+    out(f"│")
+    out(f"│   {C.DIM}1 row ≈ {format_distance(row_m)}, 1 column ≈ {format_distance(row_m * 1.5)}{C.E}")
+    out(f"│   {C.R}A{C.E} Airtel  {C.G}J{C.E} Jio  {C.Y}V{C.E} Vi  {C.B}B{C.E} BSNL  "
+        f"◉ serving  ○ neighbour  {C.C}@{C.E} You")
+    out(f"╚══════════════════════════════════════════════════════════════════╝")
 
 # ============== NEIGHBOR CELLS ==============
-def display_neighbors(cells):
+def display_neighbors(cells, out=print):
     """Display neighbor cells summary"""
     
     connected = [c for c in cells if c.get('registered')]
     neighbors = [c for c in cells if not c.get('registered')]
     
-    print(f"""
+    out(f"""
 {C.BOLD}╔══════════════════════════════════════════════════════════════════╗
 ║                    📊 CELL SUMMARY                                ║
 ╠══════════════════════════════════════════════════════════════════╣{C.E}
@@ -688,10 +716,10 @@ def display_neighbors(cells):
         op = c.get('operator', 'Unknown')
         ops[op] = ops.get(op, 0) + 1
     
-    print(f"│   {C.BOLD}By Operator:{C.E}")
+    out(f"│   {C.BOLD}By Operator:{C.E}")
     for op, count in sorted(ops.items(), key=lambda x: -x[1]):
         bar = "█" * min(count, 20)
-        print(f"│     {op:<10} {bar} {count}")
+        out(f"│     {op:<10} {bar} {count}")
     
     # Count by network type
     nets = {}
@@ -699,21 +727,20 @@ def display_neighbors(cells):
         net = c.get('network', 'Unknown')
         nets[net] = nets.get(net, 0) + 1
     
-    print(f"│")
-    print(f"│   {C.BOLD}By Network:{C.E}")
+    out(f"│")
+    out(f"│   {C.BOLD}By Network:{C.E}")
     for net, count in sorted(nets.items()):
-        print(f"│     {net:<10} {count}")
+        out(f"│     {net:<10} {count}")
     
-    print(f"╚══════════════════════════════════════════════════════════════════╝")
+    out(f"╚══════════════════════════════════════════════════════════════════╝")
 
 
 # ============== MAIN SCANNER ==============
 def scan_cells():
     """Scan and return detailed cell info"""
-    out = cmd("termux-telephony-cellinfo 2>/dev/null")
-    if out:
+    raw_cells = broker.cell_info()
+    if raw_cells:
         try:
-            raw_cells = json.loads(out)
             return parse_cell_detailed(raw_cells)
         except:
             pass
@@ -723,19 +750,49 @@ def clear():
     os.system('clear' if os.name != 'nt' else 'cls')
 
 # ============== LIVE DASHBOARD ==============
+# Each refresh is streamed to rotating export files (export.EXPORT_DIR)
+EXPORT = export.Exporter('cell_intelligence')
+REFRESH = 5          # seconds between cell scans
+
+def turn_compass(scr, before, after, cells, gps, targets, heading, seconds):
+    """Until the next scan, redraw with the compass turned to each new heading
+    reading; the rest of the frame and the tower bearings are reused as-is"""
+    deadline = time.monotonic() + seconds
+    drawn = None
+    while True:
+        h = heading.latest()
+        shown = None if h is None else round(h)
+        if drawn is None or shown != drawn[0]:
+            frame = scr.frame()
+            frame.extend(before)
+            display_compass(cells, gps, frame.print, h, targets)
+            frame.extend(after)
+            scr.draw(frame)
+            drawn = (shown,)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        heading.wait(min(remaining, 1.0))
+
 def live_cell_dashboard():
     """Live updating cell dashboard"""
     
     print(f"{C.C}Starting Cell Intelligence...{C.E}")
+    heading = broker.heading_stream()   # one termux-sensor process for the whole run
+    EXPORT.start()
+    if EXPORT.error:
+        print(f"{C.R}Export unavailable ({EXPORT.error}) - not exporting{C.E}")
     time.sleep(1)
     
+    scr = screen.Screen()
     try:
         while True:
-            clear()
+            frame = scr.frame()
+            out = frame.print
             
             # Header
             now = datetime.now().strftime("%H:%M:%S")
-            print(f"""
+            out(f"""
 {C.C}{C.BOLD}╔══════════════════════════════════════════════════════════════════════╗
 ║           📡 CELL INTELLIGENCE - NetMonster Style                     ║
 ║                    Live Cell Tower Analysis                           ║
@@ -748,42 +805,46 @@ def live_cell_dashboard():
             cells = scan_cells()
             
             if not cells:
-                print(f"{C.Y}No cell data available. Make sure Termux:API is installed.{C.E}")
-                print(f"{C.DIM}Install: pkg install termux-api{C.E}")
-                print(f"{C.DIM}Also install Termux:API app from F-Droid{C.E}")
+                out(f"{C.Y}No cell data available. Make sure Termux:API is installed.{C.E}")
+                out(f"{C.DIM}Install: pkg install termux-api{C.E}")
+                out(f"{C.DIM}Also install Termux:API app from F-Droid{C.E}")
+                scr.draw(frame)
                 time.sleep(5)
                 continue
             
             # Display summary
-            display_neighbors(cells)
+            display_neighbors(cells, out)
             
-            # Display compass
-            display_compass(cells)
+            # Compass (streamed GPS fix: no subprocess once it is running)
+            gps = get_current_gps()
+            if gps:
+                EXPORT.observe('gps', {'latitude': gps[0], 'longitude': gps[1], 'accuracy': gps[2]})
+            EXPORT.observe('cell', cells)
+            # TA + GPS pairs refine tower positions; written to cell_towers.db each minute
+            tower_learn.observe(cells, gps)
+            tower_learn.LEARNER.save()
+            targets = compass_targets(cells, gps)
             
-            # Display each cell in detail
+            # Everything below the compass only changes with the next scan
+            after = scr.frame()
             for cell in cells[:4]:  # Show top 4
-                display_cell_detailed(cell)
-            
-            # Satellite view
-            display_satellite_view(cells)
+                display_cell_detailed(cell, after.print)
+            display_satellite_view(cells, gps, after.print)
+            after.print(f"\n{C.DIM}Auto-refreshing in {REFRESH} seconds...{C.E}")
             
-            # Refresh
-            print(f"\n{C.DIM}Auto-refreshing in 5 seconds...{C.E}")
-            time.sleep(5)
+            turn_compass(scr, frame, after, cells, gps, targets, heading, REFRESH)
             
     except KeyboardInterrupt:
-        clear()
+        scr.leave()
+        heading.stop()
         print(f"\n{C.G}Cell Intelligence stopped.{C.E}")
         
-        # Export option
-        cells = scan_cells()
-        if cells:
-            export = input(f"{C.Y}Export cell data? (y/n): {C.E}").strip().lower()
-            if export == 'y':
-                filename = f"cell_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                with open(filename, 'w') as f:
-                    json.dump(cells, f, indent=2, default=str)
-                print(f"{C.G}Saved to {filename}{C.E}")
+        EXPORT.close()
+        for path in EXPORT.files:
+            print(f"{C.G}Saved to {path}{C.E}")
+        tower_learn.LEARNER.save(force=True)
+        if tower_learn.LEARNER.summary():
+            print(f"{C.G}Tower positions: {tower_learn.LEARNER.summary()}{C.E}")
 
 # ============== SINGLE SCAN MODE ==============
 def single_scan():
@@ -797,13 +858,19 @@ def single_scan():
         print(f"{C.R}No cell data available.{C.E}")
         return
     
+    gps = get_current_gps()
+    tower_learn.observe(cells, gps)
+    tower_learn.LEARNER.save(force=True)
+    stream = broker.heading_stream()
+    heading = stream.wait(1.5)
+    stream.stop()
     display_neighbors(cells)
-    display_compass(cells)
+    display_compass(cells, gps, heading=heading)
     
     for cell in cells:
         display_cell_detailed(cell)
     
-    display_satellite_view(cells)
+    display_satellite_view(cells, gps)
 
 # ============== MAIN ==============
 def main():
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+🏷️ CLASSIFIER - Shared device classifier for the WiFi / Bluetooth scanners
+Keyword rules compiled into one regex per field, memoised per (mac, name, ssid)
+"""
+
+import re
+from functools import lru_cache
+
+import oui
+
+# ============== RULES ==============
+# Highest priority first: kind, icon, detail, risk, OUI category, fields, keywords.
+# A vendor (OUI) hit counts like a keyword hit of the same rule and wins ties.
+# Audio / Wearable sit above Phone so 'Galaxy Buds', 'Mi Band', 'Redmi Watch'
+# are not reported as phones; the bare 'smart' only decides when nothing
+# more specific matched ('Samsung Smart TV', 'Mi Smart Band').
+RULES = (
+    ('Camera', '📷', 'Suspected', 'MEDIUM', oui.CAMERA, ('name', 'ssid'),
+     ('cam', 'ipcam', 'camera', 'dvr', 'nvr', 'cctv', 'hikvision', 'dahua')),
+    ('IoT', '🏠', 'Smart Home', 'LOW', oui.IOT, ('name',),
+     ('nest', 'echo', 'alexa', 'google home', 'tuya', 'hue')),
+    ('Smart TV', '📺', 'Detected', 'LOW', oui.TV, ('name', 'ssid'),
+     ('tv', 'roku', 'fire tv', 'chromecast', 'android tv')),
+    ('Laptop', '💻', 'Detected', 'LOW', None, ('name',),
+     ('laptop', 'macbook', 'thinkpad', 'dell', 'hp pavilion')),
+    ('Printer', '🖨️', 'Detected', 'LOW', oui.PRINTER, ('name', 'ssid'),
+     ('printer', 'print', 'hp ', 'canon', 'epson', 'brother', 'deskjet')),
+    ('Audio', '🎧', 'Detected', 'LOW', None, ('name',),
+     ('airpod', 'buds', 'earphone', 'headphone', 'jbl', 'speaker', 'soundbar', 'sony wf')),
+    ('Wearable', '⌚', 'Detected', 'LOW', None, ('name',),
+     ('band', 'watch', 'fit', 'amazfit')),
+    ('Phone', '📱', 'Mobile', 'LOW', oui.PHONE, ('name',),
+     ('iphone', 'samsung', 'xiaomi', 'oneplus', 'redmi', 'realme', 'oppo', 'vivo', 'phone')),
+    ('Input', '⌨️', 'Detected', 'LOW', None, ('name',),
+     ('keyboard', 'mouse', 'logitech')),
+    ('Car', '🚗', 'Detected', 'LOW', None, ('name',),
+     ('ford', 'honda', 'toyota', 'hyundai', 'carplay', 'car kit')),
+    ('IoT', '🏠', 'Smart Home', 'LOW', None, ('name',),
+     ('smart',)),
+    ('Router', '📡', 'Detected', 'LOW', None, ('name', 'ssid'),
+     ('router', 'gateway', 'ap-', 'access point')),
+    ('WiFi Direct', '📲', 'Detected', 'LOW', None, ('ssid',),
+     ('direct-',)),
+)
+
+UNKNOWN = ('📟', 'Unknown', 'Device', 'LOW')
+
+
+def _compile(field):
+    """One lookahead alternation per field: finditer() reports the best-ranked
+    keyword starting at every position, overlapping matches included"""
+    rank = {}
+    for i, rule in enumerate(RULES):
+        if field in rule[5]:
+            for kw in rule[6]:
+                rank.setdefault(kw, i)
+    # Same start position: better rule first, then longer keyword
+    words = sorted(rank, key=lambda kw: (rank[kw], -len(kw)))
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, words)) + '))')
+    return pattern, rank
+
+
+NAME_RE, NAME_RANK = _compile('name')
+SSID_RE, SSID_RANK = _compile('ssid')
+OUI_RANK = {rule[4]: i for i, rule in enumerate(RULES) if rule[4] is not None}
+
+
+def _best(pattern, rank, text, best):
+    for m in pattern.finditer(text):
+        i = rank[m.group(1)]
+        if i < best:
+            best = i
+            if i == 0:
+                break
+    return best
+
+
+# ============== CLASSIFY ==============
+@lru_cache(maxsize=2048)
+def classify(mac, name='', ssid=''):
+    """(icon, kind, detail, risk) for a device; cached per (mac, name, ssid)"""
+    vendor, category = oui.lookup(mac) if mac else (None, None)
+    vendor_rank = OUI_RANK.get(category, len(RULES))
+    best = vendor_rank
+    if name:
+        best = _best(NAME_RE, NAME_RANK, name.lower(), best)
+    if ssid and best:
+        best = _best(SSID_RE, SSID_RANK, ssid.lower(), best)
+    if best == len(RULES):
+        return (UNKNOWN[0], UNKNOWN[1], vendor or UNKNOWN[2], UNKNOWN[3])
+    kind, icon, detail, risk = RULES[best][:4]
+    if best == vendor_rank:
+        # Vendor-confirmed: name the vendor; a camera OUI is a sure hit
+        return (icon, kind, vendor, 'HIGH' if category == oui.CAMERA else risk)
+    return (icon, kind, detail, risk)
+
+
+def stats():
+    """Memo cache hits / misses / size"""
+    info = classify.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+🔄 COLLECTOR - asyncio collection loop for the 8xRadar dashboards
+One background thread, one task per source, deadlines + cancellation
+"""
+
+import asyncio
+import threading
+import time
+
+import broker
+import scheduler
+
+
+# ============== SOURCE FETCHERS ==============
+def source(name, timeout=15):
+    """Fetcher for a plain Termux:API source ('wifi', 'bluetooth', 'cell')"""
+    return lambda: broker.afetch(name, timeout=timeout)
+
+
+def location_source(provider='gps'):
+    """Fetcher for a location provider (uses the long-lived reader when fresh)"""
+    return lambda: broker.alocation(provider)
+
+
+def network_source(timeout=60):
+    """Fetcher for the gateway /24 ping sweep"""
+    return lambda: broker.anetwork_sweep(timeout)
+
+
+# ============== COLLECTOR ==============
+class Source:
+    """One collected source and its counters"""
+
+    def __init__(self, name, fetch, handler, schedule, deadline):
+        self.name = name
+        self.fetch = fetch
+        self.handler = handler
+        self.schedule = schedule
+        self.deadline = deadline
+        self.timeouts = 0
+        self.errors = 0
+        self.latency = 0.0
+        self.last_run = 0.0
+
+
+class Collector:
+    """Runs every source concurrently, never two instances of the same one"""
+
+    def __init__(self, on_state=None, on_update=None):
+        self.sources = {}
+        self.busy = set()
+        self.on_state = on_state      # on_state(name, busy)
+        self.on_update = on_update    # on_update(name) after a handler ran
+        self.loop = None
+        self.thread = None
+        self._stop = None
+
+    def add(self, name, fetch, handler, interval=5, deadline=20, max_interval=None):
+        """fetch: async callable returning raw output; handler(raw) parses it.
+        interval is the target; the scheduler adapts around it."""
+        schedule = scheduler.Schedule(interval, max_interval)
+        self.sources[name] = Source(name, fetch, handler, schedule, deadline)
+
+    def _state(self, name, busy):
+        if busy:
+            self.busy.add(name)
+        else:
+            self.busy.discard(name)
+        if self.on_state:
+            try:
+                self.on_state(name, busy)
+            except Exception:
+                pass
+
+    async def _collect(self, src):
+        """Fetch under a deadline, then hand the raw output to the parser"""
+        self._state(src.name, True)
+        src.schedule.started()
+        start = time.monotonic()
+        try:
+            raw = await asyncio.wait_for(src.fetch(), src.deadline)
+        except asyncio.TimeoutError:
+            src.timeouts += 1
+            raw = None
+        except Exception:
+            src.errors += 1
+            raw = None
+        finally:
+            src.latency = time.monotonic() - start
+            src.last_run = time.time()
+            self._state(src.name, False)
+        if raw is None:
+            src.schedule.failed(src.latency)
+            return
+        src.schedule.observe(raw, src.latency)
+        try:
+            src.handler(raw)
+        except Exception:
+            src.errors += 1
+        if self.on_update:
+            self.on_update(src.name)
+
+    async def _source_loop(self, src):
+        while not self._stop.is_set():
+            await self._collect(src)
+            try:
+                await asyncio.wait_for(self._stop.wait(), src.schedule.delay())
+            except asyncio.TimeoutError:
+                pass
+
+    async def _main(self):
+        self._stop = asyncio.Event()
+        tasks = [asyncio.create_task(self._source_loop(src), name=src.name)
+                 for src in self.sources.values()]
+        await self._stop.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def run(self):
+        """Run the loop in the calling thread until stop()"""
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._main())
+        finally:
+            self.loop.close()
+
+    def start(self):
+        """Run the loop in a single daemon thread"""
+        self.thread = threading.Thread(target=self.run, name='collector', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.loop and self._stop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._stop.set)
+
+    def stats(self):
+        """{name: {runs, timeouts, errors, interval, period, lag, ...}} for status lines"""
+        return {name: dict(s.schedule.status(), timeouts=s.timeouts, errors=s.errors)
+                for name, s in self.sources.items()}
+
+    def summary(self):
+        """Observed vs target period per source, e.g. 'cell 3.4s/3s (+0.4)'"""
+        return scheduler.summary({name: s.schedule for name, s in self.sources.items()})
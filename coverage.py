@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+🗺️ COVERAGE - Geo-binned RSRP / RSRQ / SINR heatmap per operator and band
+Every (GPS fix, cell sample) pair lands in a grid bin holding running
+count / mean / variance / min / max, so memory grows with the area covered
+
+  python coverage.py [radar_sessions.db | bins.csv ...] [--session N] [--since MINUTES]
+                     [--grid METRES | --geohash PRECISION] [--geojson FILE] [--csv FILE]
+"""
+
+import csv
+import json
+import math
+import sqlite3
+import sys
+import time
+from array import array
+
+import bands
+import operators
+import session_store
+
+GRID_M = 100            # default bin size (metres)
+METRICS = ('rsrp', 'rsrq', 'sinr')
+UNKNOWN = 2147483647    # Android's "unavailable"
+EARTH_M = 111320.0      # metres per degree of latitude
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+# ============== GRIDS ==============
+class MetreGrid:
+    """Square-ish bins of size_m: fixed latitude rows, longitude step per row.
+    Keys depend only on the position, so bins of different sessions line up."""
+
+    def __init__(self, size_m=GRID_M):
+        self.size_m = float(size_m)
+        self.dlat = self.size_m / EARTH_M
+        self.spec = f"{self.size_m:g}m"
+
+    def _dlon(self, row):
+        mid = (row + 0.5) * self.dlat - 90
+        return self.dlat / max(math.cos(math.radians(mid)), 0.01)
+
+    def key(self, lat, lon):
+        row = int((lat + 90) // self.dlat)
+        col = int((lon + 180) // self._dlon(row))
+        return row << 32 | col
+
+    def bounds(self, key):
+        """(south, west, north, east) of a bin"""
+        row, col = key >> 32, key & 0xFFFFFFFF
+        dlon = self._dlon(row)
+        south, west = row * self.dlat - 90, col * dlon - 180
+        return south, west, south + self.dlat, west + dlon
+
+    def label(self, key):
+        return f"{key >> 32}:{key & 0xFFFFFFFF}"
+
+
+class GeohashGrid:
+    """Geohash cells of a given precision (7 = ~153 x 153 m), keyed by their bits"""
+
+    def __init__(self, precision=7):
+        self.precision = int(precision)
+        self.bits = 5 * self.precision
+        self.spec = f"geohash{self.precision}"
+
+    def key(self, lat, lon):
+        lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+        key = 0
+        for i in range(self.bits):
+            if i % 2 == 0:   # even bits split longitude
+                mid = (lon_lo + lon_hi) / 2
+                bit = lon >= mid
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                bit = lat >= mid
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            key = key << 1 | bit
+        return key
+
+    def bounds(self, key):
+        lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+        for i in range(self.bits):
+            bit = key >> (self.bits - 1 - i) & 1
+            if i % 2 == 0:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+        return lat_lo, lon_lo, lat_hi, lon_hi
+
+    def label(self, key):
+        return ''.join(_BASE32[key >> 5 * (self.precision - 1 - i) & 31]
+                       for i in range(self.precision))
+
+
+def grid_of(spec):
+    """Grid from its spec string ('100m', 'geohash7')"""
+    if spec.startswith('geohash'):
+        return GeohashGrid(int(spec[7:]))
+    return MetreGrid(float(spec.rstrip('m')))
+
+
+# ============== CELL SAMPLES ==============
+def _plmn_operator(cell):
+    """Operator of a raw or parsed cell record, None when it carries no PLMN"""
+    mcc, mnc = cell.get('mcc'), cell.get('mnc')
+    if mcc and mnc is not None and mcc != UNKNOWN and mnc != UNKNOWN:
+        return operators.name(mcc, mnc)
+    op = cell.get('operator')
+    return op if op and op != 'Unknown' else None
+
+
+def band_of(cell):
+    """'B3' / 'n78', else the radio ('GSM', 'WCDMA')"""
+    ch = bands.channel(cell)
+    if ch:
+        return ch['name']
+    kind = (cell.get('type') or '').upper()
+    for rat in ('GSM', 'WCDMA', 'UMTS', 'CDMA'):
+        if rat in kind:
+            return rat
+    return kind or '?'
+
+
+def metrics_of(cell):
+    """(rsrp, rsrq, sinr) of a raw or parsed record, None where unreported"""
+    values = (cell.get('rsrp') or cell.get('ssRsrp') or cell.get('ss_rsrp'),
+              cell.get('rsrq') or cell.get('ssRsrq') or cell.get('ss_rsrq'),
+              cell.get('rssnr') or cell.get('sinr') or cell.get('ssSinr') or cell.get('ss_sinr'))
+    return tuple(None if v is None or v == UNKNOWN else v for v in values)
+
+
+def samples(cells):
+    """(operator, band, metrics) of one scan. Neighbours usually come without a
+    PLMN; they take the serving operator when only one operator is registered."""
+    serving = {_plmn_operator(c) for c in cells if c.get('registered')} - {None}
+    fallback = next(iter(serving)) if len(serving) == 1 else None
+    for c in cells:
+        op = _plmn_operator(c) or fallback
+        values = metrics_of(c)
+        if op and any(v is not None for v in values):
+            yield op, band_of(c), values
+
+
+# ============== HEATMAP ==============
+class Heatmap:
+    """Bins of (operator, band, grid cell) in parallel columns; per metric a
+    Welford count / mean / M2 plus min and max"""
+
+    def __init__(self, grid=None):
+        self.grid = grid or MetreGrid()
+        self.layers = []             # (operator, band), referred to by index
+        self.layer_ids = {}
+        self.index = {}              # tile << 16 | layer -> bin
+        self.layer = array('H')
+        self.tile = array('Q')
+        self.samples = array('L')
+        self.stats = {m: (array('L'), array('d'), array('d'), array('d'), array('d'))
+                      for m in METRICS}   # n, mean, m2, min, max
+        self.positions = 0
+
+    def __len__(self):
+        return len(self.tile)
+
+    def _bin(self, layer, tile):
+        key = tile << 16 | layer
+        i = self.index.get(key)
+        if i is None:
+            i = self.index[key] = len(self.tile)
+            self.layer.append(layer)
+            self.tile.append(tile)
+            self.samples.append(0)
+            for n, mean, m2, lo, hi in self.stats.values():
+                n.append(0)
+                mean.append(0.0)
+                m2.append(0.0)
+                lo.append(math.inf)
+                hi.append(-math.inf)
+        return i
+
+    def _layer(self, operator, band):
+        ident = (operator, band)
+        i = self.layer_ids.get(ident)
+        if i is None:
+            i = self.layer_ids[ident] = len(self.layers)
+            self.layers.append(ident)
+        return i
+
+    def add(self, lat, lon, operator, band, values):
+        """One sample; values = (rsrp, rsrq, sinr) with None for missing"""
+        self._add(self.grid.key(lat, lon), operator, band, values)
+
+    def _add(self, tile, operator, band, values):
+        i = self._bin(self._layer(operator, band), tile)
+        self.samples[i] += 1
+        for m, x in zip(METRICS, values):
+            if x is None:
+                continue
+            n, mean, m2, lo, hi = self.stats[m]
+            n[i] += 1
+            delta = x - mean[i]
+            mean[i] += delta / n[i]
+            m2[i] += delta * (x - mean[i])
+            if x < lo[i]:
+                lo[i] = x
+            if x > hi[i]:
+                hi[i] = x
+
+    def observe(self, cells, position):
+        """Bin one scan (serving + neighbours) at a (lat, lon) fix"""
+        if not position or not cells:
+            return
+        lat, lon = position
+        if lat is None or lon is None:
+            return
+        self.positions += 1
+        tile = self.grid.key(lat, lon)
+        for op, band, values in samples(cells):
+            self._add(tile, op, band, values)
+
+    def merge(self, other):
+        """Fold another heatmap (another session) into this one (Chan et al.)"""
+        if other.grid.spec != self.grid.spec:
+            raise ValueError(f"grids differ: {self.grid.spec} vs {other.grid.spec}")
+        layers = [self._layer(*ident) for ident in other.layers]
+        for j in range(len(other)):
+            i = self._bin(layers[other.layer[j]], other.tile[j])
+            self.samples[i] += other.samples[j]
+            for m in METRICS:
+                nb, meanb, m2b, lob, hib = other.stats[m]
+                if nb[j]:
+                    _fold(self.stats[m], i, nb[j], meanb[j], m2b[j], lob[j], hib[j])
+        self.positions += other.positions
+        return self
+
+    # ============== READING ==============
+    def bin(self, i):
+        """Bin i as a dict: operator, band, tile, bounds, samples, per metric n/mean/std/min/max"""
+        operator, band = self.layers[self.layer[i]]
+        out = {'operator': operator, 'band': band, 'tile': self.grid.label(self.tile[i]),
+               'bounds': self.grid.bounds(self.tile[i]), 'samples': self.samples[i]}
+        for m in METRICS:
+            n, mean, m2, lo, hi = self.stats[m]
+            if n[i]:
+                out[m] = {'n': n[i], 'mean': round(mean[i], 2),
+                          'std': round(math.sqrt(m2[i] / (n[i] - 1)), 3) if n[i] > 1 else 0.0,
+                          'min': lo[i], 'max': hi[i]}
+            else:
+                out[m] = None
+        return out
+
+    def bins(self, operator=None, band=None):
+        for i in range(len(self)):
+            op, b = self.layers[self.layer[i]]
+            if (operator is None or op == operator) and (band is None or b == band):
+                yield self.bin(i)
+
+    def summary(self):
+        """[{'operator', 'band', 'bins', 'samples', 'rsrp'}] per layer, most bins first"""
+        per = {}
+        n, mean = self.stats['rsrp'][:2]
+        for i in range(len(self)):
+            row = per.setdefault(self.layer[i], [0, 0, 0, 0.0])
+            row[0] += 1
+            row[1] += self.samples[i]
+            row[2] += n[i]
+            row[3] += n[i] * mean[i]
+        out = [{'operator': self.layers[k][0], 'band': self.layers[k][1], 'bins': b,
+                'samples': s, 'rsrp': total / rn if rn else None}
+               for k, (b, s, rn, total) in per.items()]
+        return sorted(out, key=lambda r: (-r['bins'], r['operator'], r['band']))
+
+    def summary_line(self):
+        """'84 bins, 6 layers' ('' while empty)"""
+        if not len(self):
+            return ''
+        return f"{len(self)} bins, {len(self.layers)} layers"
+
+    # ============== EXPORT ==============
+    def geojson(self, path):
+        """One Polygon feature per bin"""
+        features = []
+        for b in self.bins():
+            south, west, north, east = b.pop('bounds')
+            ring = [[round(west, 6), round(south, 6)], [round(east, 6), round(south, 6)],
+                    [round(east, 6), round(north, 6)], [round(west, 6), round(north, 6)],
+                    [round(west, 6), round(south, 6)]]
+            b['grid'] = self.grid.spec
+            features.append({'type': 'Feature', 'properties': b,
+                             'geometry': {'type': 'Polygon', 'coordinates': [ring]}})
+        with open(path, 'w') as f:
+            json.dump({'type': 'FeatureCollection', 'features': features}, f,
+                      separators=(',', ':'))
+        return len(features)
+
+    def to_csv(self, path):
+        """One row per bin; load_csv() reads it back for merging"""
+        header = ['grid', 'operator', 'band', 'tile', 'key', 'lat', 'lon', 'samples']
+        for m in METRICS:
+            header += [f"{m}_n", f"{m}_mean", f"{m}_m2", f"{m}_min", f"{m}_max"]
+        with open(path, 'w', newline='') as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            for i in range(len(self)):
+                operator, band = self.layers[self.layer[i]]
+                south, west, north, east = self.grid.bounds(self.tile[i])
+                row = [self.grid.spec, operator, band, self.grid.label(self.tile[i]),
+                       self.tile[i], round((south + north) / 2, 6),
+                       round((west + east) / 2, 6), self.samples[i]]
+                for m in METRICS:
+                    n, mean, m2, lo, hi = self.stats[m]
+                    row += ([n[i], repr(mean[i]), repr(m2[i]), lo[i], hi[i]] if n[i]
+                            else [0, '', '', '', ''])
+                w.writerow(row)
+        return len(self)
+
+
+def _fold(stats, i, count, mean_b, m2_b, lo_b, hi_b):
+    """Combine (count, mean, M2, min, max) of one metric into bin i"""
+    n, mean, m2, lo, hi = stats
+    total = n[i] + count
+    delta = mean_b - mean[i]
+    m2[i] += m2_b + delta * delta * n[i] * count / total
+    mean[i] += delta * count / total
+    n[i] = total
+    lo[i] = min(lo[i], lo_b)
+    hi[i] = max(hi[i], hi_b)
+
+
+def load_csv(path):
+    """Heatmap back from to_csv() output"""
+    heatmap = None
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            if heatmap is None:
+                heatmap = Heatmap(grid_of(row['grid']))
+            i = heatmap._bin(heatmap._layer(row['operator'], row['band']), int(row['key']))
+            heatmap.samples[i] += int(row['samples'])
+            for m in METRICS:
+                count = int(row[f"{m}_n"] or 0)
+                if count:
+                    _fold(heatmap.stats[m], i, count, float(row[f"{m}_mean"]),
+                          float(row[f"{m}_m2"]), float(row[f"{m}_min"]), float(row[f"{m}_max"]))
+    return heatmap or Heatmap()
+
+
+# ============== SESSION DATABASE ==============
+def replay(conn, grid=None, since=None, session=None):
+    """Bin the recorded cell scans (stamped with the last GPS fix) of a session database"""
+    heatmap = Heatmap(grid)
+    cycle, cycle_ts, cycle_pos = [], None, None
+    for row in session_store.series(conn, 'cell', since=since, session=session):
+        if row['ts'] != cycle_ts and cycle:
+            heatmap.observe(cycle, cycle_pos)
+            cycle = []
+        cycle_ts = row['ts']
+        cycle_pos = (row['lat'], row['lon']) if row['lat'] is not None else None
+        try:
+            cycle.append(json.loads(row['data']))
+        except ValueError:
+            continue
+    if cycle:
+        heatmap.observe(cycle, cycle_pos)
+    return heatmap
+
+
+# ============== CLI ==============
+def main():
+    args = sys.argv[1:]
+    opts = {}
+    for flag in ('--session', '--since', '--grid', '--geohash', '--geojson', '--csv'):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i:i + 2]
+    grid = GeohashGrid(int(opts['--geohash'])) if '--geohash' in opts else \
+        MetreGrid(float(opts.get('--grid', GRID_M)))
+    since = time.time() - float(opts['--since']) * 60 if '--since' in opts else None
+    session = int(opts['--session']) if '--session' in opts else None
+    started = time.perf_counter()
+    heatmap = None
+    for path in args or [session_store.DB_PATH]:
+        try:
+            if path.endswith('.csv'):
+                part = load_csv(path)
+            else:
+                conn = session_store.connect(path)
+                # One heatmap per session, merged: the same path as combining exports
+                ids = [session] if session is not None else \
+                    [r[0] for r in conn.execute("SELECT id FROM sessions ORDER BY id")]
+                part = Heatmap(grid)
+                for n in ids:
+                    part.merge(replay(conn, grid, since, n))
+            # CSV inputs keep their own grid unless one was asked for
+            if heatmap is None:
+                heatmap = Heatmap(grid if '--grid' in opts or '--geohash' in opts else part.grid)
+            heatmap.merge(part)
+        except (sqlite3.Error, OSError, ValueError, KeyError) as e:
+            print(f"  Cannot read {path}: {e}")
+            return
+    took = time.perf_counter() - started
+    print(f"  {'operator':<10} {'band':<6} {'bins':>6} {'samples':>8} {'RSRP':>7}")
+    for row in heatmap.summary():
+        rsrp = f"{row['rsrp']:.1f}" if row['rsrp'] is not None else '-'
+        print(f"  {row['operator']:<10} {row['band']:<6} {row['bins']:>6} {row['samples']:>8} {rsrp:>7}")
+    scans = f" from {heatmap.positions} positioned scans" if heatmap.positions else ""
+    print(f"\n  {len(heatmap)} bins ({heatmap.grid.spec}){scans} in {took * 1000:.0f} ms")
+    if '--geojson' in opts:
+        print(f"  ✓ {heatmap.geojson(opts['--geojson'])} features -> {opts['--geojson']}")
+    if '--csv' in opts:
+        print(f"  ✓ {heatmap.to_csv(opts['--csv'])} bins -> {opts['--csv']}")
+
+
+if __name__ == "__main__":
+    main()
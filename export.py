@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+📤 EXPORT - Streaming export of every scan cycle (NDJSON / gzip CSV)
+Scanners enqueue; a writer thread appends compact records, rotates files by
+size or age and flushes on SIGUSR1 (SIGTERM / SIGHUP stop the tool cleanly)
+
+  RADAR_EXPORT=ndjson.gz (default) | ndjson | csv.gz | off
+  RADAR_EXPORT_DIR=exports
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import queue
+import signal
+import threading
+import time
+from datetime import datetime
+
+import session_store
+
+FORMAT = os.environ.get('RADAR_EXPORT', 'ndjson.gz')
+EXPORT_DIR = os.environ.get('RADAR_EXPORT_DIR', 'exports')
+FORMATS = ('ndjson', 'ndjson.gz', 'csv.gz')
+ROTATE_BYTES = 64 * 1024 * 1024   # bytes on disk per file
+ROTATE_SECONDS = 3600             # start a new file at least hourly
+SYNC_EVERY = 5.0                  # seconds between flushes to disk
+MAX_PENDING = 10000               # scan cycles; beyond this cycles are dropped
+
+CSV_COLUMNS = ('ts', 'tool', 'kind', 'key', 'name', 'level', 'lat', 'lon', 'data')
+# key / name / level come from session_store.KINDS; other kinds only carry data
+NO_KEYS = (lambda r: None,) * 3
+
+
+def _compact(value):
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+# ============== EXPORTER ==============
+class Exporter:
+    """One tool's export stream; observe() is a non-blocking enqueue"""
+
+    def __init__(self, tool, fmt=None, directory=None,
+                 rotate_bytes=ROTATE_BYTES, rotate_seconds=ROTATE_SECONDS):
+        self.tool = tool
+        self.fmt = fmt or FORMAT
+        self.directory = directory or EXPORT_DIR
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.position = None     # last GPS fix, stamped on every record
+        self.files = []          # every file written this run
+        self.raw = self.out = self.writer = None
+        self.opened = 0.0
+        self.records = 0
+        self.dropped = 0
+        self.error = None
+
+    def start(self, signals=True):
+        """Open the first file and start the writer; off / failure leaves observe() a no-op.
+        signals: install the SIGUSR1 / SIGTERM / SIGHUP handlers (long-running tools)"""
+        if self.fmt == 'off':
+            return self
+        if self.fmt not in FORMATS:
+            self.error = f"unknown format {self.fmt}"
+            return self
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._open()
+        except OSError as e:
+            self.error = str(e)
+            return self
+        self.thread = threading.Thread(target=self._writer, name='export-writer', daemon=True)
+        self.thread.start()
+        if signals:
+            install_signals(self)
+        return self
+
+    def observe(self, kind, records, ts=None):
+        """Queue one scan cycle ('wifi', 'bluetooth', 'cell', 'network', 'gps')"""
+        if self.thread is None or not records:
+            return
+        if isinstance(records, dict):
+            records = (records,)
+        if kind == 'gps':
+            self.position = session_store.fix_position(records[-1]) or self.position
+        if self.queue.qsize() > MAX_PENDING:
+            self.dropped += len(records)
+            return
+        self.queue.put((kind, ts or time.time(), self.position, records))
+
+    def flush(self, timeout=10):
+        """Block until everything queued so far is on disk"""
+        if self.thread is None:
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        """Write the remaining queue, finish the file and stop the writer"""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join(30)
+        self.thread = None
+        if self in _exporters:
+            _exporters.remove(self)
+
+    # ============== FILES ==============
+    def _open(self):
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.directory, f"{self.tool}_{stamp}.{self.fmt}")
+        n = 1
+        while os.path.exists(path):   # two rotations within one second
+            n += 1
+            path = os.path.join(self.directory, f"{self.tool}_{stamp}-{n}.{self.fmt}")
+        self.raw = open(path, 'wb')
+        if self.fmt.endswith('.gz'):
+            self.out = io.TextIOWrapper(gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=6),
+                                        encoding='utf-8', newline='')
+        else:
+            self.out = io.TextIOWrapper(self.raw, encoding='utf-8', newline='')
+        if self.fmt == 'csv.gz':
+            self.writer = csv.writer(self.out)
+            self.writer.writerow(CSV_COLUMNS)
+        self.opened = time.monotonic()
+        self.files.append(path)
+
+    def _sync(self):
+        """Push buffered text through gzip (a sync flush: the file stays readable)"""
+        self.out.flush()
+        self.out.buffer.flush()
+        self.raw.flush()
+
+    def _finish(self):
+        self.out.close()   # writes the gzip trailer; GzipFile leaves raw open
+        self.raw.close()
+
+    def _rotate_due(self):
+        return (self.raw.tell() >= self.rotate_bytes
+                or time.monotonic() - self.opened >= self.rotate_seconds)
+
+    # ============== WRITER THREAD ==============
+    def _writer(self):
+        synced = time.monotonic()
+        while True:
+            try:
+                item = self.queue.get(timeout=SYNC_EVERY)
+            except queue.Empty:
+                item = False
+            try:
+                if item is None:
+                    break
+                if isinstance(item, threading.Event):
+                    self._sync()
+                    item.set()
+                    synced = time.monotonic()
+                    continue
+                if item:
+                    self._write(*item)
+                if self._rotate_due():
+                    self._finish()
+                    self._open()
+                    synced = time.monotonic()
+                elif time.monotonic() - synced >= SYNC_EVERY:
+                    self._sync()
+                    synced = time.monotonic()
+            except (OSError, ValueError) as e:
+                self.error = str(e)
+                if isinstance(item, threading.Event):
+                    item.set()
+        try:
+            self._finish()
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+
+    def _write(self, kind, ts, pos, records):
+        lat, lon = pos or (None, None)
+        if self.writer is None:
+            self.out.write(_compact({'ts': round(ts, 3), 'tool': self.tool, 'kind': kind,
+                                     'lat': lat, 'lon': lon, 'records': list(records)}))
+            self.out.write('\n')
+        else:
+            key_of, name_of, level_of = session_store.KINDS.get(kind, NO_KEYS)
+            ts = round(ts, 3)
+            self.writer.writerows(
+                (ts, self.tool, kind, key_of(rec), name_of(rec), level_of(rec), lat, lon,
+                 _compact(rec)) for rec in records)
+        self.records += len(records)
+
+    def stats(self):
+        return {'files': len(self.files), 'records': self.records,
+                'pending': self.queue.qsize(), 'dropped': self.dropped, 'error': self.error}
+
+    def summary(self):
+        """Short status line, e.g. 'export 1834 rec'"""
+        if self.thread is None:
+            return ''
+        text = f"export {self.records} rec"
+        if len(self.files) > 1:
+            text += f" ({len(self.files)} files)"
+        if self.dropped:
+            text += f" ({self.dropped} dropped)"
+        if self.error:
+            text += f" ERR {self.error}"
+        return text
+
+
+# ============== SIGNALS ==============
+_exporters = []
+
+
+def _on_flush(signum, frame):
+    for exp in _exporters:
+        if exp.thread is not None:
+            exp.queue.put(threading.Event())   # non-blocking: a handler must not wait
+
+
+def _on_stop(signum, frame):
+    # Take the tools' normal Ctrl+C path, which closes the session and export
+    raise KeyboardInterrupt
+
+
+def install_signals(exporter):
+    """SIGUSR1 flushes, SIGTERM / SIGHUP stop like Ctrl+C (main thread only)"""
+    _exporters.append(exporter)
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for name, handler in (('SIGUSR1', _on_flush), ('SIGTERM', _on_stop), ('SIGHUP', _on_stop)):
+        signum = getattr(signal, name, None)
+        if signum is not None and signal.getsignal(signum) in (signal.SIG_DFL, _on_flush, _on_stop):
+            signal.signal(signum, handler)
+
+
+# ============== READING ==============
+def read(path):
+    """Yield the records of an export file, oldest first (a file still being
+    written is read up to its last flush)"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        try:
+            if path.endswith('.csv.gz'):
+                for row in csv.DictReader(f):
+                    yield row
+            else:
+                for line in f:
+                    if line.endswith('\n'):
+                        yield json.loads(line)
+        except EOFError:
+            return
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+🔀 HANDOVER - Serving-cell change timeline per SIM
+A small state machine turns each scan's registered cells into handover /
+reselection events (dwell, ping-pong, RSRP before -> after) kept in columns
+
+  python handover.py [radar_sessions.db] [--session N] [--since MINUTES]
+"""
+
+import bisect
+import json
+import math
+import sqlite3
+import sys
+import time
+from array import array
+from datetime import datetime
+
+import bands
+import operators
+import session_store
+
+MAX_SIMS = 2
+PING_PONG_S = 10        # back to the previous cell within this: ping-pong
+# Dwell histogram for the live median: 10 log bins per decade, 1 s .. ~1 day
+DWELL_EDGES = [10 ** (i / 10) for i in range(0, 50)]
+
+KINDS = ('intra', 'inter-freq', 'inter-RAT')
+PING_PONG = 1           # event flags
+AFTER_GAP = 2           # the SIM had no serving cell in between
+
+_level = session_store.KINDS['cell'][2]
+
+
+# ============== CELL IDENTITY ==============
+def rat_of(cell):
+    kind = (cell.get('type') or cell.get('network') or '').lower()
+    for needle, rat in (('lte', 'LTE'), ('nr', 'NR'), ('5g', 'NR'), ('gsm', 'GSM'),
+                        ('wcdma', 'WCDMA'), ('umts', 'WCDMA')):
+        if needle in kind:
+            return rat
+    return kind.upper() or '?'
+
+
+def identity(cell):
+    """(rat, channel, pci, cell id): what changes when the phone moves cells"""
+    rat = rat_of(cell)
+    chan = cell.get('earfcn') or cell.get('nrarfcn') or cell.get('uarfcn') or cell.get('arfcn')
+    pci = cell.get('pci', cell.get('psc', cell.get('bsic')))
+    cid = cell.get('ci') or cell.get('nci') or cell.get('cid')
+    if cid is not None and cid >= 2147483647:   # Android's "unknown"
+        cid = None
+    return (rat, chan, pci, cid)
+
+
+def sim_key(cell):
+    """What ties a registered cell to its SIM: the subscription when reported,
+    else the operator (its PLMNs differ per circle), None when neither is known"""
+    sub = cell.get('subscriptionId', cell.get('subId'))
+    if sub is not None and sub >= 0:
+        return ('sub', sub)
+    mcc, mnc = cell.get('mcc'), cell.get('mnc')
+    if mcc and mnc is not None and mcc < 2147483647 and mnc < 2147483647:
+        return ('operator', operators.name(mcc, mnc, default=f"{mcc}-{mnc}"))
+    return None
+
+
+def same_cell(a, b):
+    """Cell ids decide when both sides have one (PCIs are reused)"""
+    if a[3] is not None and b[3] is not None:
+        return a[:2] + a[3:] == b[:2] + b[3:]
+    return a[:3] == b[:3]
+
+
+def label(ident):
+    """'LTE B3 PCI 123' style name of an identity"""
+    rat, chan, pci, cid = ident
+    ch = bands.lte(chan) if rat == 'LTE' else bands.nr(chan) if rat == 'NR' else None
+    where = ch['name'] if ch else f"ch {chan}" if chan is not None else ''
+    return ' '.join(str(p) for p in (rat, where, f"PCI {pci}" if pci is not None else '') if p)
+
+
+def format_dwell(seconds):
+    if seconds is None:
+        return '-'
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+# ============== TIMELINE ==============
+class _Serving:
+    """What one SIM is camped on now"""
+    __slots__ = ('key', 'ident', 'id', 'since', 'level', 'prev_id', 'gap')
+
+    def __init__(self):
+        self.key = None      # sim_key() of the cells this slot follows
+        self.ident = None
+        self.id = -1
+        self.since = 0.0
+        self.level = None
+        self.prev_id = -1    # cell before the current one, for ping-pong
+        self.gap = False
+
+
+class Timeline:
+    """Handover events of every SIM in compact columns; observe() does
+    constant work per SIM whatever the length of the drive"""
+
+    def __init__(self, sims=MAX_SIMS):
+        self.sims = [_Serving() for _ in range(sims)]
+        self.cells = []          # interned identities; events refer to them by index
+        self.cell_ids = {}
+        # Event columns (NaN = unknown)
+        self.ts = array('d')
+        self.sim = array('B')
+        self.kind = array('B')
+        self.flags = array('B')
+        self.src = array('l')
+        self.dst = array('l')
+        self.dwell = array('f')
+        self.before = array('f')
+        self.after = array('f')
+        self.lat = array('d')
+        self.lon = array('d')
+        # Running summary
+        self.started = None
+        self.last = None
+        self.ping_pongs = 0
+        self.by_kind = [0] * len(KINDS)
+        self.dwell_bins = [0] * (len(DWELL_EDGES) + 1)
+
+    def __len__(self):
+        return len(self.ts)
+
+    def _intern(self, ident):
+        i = self.cell_ids.get(ident)
+        if i is None:
+            i = self.cell_ids[ident] = len(self.cells)
+            self.cells.append(ident)
+        return i
+
+    def observe(self, cells, ts=None, position=None):
+        """Feed one scan (serving + neighbour cells); returns the new events"""
+        ts = ts or time.time()
+        if self.started is None:
+            self.started = ts
+        self.last = ts
+        events = []
+        for n, (state, cell) in enumerate(zip(self.sims, self._assign(cells))):
+            if cell is None:
+                state.gap = state.ident is not None
+                continue
+            ident = identity(cell)
+            level = _level(cell)
+            if state.ident is None:
+                state.ident, state.id, state.since, state.level = ident, self._intern(ident), ts, level
+                continue
+            if same_cell(state.ident, ident):
+                if level is not None:
+                    state.level = level
+                state.gap = False
+                continue
+            events.append(self._switch(n, state, ident, level, ts, position))
+        return events
+
+    def _assign(self, cells):
+        """Registered cell of each SIM slot (or None), matched by sim_key rather than
+        list order, so a SIM missing from one scan does not shift the other"""
+        picked = [None] * len(self.sims)
+        rest = []
+        for cell in (c for c in cells if c.get('registered')):
+            key = sim_key(cell)
+            same = [n for n, st in enumerate(self.sims)
+                    if picked[n] is None and key is not None and st.key == key]
+            if not same:
+                rest.append((key, cell))
+                continue
+            # Two SIMs of one operator: stay with the slot already on this cell
+            ident = identity(cell)
+            n = next((n for n in same if self.sims[n].ident is not None and
+                      same_cell(self.sims[n].ident, ident)), same[0])
+            picked[n] = cell
+        for key, cell in rest:
+            # New SIM: an unused slot first, else one not reported this scan (PLMN change)
+            free = [n for n in range(len(self.sims)) if picked[n] is None]
+            fresh = [n for n in free if self.sims[n].key is None]
+            if not free:
+                break
+            n = (fresh or free)[0]
+            picked[n] = cell
+            if key is not None:
+                self.sims[n].key = key
+        return picked
+
+    def _switch(self, n, state, ident, level, ts, position):
+        old = state.ident
+        new_id = self._intern(ident)
+        dwell = ts - state.since
+        if old[0] != ident[0]:
+            kind = 2
+        elif old[1] != ident[1]:
+            kind = 1
+        else:
+            kind = 0
+        flags = AFTER_GAP if state.gap else 0
+        if new_id == state.prev_id and dwell <= PING_PONG_S:
+            flags |= PING_PONG
+            self.ping_pongs += 1
+        lat, lon = position or (math.nan, math.nan)
+        self.ts.append(ts)
+        self.sim.append(n + 1)
+        self.kind.append(kind)
+        self.flags.append(flags)
+        self.src.append(state.id)
+        self.dst.append(new_id)
+        self.dwell.append(dwell)
+        self.before.append(math.nan if state.level is None else state.level)
+        self.after.append(math.nan if level is None else level)
+        self.lat.append(lat)
+        self.lon.append(lon)
+        self.by_kind[kind] += 1
+        self.dwell_bins[bisect.bisect(DWELL_EDGES, dwell)] += 1
+        state.prev_id, state.id, state.ident = state.id, new_id, ident
+        state.since, state.level, state.gap = ts, level, False
+        return self.event(len(self.ts) - 1)
+
+    # ============== READING ==============
+    def event(self, i):
+        """Event i as a dict (ts, sim, kind, from, to, dwell, before, after, ...)"""
+        def value(x):
+            return None if math.isnan(x) else x
+        return {'ts': self.ts[i], 'sim': self.sim[i], 'kind': KINDS[self.kind[i]],
+                'from': label(self.cells[self.src[i]]), 'to': label(self.cells[self.dst[i]]),
+                'from_cid': self.cells[self.src[i]][3], 'to_cid': self.cells[self.dst[i]][3],
+                'dwell': round(self.dwell[i], 1), 'before': value(self.before[i]),
+                'after': value(self.after[i]), 'ping_pong': bool(self.flags[i] & PING_PONG),
+                'after_gap': bool(self.flags[i] & AFTER_GAP),
+                'lat': value(self.lat[i]), 'lon': value(self.lon[i])}
+
+    def recent(self, n=5, sim=None):
+        """Last n events, newest first (optionally of one SIM)"""
+        found = []
+        for i in range(len(self.ts) - 1, -1, -1):
+            if sim is None or self.sim[i] == sim:
+                found.append(self.event(i))
+                if len(found) >= n:
+                    break
+        return found
+
+    def median_dwell(self):
+        """Median dwell from the histogram (geometric interpolation in the bin)"""
+        total = len(self.ts)
+        if not total:
+            return None
+        seen = 0
+        for b, count in enumerate(self.dwell_bins):
+            if seen + count >= total / 2 and count:
+                lo = DWELL_EDGES[b - 1] if b else 0.5
+                hi = DWELL_EDGES[b] if b < len(DWELL_EDGES) else lo * 10 ** 0.1
+                return lo * (hi / lo) ** ((total / 2 - seen) / count)
+            seen += count
+        return None
+
+    def summary(self):
+        """{'handovers', 'per_hour', 'median_dwell', 'ping_pong_rate', 'by_kind', 'hours'}"""
+        total = len(self.ts)
+        hours = (self.last - self.started) / 3600 if self.started is not None else 0
+        return {'handovers': total,
+                'hours': hours,
+                'per_hour': total / hours if hours >= 1 / 60 else None,
+                'median_dwell': self.median_dwell(),
+                'ping_pong_rate': self.ping_pongs / total if total else None,
+                'by_kind': dict(zip(KINDS, self.by_kind))}
+
+    def summary_line(self):
+        """'12 HO (8.4/h)  dwell 3m  ping-pong 8%' ('' before the first scan)"""
+        s = self.summary()
+        if self.started is None:
+            return ''
+        text = f"{s['handovers']} HO"
+        if s['per_hour'] is not None:
+            text += f" ({s['per_hour']:.1f}/h)"
+        if s['handovers']:
+            text += f"  dwell {format_dwell(s['median_dwell'])}  ping-pong {s['ping_pong_rate']:.0%}"
+        return text
+
+
+# ============== SESSION DATABASE ==============
+def replay(conn, since=None, session=None):
+    """Run the recorded cell scans of a session database through a Timeline"""
+    timeline = Timeline()
+    cycle, cycle_ts, cycle_pos = [], None, None
+    for row in session_store.series(conn, 'cell', since=since, session=session):
+        if row['ts'] != cycle_ts and cycle:
+            timeline.observe(cycle, cycle_ts, cycle_pos)
+            cycle = []
+        cycle_ts = row['ts']
+        cycle_pos = (row['lat'], row['lon']) if row['lat'] is not None else None
+        try:
+            cycle.append(json.loads(row['data']))
+        except ValueError:
+            continue
+    if cycle:
+        timeline.observe(cycle, cycle_ts, cycle_pos)
+    return timeline
+
+
+# ============== CLI ==============
+def main():
+    args = sys.argv[1:]
+    opts = {}
+    for flag in ('--session', '--since'):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i:i + 2]
+    path = args[0] if args else session_store.DB_PATH
+    try:
+        conn = session_store.connect(path)
+        since = time.time() - float(opts['--since']) * 60 if '--since' in opts else None
+        session = int(opts['--session']) if '--session' in opts else None
+        started = time.perf_counter()
+        timeline = replay(conn, since, session)
+    except sqlite3.Error as e:
+        print(f"  Cannot open {path}: {e}")
+        return
+    took = time.perf_counter() - started
+    print(f"  {'time':<8} {'SIM':<3} {'type':<10} {'from':<22} {'to':<22} "
+          f"{'dwell':>6} {'RSRP':>10}")
+    for i in range(len(timeline)):
+        e = timeline.event(i)
+        rsrp = (f"{e['before']:.0f}" if e['before'] is not None else '?') + '>' + \
+               (f"{e['after']:.0f}" if e['after'] is not None else '?')
+        mark = ' ping-pong' if e['ping_pong'] else ' after gap' if e['after_gap'] else ''
+        print(f"  {datetime.fromtimestamp(e['ts']).strftime('%H:%M:%S'):<8} {e['sim']:<3} "
+              f"{e['kind']:<10} {e['from']:<22} {e['to']:<22} {format_dwell(e['dwell']):>6} "
+              f"{rsrp:>10}{mark}")
+    s = timeline.summary()
+    print()
+    print(f"  {s['handovers']} handovers in {s['hours']:.2f} h"
+          + (f" = {s['per_hour']:.1f}/h" if s['per_hour'] is not None else ""))
+    if s['handovers']:
+        print(f"  median dwell {format_dwell(s['median_dwell'])}, "
+              f"ping-pong {s['ping_pong_rate']:.1%}, "
+              + ", ".join(f"{k} {v}" for k, v in s['by_kind'].items()))
+    print(f"  ({len(timeline.cells)} cells, replayed in {took * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
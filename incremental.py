@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+♻️ INCREMENTAL - Change detection for raw scan output
+Skip unchanged payloads, re-enrich only new/changed records
+"""
+
+
+class Fingerprint:
+    """Remembers the last raw output of a source"""
+
+    def __init__(self):
+        self.digest = None
+        self.hits = 0
+
+    def same(self, raw):
+        """True when raw is identical to the previous payload"""
+        digest = (len(raw), hash(raw))
+        if digest == self.digest:
+            self.hits += 1
+            return True
+        self.digest = digest
+        return False
+
+    def reset(self):
+        self.digest = None
+
+
+class RecordCache:
+    """Per-record enrichment keyed by a stable id (BSSID, MAC, (earfcn, pci) ...)
+
+    build(rec) runs only when the key is new or signature(rec) changed;
+    keys missing from the latest payload are dropped.
+    """
+
+    def __init__(self, key, signature, build):
+        self.key = key
+        self.signature = signature
+        self.build = build
+        self.items = {}
+        self.added = self.changed = self.removed = self.reused = 0
+
+    def diff(self, records):
+        """[(rec, static)] for the current payload, updating the cache"""
+        result = []
+        seen = {}
+        for rec in records:
+            k = self.key(rec)
+            sig = self.signature(rec)
+            hit = self.items.get(k)
+            if hit is not None and hit[0] == sig:
+                self.reused += 1
+                static = hit[1]
+            else:
+                if hit is None:
+                    self.added += 1
+                else:
+                    self.changed += 1
+                static = self.build(rec)
+            seen[k] = (sig, static)
+            result.append((rec, static))
+        self.removed += len(self.items.keys() - seen.keys())
+        self.items = seen
+        return result
+
+    def stats(self):
+        return {'added': self.added, 'changed': self.changed,
+                'removed': self.removed, 'reused': self.reused}
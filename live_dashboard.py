@@ -4,14 +4,19 @@
 No menu, automatic scanning, real-time updates
 """
 
-import subprocess
-import json
-import os
-import sys
 import time
 import threading
 from datetime import datetime
 
+import broker
+import classifier
+import collector
+import export
+import operators
+import screen
+import session_store
+import snapshot
+
 # ============== CONFIG ==============
 REFRESH_INTERVAL = 5  # seconds
 CLEAR_SCREEN = True
@@ -30,66 +35,48 @@ class C:
     E = '\033[0m'    # End
 
 # ============== GLOBAL DATA ==============
-data = {
-    'wifi': [],
-    'bluetooth': [],
-    'cell': [],
-    'network': [],
-    'scan_time': '',
-    'scanning': {'wifi': False, 'bt': False, 'cell': False, 'net': False}
-}
+# Scanners publish, the render loop reads STORE.get() (see snapshot.py)
+STORE = snapshot.SnapshotStore(
+    wifi=[],
+    bluetooth=[],
+    cell=[],
+    network=[],
+    scan_time='',
+    scanning={'wifi': False, 'bt': False, 'cell': False, 'net': False},
+)
 
-def cmd(c):
-    try:
-        r = subprocess.run(c, shell=True, capture_output=True, text=True, timeout=15)
-        return r.stdout + r.stderr
-    except:
-        return ""
+def set_scanning(key, busy):
+    """Only the collector's on_state calls this: one publish per state change"""
+    STORE.apply(lambda snap: {'scanning': dict(snap['scanning'], **{key: busy})})
 
-def clear():
-    if CLEAR_SCREEN:
-        os.system('clear' if os.name != 'nt' else 'cls')
+# Every scan cycle is also recorded to SQLite (session_store.DB_PATH) and
+# streamed to rotating export files (export.EXPORT_DIR)
+SESSION = session_store.SessionStore('live_dashboard')
+EXPORT = export.Exporter('live_dashboard')
 
 # ============== SCANNERS ==============
-def scan_wifi():
-    data['scanning']['wifi'] = True
-    out = cmd("termux-wifi-scaninfo 2>/dev/null")
-    try:
-        nets = json.loads(out) if out else []
-        data['wifi'] = sorted(nets, key=lambda x: x.get('rssi', -100), reverse=True)[:15]
-    except:
-        data['wifi'] = []
-    data['scanning']['wifi'] = False
+def scan_wifi(out=None):
+    nets = broker.wifi_scan(out)
+    SESSION.observe('wifi', nets)
+    EXPORT.observe('wifi', nets)
+    STORE.publish(wifi=sorted(nets, key=lambda x: x.get('rssi', -100), reverse=True)[:15])
 
-def scan_bluetooth():
-    data['scanning']['bt'] = True
-    out = cmd("termux-bluetooth-scaninfo 2>/dev/null")
-    try:
-        data['bluetooth'] = json.loads(out) if out else []
-    except:
-        data['bluetooth'] = []
-    data['scanning']['bt'] = False
+def scan_bluetooth(out=None):
+    devices = broker.bluetooth_scan(out)
+    SESSION.observe('bluetooth', devices)
+    EXPORT.observe('bluetooth', devices)
+    STORE.publish(bluetooth=devices)
 
-def scan_cell():
-    data['scanning']['cell'] = True
-    out = cmd("termux-telephony-cellinfo 2>/dev/null")
-    try:
-        data['cell'] = json.loads(out) if out else []
-    except:
-        data['cell'] = []
-    data['scanning']['cell'] = False
+def scan_cell(out=None):
+    cells = broker.cell_info(out)
+    SESSION.observe('cell', cells)
+    EXPORT.observe('cell', cells)
+    STORE.publish(cell=cells)
 
-def scan_network():
-    data['scanning']['net'] = True
-    gw = cmd("ip route | grep default | awk '{print $3}'").strip()
-    if gw:
-        subnet = '.'.join(gw.split('.')[:-1]) + '.0/24'
-        out = cmd(f"nmap -sn {subnet} 2>/dev/null | grep 'Nmap scan report' | wc -l")
-        try:
-            data['network'] = [{'count': int(out.strip())}]
-        except:
-            data['network'] = []
-    data['scanning']['net'] = False
+def scan_network(out=None):
+    if out is None:
+        out = broker.network_sweep()
+    STORE.publish(network=[{'count': out.count('Nmap scan report')}] if out else [])
 
 # ============== HELPERS ==============
 def signal_bar(rssi):
@@ -99,26 +86,8 @@ def signal_bar(rssi):
     elif rssi > -80: return f"{C.Y}█{C.DIM}███{C.E}"
     else: return f"{C.R}█{C.DIM}███{C.E}"
 
-def get_operator(mcc, mnc):
-    ops = {
-        (404,10):"Airtel",(404,40):"Airtel",(404,45):"Airtel",(404,49):"Airtel",
-        (404,90):"Airtel",(404,92):"Airtel",(404,93):"Airtel",(404,94):"Airtel",
-        (404,11):"Vi",(404,12):"Vi",(404,20):"Vi",(404,27):"Vi",(404,86):"Vi",
-        (405,840):"Jio",(405,854):"Jio",(405,855):"Jio",(405,857):"Jio",
-        (405,858):"Jio",(405,859):"Jio",(405,860):"Jio",(405,861):"Jio",
-        (404,34):"BSNL",(404,38):"BSNL",(404,51):"BSNL",(404,72):"BSNL",
-    }
-    return ops.get((mcc, mnc), "Unknown")
-
-def classify_bt(name):
-    n = name.lower()
-    if any(x in n for x in ['airpod','buds','earphone','jbl']): return "🎧"
-    elif any(x in n for x in ['band','watch','fit']): return "⌚"
-    elif any(x in n for x in ['tv','fire','roku']): return "📺"
-    elif any(x in n for x in ['phone','iphone','samsung','oneplus','xiaomi','redmi']): return "📱"
-    elif any(x in n for x in ['speaker','echo','alexa']): return "🔊"
-    elif any(x in n for x in ['laptop','macbook']): return "💻"
-    else: return "📟"
+def classify_bt(name, mac=None):
+    return classifier.classify(mac, name)[0]
 
 def sec_icon(sec):
     if 'WPA3' in sec: return f"{C.G}🔒{C.E}"
@@ -129,19 +98,28 @@ def sec_icon(sec):
 
 
 # ============== DASHBOARD RENDER ==============
-def render_dashboard():
-    clear()
+SCREEN = screen.Screen()
+
+def render_header(data, out=print):
     now = datetime.now().strftime("%H:%M:%S")
-    
-    # Header
-    print(f"""
+    updated = datetime.fromtimestamp(data['published']).strftime("%H:%M:%S")
+    out(f"""
 {C.C}{C.BOLD}╔══════════════════════════════════════════════════════════════════════╗
 ║                    📡 SIGNAL RADAR - LIVE DASHBOARD                   ║
 ╠══════════════════════════════════════════════════════════════════════╣{C.E}
-{C.DIM}║  Last Update: {now}                              [Ctrl+C to Exit]  ║{C.E}
+{C.DIM}║  Time: {now}   Last Update: {updated}             [Ctrl+C to Exit]  ║{C.E}
 {C.C}╚══════════════════════════════════════════════════════════════════════╝{C.E}
 """)
 
+def render_dashboard():
+    """Compose the dashboard from one snapshot and redraw only changed lines"""
+    data = STORE.get()
+    frame = SCREEN.frame()
+    out = frame.print
+    
+    # Header
+    render_header(data, out)
+
     # Stats Bar
     wifi_count = len(data['wifi'])
     bt_count = len(data['bluetooth'])
@@ -150,17 +128,17 @@ def render_dashboard():
     
     spin = "◐◓◑◒"[int(time.time()) % 4]
     
-    print(f"  {C.G}📡 WiFi: {wifi_count:>2}{C.E}  │  {C.B}🔵 Bluetooth: {bt_count:>2}{C.E}  │  {C.M}📶 Towers: {cell_count}{C.E}  │  {C.Y}🌐 Devices: {net_count:>2}{C.E}  │  {spin}")
-    print()
+    out(f"  {C.G}📡 WiFi: {wifi_count:>2}{C.E}  │  {C.B}🔵 Bluetooth: {bt_count:>2}{C.E}  │  {C.M}📶 Towers: {cell_count}{C.E}  │  {C.Y}🌐 Devices: {net_count:>2}{C.E}  │  {spin}")
+    out()
 
     # ============== WiFi Section ==============
-    print(f"{C.G}{C.BOLD}┌─────────────────────────── 📡 WiFi Networks ───────────────────────────┐{C.E}")
+    out(f"{C.G}{C.BOLD}┌─────────────────────────── 📡 WiFi Networks ───────────────────────────┐{C.E}")
     
     if data['scanning']['wifi']:
-        print(f"  {C.Y}Scanning...{C.E}")
+        out(f"  {C.Y}Scanning...{C.E}")
     elif data['wifi']:
-        print(f"  {'SSID':<22} {'Signal':^8} {'Sec':^4} {'Ch':>3}")
-        print(f"  {'-'*22} {'-'*8} {'-'*4} {'-'*3}")
+        out(f"  {'SSID':<22} {'Signal':^8} {'Sec':^4} {'Ch':>3}")
+        out(f"  {'-'*22} {'-'*8} {'-'*4} {'-'*3}")
         
         for net in data['wifi'][:8]:
             ssid = net.get('ssid', 'Hidden')[:21] or '[Hidden]'
@@ -172,36 +150,37 @@ def render_dashboard():
             bar = signal_bar(rssi)
             icon = sec_icon(sec)
             
-            print(f"  {ssid:<22} {bar} {rssi:>3}  {icon}  {ch:>3}")
+            out(f"  {ssid:<22} {bar} {rssi:>3}  {icon}  {ch:>3}")
     else:
-        print(f"  {C.DIM}No WiFi data - Install Termux:API{C.E}")
+        out(f"  {C.DIM}No WiFi data - Install Termux:API{C.E}")
     
-    print(f"{C.G}└────────────────────────────────────────────────────────────────────────┘{C.E}")
-    print()
+    out(f"{C.G}└────────────────────────────────────────────────────────────────────────┘{C.E}")
+    out()
 
     # ============== Bluetooth Section ==============
-    print(f"{C.B}{C.BOLD}┌─────────────────────────── 🔵 Bluetooth ───────────────────────────────┐{C.E}")
+    out(f"{C.B}{C.BOLD}┌─────────────────────────── 🔵 Bluetooth ───────────────────────────────┐{C.E}")
     
     if data['scanning']['bt']:
-        print(f"  {C.Y}Scanning...{C.E}")
+        out(f"  {C.Y}Scanning...{C.E}")
     elif data['bluetooth']:
         for dev in data['bluetooth'][:6]:
-            name = dev.get('name', 'Unknown')[:25]
+            name = dev.get('name', 'Unknown')
             rssi = dev.get('rssi', 0)
-            icon = classify_bt(name)
+            icon = classify_bt(name, dev.get('address'))
+            name = name[:25]
             bar = signal_bar(rssi)
-            print(f"  {icon} {name:<25} {bar} {rssi:>3} dBm")
+            out(f"  {icon} {name:<25} {bar} {rssi:>3} dBm")
     else:
-        print(f"  {C.DIM}No Bluetooth devices found{C.E}")
+        out(f"  {C.DIM}No Bluetooth devices found{C.E}")
     
-    print(f"{C.B}└────────────────────────────────────────────────────────────────────────┘{C.E}")
-    print()
+    out(f"{C.B}└────────────────────────────────────────────────────────────────────────┘{C.E}")
+    out()
 
     # ============== Cell Tower Section ==============
-    print(f"{C.M}{C.BOLD}┌─────────────────────────── 📶 Cell Towers ─────────────────────────────┐{C.E}")
+    out(f"{C.M}{C.BOLD}┌─────────────────────────── 📶 Cell Towers ─────────────────────────────┐{C.E}")
     
     if data['scanning']['cell']:
-        print(f"  {C.Y}Scanning...{C.E}")
+        out(f"  {C.Y}Scanning...{C.E}")
     elif data['cell']:
         for cell in data['cell'][:3]:
             ctype = cell.get('type', 'Unknown')
@@ -212,10 +191,10 @@ def render_dashboard():
                 mnc = cell.get('mnc', 0)
                 cid = cell.get('ci', 'N/A')
                 rsrp = cell.get('rsrp', -100)
-                op = get_operator(mcc, mnc)
+                op = operators.name(mcc, mnc)
                 bar = signal_bar(rsrp)
                 
-                print(f"  {C.G if registered == '●' else C.DIM}{registered}{C.E} {C.BOLD}{op:<10}{C.E} │ CID: {cid:<10} │ {bar} {rsrp:>3} dBm │ 4G LTE")
+                out(f"  {C.G if registered == '●' else C.DIM}{registered}{C.E} {C.BOLD}{op:<10}{C.E} │ CID: {cid:<10} │ {bar} {rsrp:>3} dBm │ 4G LTE")
             
             elif 'gsm' in ctype.lower():
                 mcc = cell.get('mcc', 0)
@@ -223,24 +202,24 @@ def render_dashboard():
                 lac = cell.get('lac', 'N/A')
                 cid = cell.get('cid', 'N/A')
                 rssi = cell.get('rssi', -100)
-                op = get_operator(mcc, mnc)
+                op = operators.name(mcc, mnc)
                 bar = signal_bar(rssi)
                 
-                print(f"  {C.G if registered == '●' else C.DIM}{registered}{C.E} {C.BOLD}{op:<10}{C.E} │ LAC:{lac} CID:{cid} │ {bar} {rssi:>3} dBm │ 2G GSM")
+                out(f"  {C.G if registered == '●' else C.DIM}{registered}{C.E} {C.BOLD}{op:<10}{C.E} │ LAC:{lac} CID:{cid} │ {bar} {rssi:>3} dBm │ 2G GSM")
             
             elif 'nr' in ctype.lower() or '5g' in ctype.lower():
                 mcc = cell.get('mcc', 0)
                 mnc = cell.get('mnc', 0)
-                op = get_operator(mcc, mnc)
+                op = operators.name(mcc, mnc)
                 ss = cell.get('ssRsrp', cell.get('csiRsrp', -100))
                 bar = signal_bar(ss)
                 
-                print(f"  {C.G if registered == '●' else C.DIM}{registered}{C.E} {C.BOLD}{op:<10}{C.E} │ 5G NR │ {bar} {ss:>3} dBm │ {C.C}5G{C.E}")
+                out(f"  {C.G if registered == '●' else C.DIM}{registered}{C.E} {C.BOLD}{op:<10}{C.E} │ 5G NR │ {bar} {ss:>3} dBm │ {C.C}5G{C.E}")
     else:
-        print(f"  {C.DIM}No cell data - Install Termux:API{C.E}")
+        out(f"  {C.DIM}No cell data - Install Termux:API{C.E}")
     
-    print(f"{C.M}└────────────────────────────────────────────────────────────────────────┘{C.E}")
-    print()
+    out(f"{C.M}└────────────────────────────────────────────────────────────────────────┘{C.E}")
+    out()
 
     # ============== Security Alerts ==============
     alerts = []
@@ -261,36 +240,40 @@ def render_dashboard():
         alerts.append(f"{C.Y}📷 {len(strong)} very strong signals nearby (check for cameras){C.E}")
     
     if alerts:
-        print(f"{C.R}{C.BOLD}┌─────────────────────────── ⚠️  ALERTS ──────────────────────────────────┐{C.E}")
+        out(f"{C.R}{C.BOLD}┌─────────────────────────── ⚠️  ALERTS ──────────────────────────────────┐{C.E}")
         for alert in alerts:
-            print(f"  {alert}")
-        print(f"{C.R}└────────────────────────────────────────────────────────────────────────┘{C.E}")
+            out(f"  {alert}")
+        out(f"{C.R}└────────────────────────────────────────────────────────────────────────┘{C.E}")
     
-    print(f"\n{C.DIM}  Auto-refreshing every {REFRESH_INTERVAL}s... Press Ctrl+C to exit{C.E}")
+    out(f"\n{C.DIM}  Live - redraws on new data... Press Ctrl+C to exit{C.E}")
+    
+    if CLEAR_SCREEN:
+        SCREEN.draw(frame)
+    else:
+        print(frame.text(), flush=True)
 
+def render_clock():
+    """Cheap tick: redraw only the header (clock)"""
+    if not CLEAR_SCREEN:
+        return   # printed frames cannot be patched in place
+    frame = SCREEN.frame()
+    render_header(STORE.get(), frame.print)
+    SCREEN.patch(frame)
 
 # ============== BACKGROUND SCANNER ==============
+SCANNING_KEYS = {'wifi': 'wifi', 'bluetooth': 'bt', 'cell': 'cell', 'network': 'net'}
+
 def background_scanner():
-    """Continuously scan in background"""
-    while True:
-        threads = [
-            threading.Thread(target=scan_wifi),
-            threading.Thread(target=scan_bluetooth),
-            threading.Thread(target=scan_cell),
-        ]
-        
-        for t in threads:
-            t.daemon = True
-            t.start()
-        
-        for t in threads:
-            t.join(timeout=10)
-        
-        # Network scan less frequently
-        if int(time.time()) % 3 == 0:
-            scan_network()
-        
-        time.sleep(REFRESH_INTERVAL)
+    """Continuously scan in background (asyncio collector, one task per source)"""
+    def on_state(name, busy):
+        set_scanning(SCANNING_KEYS[name], busy)
+
+    col = collector.Collector(on_state=on_state)
+    col.add('wifi', collector.source('wifi'), scan_wifi, REFRESH_INTERVAL, deadline=10)
+    col.add('bluetooth', collector.source('bluetooth'), scan_bluetooth, REFRESH_INTERVAL, deadline=10)
+    col.add('cell', collector.source('cell'), scan_cell, REFRESH_INTERVAL, deadline=10)
+    col.add('network', collector.network_source(), scan_network, REFRESH_INTERVAL * 3, deadline=70)
+    col.run()
 
 # ============== MAIN ==============
 def main():
@@ -300,6 +283,10 @@ def main():
     print("  ╚═══════════════════════════════════════╝")
     print(f"{C.E}")
     print(f"  {C.Y}Initializing scanners...{C.E}")
+    SESSION.start()
+    EXPORT.start()
+    if EXPORT.error:
+        print(f"  {C.R}Export unavailable ({EXPORT.error}) - not exporting{C.E}")
     
     # Initial scan
     print(f"  {C.DIM}[1/4] WiFi...{C.E}")
@@ -321,20 +308,19 @@ def main():
     
     # Main display loop
     try:
-        while True:
-            render_dashboard()
-            time.sleep(2)
+        screen.run(SCREEN, STORE, render_dashboard, tick=render_clock)
     except KeyboardInterrupt:
-        clear()
+        SCREEN.leave()
         print(f"\n{C.G}  👋 Signal Radar stopped. Goodbye!{C.E}\n")
+        SESSION.close()
+        EXPORT.close()
+        if SESSION.session:
+            print(f"  💾 Session #{SESSION.session}: {SESSION.written} observations in {SESSION.path}\n")
         
-        # Export option
-        export = input(f"  {C.Y}Export data to JSON? (y/n): {C.E}").strip().lower()
-        if export == 'y':
-            filename = f"signal_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=2)
-            print(f"  {C.G}✓ Saved to {filename}{C.E}\n")
+        # Everything was streamed while running
+        for path in EXPORT.files:
+            print(f"  {C.G}✓ Saved to {path}{C.E}")
+        print()
 
 if __name__ == "__main__":
     main()
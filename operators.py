@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+🇮🇳 OPERATORS - Single MCC/MNC registry for all 8xRadar tools
+Parsed once on first lookup into a packed (mcc << 16 | mnc) integer map
+
+Optional full ITU / mcc-mnc list: put a CSV with mcc, mnc and network
+(or operator/brand) columns at operators.csv or $RADAR_OPERATORS.
+"""
+
+import csv
+import os
+
+OPERATORS_CSV = os.environ.get(
+    'RADAR_OPERATORS', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'operators.csv'))
+
+# ============== INDIA PLMNs ==============
+# mcc mnc operator circle (defunct networks kept so old logs still resolve)
+INDIA = """
+404 01 Vi Haryana
+404 02 Airtel Punjab
+404 03 Airtel Himachal_Pradesh
+404 04 Vi Delhi
+404 05 Vi Gujarat
+404 07 Vi Andhra_Pradesh
+404 09 Reliance Assam
+404 10 Airtel Delhi
+404 11 Vi Delhi
+404 12 Vi Haryana
+404 13 Vi Andhra_Pradesh
+404 14 Vi Punjab
+404 15 Vi UP_East
+404 16 Airtel North_East
+404 17 Aircel West_Bengal
+404 18 Reliance Himachal_Pradesh
+404 19 Vi Kerala
+404 20 Vi Mumbai
+404 21 Loop Mumbai
+404 22 Vi Maharashtra
+404 24 Vi Gujarat
+404 25 Aircel Bihar
+404 27 Vi Maharashtra
+404 28 Aircel Odisha
+404 29 Aircel Assam
+404 30 Vi Kolkata
+404 31 Airtel Kolkata
+404 34 BSNL Haryana
+404 35 Aircel Himachal_Pradesh
+404 36 Reliance Bihar
+404 37 Aircel Jammu_Kashmir
+404 38 BSNL Assam
+404 40 Airtel Chennai
+404 41 Aircel Chennai
+404 42 Aircel Tamil_Nadu
+404 43 Vi Tamil_Nadu
+404 44 Vi Karnataka
+404 45 Airtel Karnataka
+404 46 Vi Kerala
+404 49 Airtel Andhra_Pradesh
+404 50 Reliance North_East
+404 51 BSNL Himachal_Pradesh
+404 52 Reliance Odisha
+404 53 BSNL Punjab
+404 54 BSNL UP_West
+404 55 BSNL UP_East
+404 56 Vi UP_West
+404 57 BSNL Gujarat
+404 58 BSNL Madhya_Pradesh
+404 59 BSNL Rajasthan
+404 60 Vi Rajasthan
+404 62 BSNL Jammu_Kashmir
+404 64 BSNL Chennai
+404 66 BSNL Maharashtra
+404 67 Reliance Madhya_Pradesh
+404 68 MTNL Delhi
+404 69 MTNL Mumbai
+404 70 Airtel Rajasthan
+404 71 BSNL Karnataka
+404 72 BSNL Kerala
+404 73 BSNL Andhra_Pradesh
+404 74 BSNL West_Bengal
+404 75 BSNL Bihar
+404 76 BSNL Odisha
+404 77 BSNL North_East
+404 78 Vi Madhya_Pradesh
+404 79 BSNL Andaman_Nicobar
+404 80 BSNL Tamil_Nadu
+404 81 BSNL Kolkata
+404 82 Vi Himachal_Pradesh
+404 83 Reliance Kolkata
+404 84 Vi Chennai
+404 85 Reliance West_Bengal
+404 86 Vi Karnataka
+404 87 Vi Rajasthan
+404 88 Vi Punjab
+404 89 Vi Odisha
+404 90 Airtel Maharashtra
+404 91 Aircel Kolkata
+404 92 Airtel Mumbai
+404 93 Airtel Madhya_Pradesh
+404 94 Airtel Tamil_Nadu
+404 95 Airtel Kerala
+404 96 Airtel Haryana
+404 97 Airtel UP_West
+404 98 Airtel Gujarat
+405 01 Reliance Andhra_Pradesh
+405 025 Tata_Docomo Andhra_Pradesh
+405 027 Tata_Docomo Bihar
+405 029 Tata_Docomo Delhi
+405 030 Tata_Docomo Gujarat
+405 031 Tata_Docomo Haryana
+405 032 Tata_Docomo Himachal_Pradesh
+405 034 Tata_Docomo Karnataka
+405 035 Tata_Docomo Kerala
+405 036 Tata_Docomo Kolkata
+405 037 Tata_Docomo Maharashtra
+405 038 Tata_Docomo Madhya_Pradesh
+405 039 Tata_Docomo Mumbai
+405 041 Tata_Docomo Odisha
+405 042 Tata_Docomo Punjab
+405 043 Tata_Docomo Rajasthan
+405 044 Tata_Docomo Tamil_Nadu
+405 045 Tata_Docomo UP_East
+405 046 Tata_Docomo UP_West
+405 047 Tata_Docomo West_Bengal
+405 51 Airtel West_Bengal
+405 52 Airtel Bihar
+405 53 Airtel Odisha
+405 54 Airtel UP_East
+405 55 Airtel Jammu_Kashmir
+405 56 Airtel Assam
+405 66 Vi UP_West
+405 67 Vi West_Bengal
+405 70 Vi Bihar
+405 750 Vi Jammu_Kashmir
+405 751 Vi Assam
+405 752 Vi Bihar
+405 753 Vi Odisha
+405 754 Vi Himachal_Pradesh
+405 755 Vi North_East
+405 756 Vi Madhya_Pradesh
+405 799 Vi Mumbai
+405 800 Aircel Delhi
+405 801 Aircel Andhra_Pradesh
+405 802 Aircel Gujarat
+405 803 Aircel Karnataka
+405 804 Aircel Maharashtra
+405 805 Aircel Mumbai
+405 806 Aircel Rajasthan
+405 807 Aircel Haryana
+405 808 Aircel Madhya_Pradesh
+405 809 Aircel Kerala
+405 810 Aircel UP_East
+405 811 Aircel UP_West
+405 812 Aircel Punjab
+405 840 Jio West_Bengal
+405 845 Vi Assam
+405 846 Vi Jammu_Kashmir
+405 847 Vi Karnataka
+405 848 Vi Kolkata
+405 849 Vi North_East
+405 850 Vi Odisha
+405 851 Vi Punjab
+405 852 Vi Tamil_Nadu
+405 853 Vi West_Bengal
+405 854 Jio Andhra_Pradesh
+405 855 Jio Assam
+405 856 Jio Bihar
+405 857 Jio Gujarat
+405 858 Jio Haryana
+405 859 Jio Himachal_Pradesh
+405 860 Jio Jammu_Kashmir
+405 861 Jio Karnataka
+405 862 Jio Kerala
+405 863 Jio Madhya_Pradesh
+405 864 Jio Maharashtra
+405 865 Jio North_East
+405 866 Jio Odisha
+405 867 Jio Punjab
+405 868 Jio Rajasthan
+405 869 Jio Tamil_Nadu
+405 870 Jio UP_West
+405 871 Jio UP_East
+405 872 Jio Delhi
+405 873 Jio Kolkata
+405 874 Jio Mumbai
+"""
+
+# ============== REGISTRY ==============
+_table = None   # (mcc << 16 | mnc) -> (operator, circle)
+
+
+def _key(mcc, mnc):
+    return (int(mcc) << 16) | int(mnc)
+
+
+def _load():
+    """Build the packed table once (India list, then the optional CSV)"""
+    global _table
+    table = {}
+    names = {}   # intern operator / circle strings
+    for line in INDIA.split('\n'):
+        parts = line.split()
+        if len(parts) == 4:
+            op = names.setdefault(parts[2], parts[2].replace('_', ' '))
+            circle = names.setdefault(parts[3], parts[3].replace('_', ' '))
+            table[_key(parts[0], parts[1])] = (op, circle)
+    if os.path.exists(OPERATORS_CSV):
+        try:
+            _load_csv(OPERATORS_CSV, table, names)
+        except (OSError, ValueError, csv.Error):
+            pass
+    _table = table
+    return table
+
+
+def _load_csv(path, table, names):
+    """Merge an ITU / mcc-mnc CSV; the curated India entries win"""
+    with open(path, newline='', encoding='utf-8', errors='replace') as f:
+        reader = csv.DictReader(f)
+        cols = {c.lower().strip(): c for c in reader.fieldnames or []}
+        mcc_col = cols.get('mcc')
+        mnc_col = cols.get('mnc')
+        name_col = next((cols[c] for c in ('network', 'operator', 'brand') if c in cols), None)
+        area_col = next((cols[c] for c in ('country', 'circle', 'region') if c in cols), None)
+        if not (mcc_col and mnc_col and name_col):
+            raise ValueError(f"{path}: need mcc, mnc and network columns")
+        for row in reader:
+            try:
+                key = _key(row[mcc_col], row[mnc_col])
+            except (TypeError, ValueError):
+                continue
+            if key in table or not row[name_col]:
+                continue
+            op = row[name_col].strip()
+            area = (row[area_col] or '').strip() if area_col else ''
+            table[key] = (names.setdefault(op, op), names.setdefault(area, area))
+
+
+def lookup(mcc, mnc):
+    """(operator, circle) or None"""
+    table = _table if _table is not None else _load()
+    try:
+        return table.get((int(mcc) << 16) | int(mnc))
+    except (TypeError, ValueError):
+        return None
+
+
+def name(mcc, mnc, default='Unknown'):
+    """Operator name for a PLMN ('Airtel', 'Jio', 'Vi', 'BSNL', 'MTNL' ...)"""
+    hit = lookup(mcc, mnc)
+    return hit[0] if hit else default
+
+
+def circle(mcc, mnc, default=''):
+    """Telecom circle (India) or country/region from the CSV"""
+    hit = lookup(mcc, mnc)
+    return hit[1] if hit else default
+
+
+def label(mcc, mnc, default='Unknown'):
+    """'MTNL Delhi' style operator + circle"""
+    hit = lookup(mcc, mnc)
+    if not hit:
+        return default
+    return f"{hit[0]} {hit[1]}" if hit[1] else hit[0]
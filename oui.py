@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+🏷️ OUI - MAC vendor lookup for all 8xRadar tools
+Curated category tables + optional full IEEE registry in a memory-mapped index
+
+  python oui.py import oui.txt mam.csv oui36.csv     # build oui.bin (MA-L/MA-M/MA-S)
+  python oui.py lookup 28:57:be:12:34:56
+"""
+
+import csv
+import mmap
+import os
+import struct
+import sys
+
+OUI_BIN = os.environ.get(
+    'RADAR_OUI', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'oui.bin'))
+
+# ============== CATEGORIES ==============
+GENERAL, CAMERA, IOT, TV, PRINTER, PHONE = range(6)
+CATEGORY_NAMES = ('', 'Camera', 'IoT', 'Smart TV', 'Printer', 'Phone')
+
+# ============== CURATED VENDORS ==============
+CAMERA_VENDORS = {
+    '00:80:f0': 'Panasonic', '28:57:be': 'Hikvision', '54:c4:15': 'Hikvision',
+    'c0:56:e3': 'Hikvision', '44:19:b6': 'Hikvision', 'c4:2f:90': 'Hikvision',
+    'e0:50:8b': 'Dahua', '3c:ef:8c': 'Dahua', '90:02:a9': 'Dahua',
+    '00:62:6e': 'Dahua', 'a0:bd:1d': 'Dahua', '00:1f:54': 'Lorex',
+    '00:40:8c': 'Axis', '00:1a:07': 'Arecont', '00:30:53': 'Basler',
+    '7c:dd:90': 'Xiaomi Cam', '78:11:dc': 'Xiaomi Cam', '00:55:da': 'Xiongmai',
+    '00:12:41': 'Xiongmai', 'ac:cf:23': 'Hikvision', 'c0:3d:03': 'Hikvision',
+}
+
+IOT_VENDORS = {
+    # Smart Home
+    '18:b4:30': 'Nest', '64:16:66': 'Nest', 'f4:f5:d8': 'Google Home',
+    '30:fd:38': 'Google Home', '1c:f2:9a': 'Google Home', 'e4:f0:42': 'Google Home',
+    '44:07:0b': 'Google Chromecast', 'd4:73:d7': 'Google Chromecast',
+    '68:a4:0e': 'Amazon Echo', '74:c2:46': 'Amazon Echo', 'fc:65:de': 'Amazon Echo',
+    '00:fc:8b': 'Amazon Echo', 'a4:08:ea': 'Amazon Echo', '84:d6:d0': 'Amazon Echo',
+    'b4:7c:9c': 'Amazon Fire TV', '00:bb:3a': 'Amazon Fire TV',
+    # Smart Plugs/Switches
+    '5c:cf:7f': 'Tuya/Smart Life', 'd8:f1:5b': 'Tuya/Smart Life',
+    '60:01:94': 'Tuya/Smart Life', '68:57:2d': 'Tuya/Smart Life',
+    '50:02:91': 'TP-Link Smart', 'b0:be:76': 'TP-Link Smart',
+    '98:da:c4': 'TP-Link Smart', '1c:3b:f3': 'TP-Link Smart',
+    # Smart Bulbs
+    'd0:73:d5': 'Philips Hue', '00:17:88': 'Philips Hue',
+    'ec:b5:fa': 'Philips Hue', 'b4:e6:2d': 'Philips Hue',
+    # Xiaomi IoT
+    '28:6a:ba': 'Xiaomi IoT', '0c:1d:af': 'Xiaomi IoT', '14:f6:5a': 'Xiaomi IoT',
+    '78:02:f8': 'Xiaomi IoT', '64:09:80': 'Xiaomi IoT', '04:cf:8c': 'Xiaomi IoT',
+    # Smart Locks
+    '00:1a:22': 'Yale Lock', 'e0:b9:4d': 'August Lock',
+    # Robot Vacuums
+    '50:ec:50': 'iRobot Roomba', '80:c5:f2': 'iRobot Roomba',
+    '74:f6:1c': 'Roborock', '70:9c:d1': 'Roborock',
+}
+
+SMART_TV_VENDORS = {
+    '00:09:df': 'LG TV', '00:1c:62': 'LG TV', '00:1e:75': 'LG TV',
+    '00:22:a9': 'LG TV', '00:24:83': 'LG TV', '00:26:e8': 'LG TV',
+    '00:34:da': 'LG TV', '00:e0:91': 'LG TV', '10:68:3f': 'LG TV',
+    '00:07:a6': 'Samsung TV', '00:09:18': 'Samsung TV', '00:0d:ae': 'Samsung TV',
+    '00:12:47': 'Samsung TV', '00:13:77': 'Samsung TV', '00:15:b9': 'Samsung TV',
+    '00:16:32': 'Samsung TV', '00:17:c9': 'Samsung TV', '00:18:af': 'Samsung TV',
+    '00:1a:8a': 'Samsung TV', '00:1b:98': 'Samsung TV', '00:1c:43': 'Samsung TV',
+    '00:1d:25': 'Samsung TV', '00:1d:f6': 'Samsung TV', '00:1e:7d': 'Samsung TV',
+    '00:1f:cc': 'Samsung TV', '00:21:19': 'Samsung TV', '00:21:4c': 'Samsung TV',
+    '00:e0:4c': 'Realtek (Smart TV)', '00:1a:79': 'TCL TV',
+    '00:04:4b': 'Sony TV', '00:0a:d9': 'Sony TV', '00:0e:07': 'Sony TV',
+    '00:12:ee': 'Sony TV', '00:13:a9': 'Sony TV', '00:15:c1': 'Sony TV',
+    '00:16:20': 'Sony TV', '00:18:13': 'Sony TV', '00:19:c5': 'Sony TV',
+    '00:1a:80': 'Sony TV', '00:1d:ba': 'Sony TV', '00:1e:a4': 'Sony TV',
+    '28:d2:44': 'TCL/Roku TV', '00:0d:4b': 'Roku', 'b8:3e:59': 'Roku',
+    'b0:a7:37': 'Roku', 'ac:3a:7a': 'Roku', 'd8:31:34': 'Roku',
+    '00:8e:f2': 'MI TV', '64:cc:2e': 'MI TV', '98:fa:e3': 'MI TV',
+}
+
+PRINTER_VENDORS = {
+    '00:00:48': 'HP Printer', '00:01:e6': 'HP Printer', '00:02:a5': 'HP Printer',
+    '00:0b:cd': 'HP Printer', '00:0d:9d': 'HP Printer', '00:0e:7f': 'HP Printer',
+    '00:0f:61': 'HP Printer', '00:10:83': 'HP Printer', '00:11:0a': 'HP Printer',
+    '00:12:79': 'HP Printer', '00:13:21': 'HP Printer', '00:14:38': 'HP Printer',
+    '00:15:60': 'HP Printer', '00:16:35': 'HP Printer', '00:17:08': 'HP Printer',
+    '00:18:fe': 'HP Printer', '00:19:bb': 'HP Printer', '00:1a:4b': 'HP Printer',
+    '00:00:85': 'Canon Printer', '00:00:f0': 'Canon Printer', '00:1e:8f': 'Canon Printer',
+    '18:0c:ac': 'Canon Printer', '3c:a9:f4': 'Canon Printer', '54:04:a6': 'Canon Printer',
+    '00:00:00': 'Xerox Printer', '00:00:01': 'Xerox Printer', '00:00:aa': 'Xerox Printer',
+    '00:00:48': 'Epson Printer', '00:1b:a9': 'Brother Printer', '00:80:77': 'Brother Printer',
+}
+
+PHONE_VENDORS = {
+    # Apple
+    '00:03:93': 'Apple', '00:0a:95': 'Apple', '00:0d:93': 'Apple',
+    '00:11:24': 'Apple', '00:14:51': 'Apple', '00:16:cb': 'Apple',
+    '00:17:f2': 'Apple', '00:19:e3': 'Apple', '00:1b:63': 'Apple',
+    '00:1c:b3': 'Apple', '00:1d:4f': 'Apple', '00:1e:52': 'Apple',
+    '00:1f:5b': 'Apple', '00:1f:f3': 'Apple', '00:21:e9': 'Apple',
+    # Samsung
+    '00:12:fb': 'Samsung', '00:13:77': 'Samsung', '00:15:99': 'Samsung',
+    '00:16:32': 'Samsung', '00:17:d5': 'Samsung', '00:18:af': 'Samsung',
+    '00:1a:8a': 'Samsung', '00:1b:98': 'Samsung', '00:1c:43': 'Samsung',
+    '9c:02:98': 'Samsung', '9c:3a:af': 'Samsung', '9c:65:b0': 'Samsung',
+    # Xiaomi
+    '28:6a:ba': 'Xiaomi', '0c:1d:af': 'Xiaomi', '14:f6:5a': 'Xiaomi',
+    '18:59:36': 'Xiaomi', '20:82:c0': 'Xiaomi', '34:80:b3': 'Xiaomi',
+    '64:b4:73': 'Xiaomi', '78:02:f8': 'Xiaomi', '98:fa:e3': 'Xiaomi',
+    # OnePlus
+    '2c:33:61': 'OnePlus', '64:a2:f9': 'OnePlus', '94:65:2d': 'OnePlus',
+    # Realme/Oppo
+    '3c:cd:5d': 'Realme/Oppo', '48:db:50': 'Realme/Oppo', '5c:4c:a9': 'Realme/Oppo',
+    '74:04:2b': 'Realme/Oppo', '90:17:ac': 'Realme/Oppo', 'a4:3b:fa': 'Realme/Oppo',
+    # Vivo
+    '00:27:15': 'Vivo', '3c:b6:b7': 'Vivo', '58:3f:54': 'Vivo',
+}
+
+# Routers, phones, PCs, VMs (no device category)
+GENERAL_VENDORS = {
+    '00:00:0c': 'Cisco', '00:01:42': 'Cisco', '00:1a:a1': 'Cisco',
+    '00:50:56': 'VMware', '00:0c:29': 'VMware', '00:15:5d': 'Microsoft Hyper-V',
+    '08:00:27': 'VirtualBox', '52:54:00': 'QEMU',
+    'b8:27:eb': 'Raspberry Pi', 'dc:a6:32': 'Raspberry Pi', 'e4:5f:01': 'Raspberry Pi',
+    '00:1e:c2': 'Apple', '00:03:93': 'Apple', '00:0a:95': 'Apple',
+    '00:0d:93': 'Apple', '00:11:24': 'Apple', '00:14:51': 'Apple',
+    '00:16:cb': 'Apple', '00:17:f2': 'Apple', '00:19:e3': 'Apple',
+    '00:1b:63': 'Apple', '00:1c:b3': 'Apple', '00:1d:4f': 'Apple',
+    '00:1e:52': 'Apple', '00:1f:5b': 'Apple', '00:1f:f3': 'Apple',
+    '00:21:e9': 'Apple', '00:22:41': 'Apple', '00:23:12': 'Apple',
+    '00:23:32': 'Apple', '00:23:6c': 'Apple', '00:23:df': 'Apple',
+    '00:24:36': 'Apple', '00:25:00': 'Apple', '00:25:4b': 'Apple',
+    '00:25:bc': 'Apple', '00:26:08': 'Apple', '00:26:4a': 'Apple',
+    '00:26:b0': 'Apple', '00:26:bb': 'Apple', '04:0c:ce': 'Apple',
+    '04:15:52': 'Apple', '04:1e:64': 'Apple', '04:26:65': 'Apple',
+    '04:48:9a': 'Apple', '04:52:f3': 'Apple', '04:54:53': 'Apple',
+    '04:d3:cf': 'Apple', '04:db:56': 'Apple', '04:e5:36': 'Apple',
+    '04:f1:3e': 'Apple', '04:f7:e4': 'Apple', '08:66:98': 'Apple',
+    '08:6d:41': 'Apple', '08:70:45': 'Apple', '08:74:02': 'Apple',
+    'f8:ff:c2': 'Apple', 'fc:25:3f': 'Apple', 'fc:e9:98': 'Apple',
+    '00:09:2d': 'HTC', '00:23:76': 'HTC', '18:87:96': 'HTC',
+    '1c:b0:94': 'HTC', '2c:8a:72': 'HTC', '38:e7:d8': 'HTC',
+    '64:a7:69': 'HTC', '7c:61:93': 'HTC', '80:01:84': 'HTC',
+    '84:7a:88': 'HTC', '90:21:55': 'HTC', '98:0d:2e': 'HTC',
+    'a0:f4:50': 'HTC', 'ac:37:43': 'HTC', 'b4:ce:f6': 'HTC',
+    'd8:b3:77': 'HTC', 'e8:99:c4': 'HTC', 'f8:db:7f': 'HTC',
+    '00:12:fb': 'Samsung', '00:13:77': 'Samsung', '00:15:99': 'Samsung',
+    '00:16:32': 'Samsung', '00:16:6b': 'Samsung', '00:16:6c': 'Samsung',
+    '00:17:c9': 'Samsung', '00:17:d5': 'Samsung', '00:18:af': 'Samsung',
+    '00:1a:8a': 'Samsung', '00:1b:98': 'Samsung', '00:1c:43': 'Samsung',
+    '00:1d:25': 'Samsung', '00:1d:f6': 'Samsung', '00:1e:7d': 'Samsung',
+    '00:1f:cc': 'Samsung', '00:1f:cd': 'Samsung', '00:21:19': 'Samsung',
+    '00:21:4c': 'Samsung', '00:21:d1': 'Samsung', '00:21:d2': 'Samsung',
+    '00:23:39': 'Samsung', '00:23:3a': 'Samsung', '00:23:99': 'Samsung',
+    '00:23:d6': 'Samsung', '00:23:d7': 'Samsung', '00:24:54': 'Samsung',
+    '00:24:90': 'Samsung', '00:24:91': 'Samsung', '00:24:e9': 'Samsung',
+    '00:25:66': 'Samsung', '00:25:67': 'Samsung', '00:26:37': 'Samsung',
+    '9c:02:98': 'Samsung', '9c:3a:af': 'Samsung', '9c:65:b0': 'Samsung',
+    '28:6a:ba': 'Xiaomi', '0c:1d:af': 'Xiaomi', '14:f6:5a': 'Xiaomi',
+    '18:59:36': 'Xiaomi', '20:82:c0': 'Xiaomi', '34:80:b3': 'Xiaomi',
+    '38:a4:ed': 'Xiaomi', '3c:bd:3e': 'Xiaomi', '50:64:2b': 'Xiaomi',
+    '58:44:98': 'Xiaomi', '64:09:80': 'Xiaomi', '64:b4:73': 'Xiaomi',
+    '68:df:dd': 'Xiaomi', '74:23:44': 'Xiaomi', '74:51:ba': 'Xiaomi',
+    '78:02:f8': 'Xiaomi', '78:11:dc': 'Xiaomi', '7c:1d:d9': 'Xiaomi',
+    '84:f3:eb': 'Xiaomi', '88:c3:97': 'Xiaomi', '8c:be:be': 'Xiaomi',
+    '98:fa:e3': 'Xiaomi', '9c:99:a0': 'Xiaomi', 'a0:86:c6': 'Xiaomi',
+    'a4:77:33': 'Xiaomi', 'ac:c1:ee': 'Xiaomi', 'ac:f7:f3': 'Xiaomi',
+    'b0:e2:35': 'Xiaomi', 'c4:0b:cb': 'Xiaomi', 'c4:6a:b7': 'Xiaomi',
+    'd4:97:0b': 'Xiaomi', 'e8:ab:fa': 'Xiaomi', 'ec:d0:9f': 'Xiaomi',
+    'f0:b4:29': 'Xiaomi', 'f4:f5:db': 'Xiaomi', 'f8:a4:5f': 'Xiaomi',
+    'fc:64:ba': 'Xiaomi',
+    '2c:33:61': 'OnePlus', '64:a2:f9': 'OnePlus', '94:65:2d': 'OnePlus',
+    'c0:ee:fb': 'OnePlus',
+    '00:09:df': 'Realme/Oppo', '1c:77:f6': 'Realme/Oppo', '2c:5b:b8': 'Realme/Oppo',
+    '3c:cd:5d': 'Realme/Oppo', '48:db:50': 'Realme/Oppo', '5c:4c:a9': 'Realme/Oppo',
+    '74:04:2b': 'Realme/Oppo', '88:44:77': 'Realme/Oppo', '90:17:ac': 'Realme/Oppo',
+    '94:d9:b3': 'Realme/Oppo', 'a4:3b:fa': 'Realme/Oppo', 'ac:5a:fc': 'Realme/Oppo',
+    'b4:a9:84': 'Realme/Oppo', 'bc:7f:a4': 'Realme/Oppo', 'c4:50:06': 'Realme/Oppo',
+    'd4:50:3f': 'Realme/Oppo', 'e8:61:7e': 'Realme/Oppo', 'ec:5c:68': 'Realme/Oppo',
+    'f4:c1:14': 'Realme/Oppo',
+    '00:e0:4c': 'Realtek', '4c:ed:fb': 'Realtek', '52:54:00': 'Realtek',
+    '00:1d:7e': 'TP-Link', '14:cc:20': 'TP-Link', '14:cf:92': 'TP-Link',
+    '18:a6:f7': 'TP-Link', '1c:3b:f3': 'TP-Link', '30:b5:c2': 'TP-Link',
+    '50:c7:bf': 'TP-Link', '54:c8:0f': 'TP-Link', '5c:89:9a': 'TP-Link',
+    '60:e3:27': 'TP-Link', '64:56:01': 'TP-Link', '64:66:b3': 'TP-Link',
+    '64:70:02': 'TP-Link', '6c:5a:b0': 'TP-Link', '78:44:76': 'TP-Link',
+    '90:f6:52': 'TP-Link', '94:0c:6d': 'TP-Link', '98:da:c4': 'TP-Link',
+    'a4:2b:b0': 'TP-Link', 'ac:84:c6': 'TP-Link', 'b0:4e:26': 'TP-Link',
+    'b0:95:75': 'TP-Link', 'c0:25:e9': 'TP-Link', 'c4:6e:1f': 'TP-Link',
+    'c8:3a:35': 'TP-Link', 'd4:6e:0e': 'TP-Link', 'd8:07:b6': 'TP-Link',
+    'e4:d3:32': 'TP-Link', 'e8:94:f6': 'TP-Link', 'ec:08:6b': 'TP-Link',
+    'ec:17:2f': 'TP-Link', 'f4:ec:38': 'TP-Link', 'f8:1a:67': 'TP-Link',
+    '34:60:f9': 'Jio', '48:ee:0c': 'Jio', '5c:aa:fd': 'Jio',
+    '74:40:be': 'Jio', '78:d2:94': 'Jio', '84:a9:3e': 'Jio',
+    '94:b8:6d': 'Jio', 'a4:c6:4f': 'Jio', 'b4:a9:fc': 'Jio',
+    'c8:02:10': 'Jio', 'd4:a1:48': 'Jio', 'e8:65:d4': 'Jio',
+    'f0:81:75': 'Jio', 'f4:ee:14': 'Jio',
+}
+
+# Precedence: a prefix listed in several tables takes the first category
+CURATED = [(CAMERA, CAMERA_VENDORS), (IOT, IOT_VENDORS), (TV, SMART_TV_VENDORS),
+           (PRINTER, PRINTER_VENDORS), (PHONE, PHONE_VENDORS), (GENERAL, GENERAL_VENDORS)]
+
+
+# ============== MAC HELPERS ==============
+def mac_to_int(mac):
+    """48-bit integer from 'aa:bb:cc:dd:ee:ff' / 'AA-BB-..' / 'aabb.ccdd.eeff'"""
+    digits = ''.join(c for c in str(mac) if c not in ':-. ')
+    if len(digits) < 6:
+        return None
+    try:
+        return int(digits[:12].ljust(12, '0'), 16)
+    except ValueError:
+        return None
+
+
+def _pack(bits, prefix):
+    return (bits << 40) | prefix
+
+
+# ============== BINARY INDEX ==============
+# header:  magic 'OUI1', record count, strings offset, reserved   (16 bytes)
+# record:  key = bits << 40 | prefix, name offset, name length, category, pad
+HEADER = struct.Struct('<4sIII')
+RECORD = struct.Struct('<QIHBx')
+MAGIC = b'OUI1'
+PREFIX_BITS = (36, 28, 24)   # most specific first
+
+
+class OUIIndex:
+    """Read-only, mmap-backed sorted index; O(log n) lookups, no parsing at open"""
+
+    def __init__(self, path=OUI_BIN):
+        self.f = open(path, 'rb')
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.strings, _ = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not an OUI index")
+
+    def _find(self, key):
+        lo, hi = 0, self.count
+        mm = self.mm
+        base = HEADER.size
+        size = RECORD.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = struct.unpack_from('<Q', mm, base + mid * size)[0]
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                _, off, length, cat = RECORD.unpack_from(mm, base + mid * size)
+                start = self.strings + off
+                return mm[start:start + length].decode('utf-8', 'replace'), cat
+        return None
+
+    def lookup(self, mac48):
+        for bits in PREFIX_BITS:
+            hit = self._find(_pack(bits, mac48 >> (48 - bits)))
+            if hit:
+                return hit
+        return None
+
+    def close(self):
+        self.mm.close()
+        self.f.close()
+
+
+def write_index(entries, path=OUI_BIN):
+    """entries: {(bits, prefix): (name, category)} -> sorted fixed-width file"""
+    names = {}
+    blob = bytearray()
+    records = []
+    for (bits, prefix), (name, cat) in entries.items():
+        raw = name.encode('utf-8')[:0xffff]
+        off = names.get(raw)
+        if off is None:
+            off = names[raw] = len(blob)
+            blob += raw
+        records.append((_pack(bits, prefix), off, len(raw), cat))
+    records.sort()
+    strings = HEADER.size + RECORD.size * len(records)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(records), strings, 0))
+        for rec in records:
+            f.write(RECORD.pack(*rec))
+        f.write(blob)
+    os.replace(tmp, path)
+    return len(records)
+
+
+# ============== IEEE IMPORT ==============
+def parse_ieee(path):
+    """Yield (bits, prefix, organisation) from oui.txt or MA-L/MA-M/MA-S CSV"""
+    with open(path, encoding='utf-8', errors='replace', newline='') as f:
+        head = f.read(4096)
+        f.seek(0)
+        if head.lstrip().startswith('Registry,'):
+            for row in csv.DictReader(f):
+                assignment = (row.get('Assignment') or '').strip()
+                org = (row.get('Organization Name') or '').strip()
+                if assignment and org:
+                    try:
+                        yield len(assignment) * 4, int(assignment, 16), org
+                    except ValueError:
+                        continue
+        else:
+            # oui.txt: "28-57-BE   (hex)\t\tHangzhou Hikvision ..."
+            for line in f:
+                if '(hex)' not in line:
+                    continue
+                left, _, org = line.partition('(hex)')
+                try:
+                    yield 24, int(left.strip().replace('-', ''), 16), org.strip()
+                except ValueError:
+                    continue
+
+
+def build(paths, out=OUI_BIN):
+    """IEEE registries + curated categories -> oui.bin"""
+    entries = {}
+    for path in paths:
+        for bits, prefix, org in parse_ieee(path):
+            entries[(bits, prefix)] = (org, GENERAL)
+    # Curated tables win (short names + category); reversed so precedence holds
+    for cat, table in reversed(CURATED):
+        for prefix, name in table.items():
+            entries[(24, mac_to_int(prefix) >> 24)] = (name, cat)
+    # MA-M / MA-S blocks inside a curated MA-L inherit its category
+    for (bits, prefix), (name, cat) in list(entries.items()):
+        if bits > 24 and cat == GENERAL:
+            parent = entries.get((24, prefix >> (bits - 24)))
+            if parent and parent[1] != GENERAL:
+                entries[(bits, prefix)] = (name, parent[1])
+    return write_index(entries, out)
+
+
+# ============== LOOKUP ==============
+_index = None
+_curated = None
+
+
+def _load():
+    """Open oui.bin once; without it fall back to the curated tables"""
+    global _index, _curated
+    if _index is None and _curated is None:
+        try:
+            _index = OUIIndex(OUI_BIN)
+        except (OSError, ValueError):
+            _curated = {}
+            for cat, table in reversed(CURATED):
+                for prefix, name in table.items():
+                    _curated[mac_to_int(prefix) >> 24] = (name, cat)
+
+
+def lookup(mac):
+    """(vendor, category) for a MAC, or (None, GENERAL)"""
+    mac48 = mac_to_int(mac) if mac else None
+    if mac48 is None:
+        return None, GENERAL
+    _load()
+    hit = _index.lookup(mac48) if _index is not None else _curated.get(mac48 >> 24)
+    return hit if hit else (None, GENERAL)
+
+
+def vendor(mac):
+    """Vendor name for a MAC (None if unknown)"""
+    return lookup(mac)[0]
+
+
+def category(mac):
+    """Category id (CAMERA, IOT, TV, PRINTER, PHONE or GENERAL)"""
+    return lookup(mac)[1]
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) >= 1 and args[0] == 'import':
+        out = OUI_BIN
+        if '-o' in args:
+            i = args.index('-o')
+            out = args[i + 1]
+            del args[i:i + 2]
+        n = build(args[1:], out)
+        print(f"  {n} prefixes -> {out} ({os.path.getsize(out) // 1024} KB)")
+    elif len(args) >= 2 and args[0] == 'lookup':
+        for mac in args[1:]:
+            name, cat = lookup(mac)
+            print(f"  {mac}  {name or 'Unknown'}  {CATEGORY_NAMES[cat]}")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,10 @@ import json
 import os
 import sys
 import time
-from datetime import datetime
+
+import bands
+import broker
+import operators
 
 # ============== COLORS ==============
 class C:
@@ -21,13 +24,6 @@ class C:
 def clear():
     os.system('clear' if os.name != 'nt' else 'cls')
 
-def cmd(c):
-    try:
-        r = subprocess.run(c, shell=True, capture_output=True, text=True, timeout=30)
-        return r.stdout + r.stderr
-    except:
-        return ""
-
 def pause():
     input(f"\n{C.DIM}Press Enter to continue...{C.E}")
 
@@ -71,27 +67,6 @@ def main_menu():
     └───────────────────────────────────────────────────┘
 """)
 
-# ============== OPERATORS ==============
-OPERATORS = {
-    (404,10):"Airtel",(404,40):"Airtel",(404,45):"Airtel",(404,49):"Airtel",
-    (404,90):"Airtel",(404,92):"Airtel",(404,93):"Airtel",(404,94):"Airtel",
-    (404,11):"Vi",(404,12):"Vi",(404,20):"Vi",(404,86):"Vi",(404,88):"Vi",
-    (405,840):"Jio",(405,854):"Jio",(405,855):"Jio",(405,857):"Jio",
-    (405,858):"Jio",(405,859):"Jio",(405,860):"Jio",(405,861):"Jio",
-    (405,862):"Jio",(405,863):"Jio",(405,864):"Jio",(405,865):"Jio",
-    (404,34):"BSNL",(404,38):"BSNL",(404,51):"BSNL",(404,72):"BSNL",
-}
-
-LTE_BANDS = {1:"B1(2100)",3:"B3(1800)",5:"B5(850)",8:"B8(900)",40:"B40(2300)",41:"B41(2500)"}
-
-def earfcn_to_band(e):
-    if 0<=e<=599: return 1
-    if 1200<=e<=1949: return 3
-    if 2400<=e<=2649: return 5
-    if 3450<=e<=3799: return 8
-    if 38650<=e<=39649: return 40
-    if 39650<=e<=41589: return 41
-    return None
 
 def signal_bar(rssi):
     if rssi is None: return f"{C.DIM}░░░░░{C.E}"
@@ -109,7 +84,7 @@ def wifi_scanner():
     print(f"\n{C.G}{C.BOLD}╔══════════════════════ 📡 WiFi SCANNER ══════════════════════╗{C.E}")
     print(f"{C.Y}Scanning WiFi networks...{C.E}\n")
     
-    out = cmd("termux-wifi-scaninfo 2>/dev/null")
+    out = broker.fetch('wifi')
     if not out or 'error' in out.lower():
         print(f"{C.R}Error: Install Termux:API app from F-Droid{C.E}")
         pause()
@@ -158,7 +133,7 @@ def bluetooth_scanner():
     print(f"\n{C.B}{C.BOLD}╔══════════════════════ 🔵 BLUETOOTH SCANNER ══════════════════════╗{C.E}")
     print(f"{C.Y}Scanning Bluetooth devices...{C.E}\n")
     
-    out = cmd("termux-bluetooth-scaninfo 2>/dev/null")
+    out = broker.fetch('bluetooth')
     if not out or 'error' in out.lower():
         print(f"{C.R}Error: Install Termux:API app{C.E}")
         pause()
@@ -200,7 +175,7 @@ def cell_analyzer():
     print(f"\n{C.M}{C.BOLD}╔══════════════════════ 📶 CELL TOWER ANALYZER ══════════════════════╗{C.E}")
     print(f"{C.Y}Scanning cell towers...{C.E}\n")
     
-    out = cmd("termux-telephony-cellinfo 2>/dev/null")
+    out = broker.fetch('cell')
     if not out or 'error' in out.lower():
         print(f"{C.R}Error: Install Termux:API app{C.E}")
         pause()
@@ -218,9 +193,9 @@ def cell_analyzer():
             if 'lte' in ctype:
                 lte_count += 1
                 mcc,mnc = cell.get('mcc',0),cell.get('mnc',0)
-                op = OPERATORS.get((mcc,mnc),'Unknown')
+                op = operators.name(mcc, mnc)
                 earfcn = cell.get('earfcn',0)
-                band = earfcn_to_band(earfcn)
+                ch = bands.lte(earfcn)
                 ci = cell.get('ci')
                 ta = cell.get('timingAdvance')
                 
@@ -231,7 +206,7 @@ def cell_analyzer():
                 if ci:
                     print(f"  │ eNodeB: {ci//256}  Sector: {ci%256}")
                 print(f"  │ PCI: {cell.get('pci')}  EARFCN: {earfcn}")
-                print(f"  │ Band: {C.C}{LTE_BANDS.get(band,'?')}{C.E}")
+                print(f"  │ Band: {C.C}{ch['label'] if ch else '?'}{C.E}")
                 print(f"  │ RSRP: {cell.get('rsrp')} dBm  RSRQ: {cell.get('rsrq')} dB")
                 print(f"  │ SINR: {cell.get('rssnr')} dB")
                 if ta is not None and ta >= 0:
@@ -242,7 +217,7 @@ def cell_analyzer():
             elif 'nr' in ctype or '5g' in ctype:
                 nr_count += 1
                 mcc,mnc = cell.get('mcc',0),cell.get('mnc',0)
-                op = OPERATORS.get((mcc,mnc),'Unknown')
+                op = operators.name(mcc, mnc)
                 
                 print(f"  {C.C}━━━ 5G NR {status} ━━━{C.E}")
                 print(f"  │ Operator: {C.BOLD}{op}{C.E}")
@@ -275,7 +250,7 @@ def satellite_tracker():
     print(f"{C.Y}Getting GPS satellite info...{C.E}\n")
     
     # Get location first
-    out = cmd("termux-location -p gps 2>/dev/null")
+    out = broker.fetch('gps', timeout=30)
     if out:
         try:
             loc = json.loads(out)
@@ -306,10 +281,9 @@ def satellite_tracker():
     
     # ISS
     print(f"  {C.Y}{C.BOLD}🛸 ISS (International Space Station):{C.E}")
-    iss_out = cmd("curl -s 'http://api.open-notify.org/iss-now.json' 2>/dev/null")
-    if iss_out:
+    iss = broker.http_json('http://api.open-notify.org/iss-now.json')
+    if iss:
         try:
-            iss = json.loads(iss_out)
             pos = iss.get('iss_position',{})
             print(f"     Latitude:  {pos.get('latitude','?')}°")
             print(f"     Longitude: {pos.get('longitude','?')}°")
@@ -352,7 +326,7 @@ def camera_detector():
     cameras_found = []
     
     # Scan WiFi for camera devices
-    out = cmd("termux-wifi-scaninfo 2>/dev/null")
+    out = broker.fetch('wifi')
     if out:
         try:
             networks = json.loads(out)
@@ -417,7 +391,7 @@ def network_scanner():
     print(f"{C.Y}Scanning local network...{C.E}\n")
     
     # Get gateway
-    gw = cmd("ip route | grep default | awk '{print $3}'").strip()
+    gw = broker.default_gateway()
     if not gw:
         print(f"{C.R}Not connected to any network{C.E}")
         pause()
@@ -428,7 +402,7 @@ def network_scanner():
     print(f"  Scanning: {subnet}\n")
     
     # nmap scan
-    out = cmd(f"nmap -sn {subnet} 2>/dev/null")
+    out = broker.ping_sweep(subnet)
     if 'Nmap scan report' in out:
         devices = []
         current_ip = None
@@ -453,7 +427,7 @@ def network_scanner():
         
         # Fallback: ARP table
         print(f"\n  {C.BOLD}ARP Table:{C.E}")
-        arp = cmd("ip neigh show")
+        arp = broker.run(['ip', 'neigh', 'show'])
         print(f"  {arp}")
     
     print(f"\n{C.Y}╚══════════════════════════════════════════════════════════════════════╝{C.E}")
@@ -465,7 +439,7 @@ def gps_location():
     print(f"\n{C.G}{C.BOLD}╔══════════════════════ 📍 GPS LOCATION ══════════════════════╗{C.E}")
     print(f"{C.Y}Getting GPS location...{C.E}\n")
     
-    out = cmd("termux-location -p gps 2>/dev/null")
+    out = broker.fetch('gps', timeout=30)
     if out:
         try:
             loc = json.loads(out)
@@ -501,7 +475,7 @@ def full_scan():
     
     # WiFi
     print(f"  {C.G}[1/4]{C.E} Scanning WiFi...")
-    out = cmd("termux-wifi-scaninfo 2>/dev/null")
+    out = broker.fetch('wifi')
     if out:
         try:
             nets = json.loads(out)
@@ -511,7 +485,7 @@ def full_scan():
     
     # Bluetooth
     print(f"  {C.B}[2/4]{C.E} Scanning Bluetooth...")
-    out = cmd("termux-bluetooth-scaninfo 2>/dev/null")
+    out = broker.fetch('bluetooth')
     if out:
         try:
             devs = json.loads(out)
@@ -521,7 +495,7 @@ def full_scan():
     
     # Cell
     print(f"  {C.M}[3/4]{C.E} Scanning Cell Towers...")
-    out = cmd("termux-telephony-cellinfo 2>/dev/null")
+    out = broker.fetch('cell')
     if out:
         try:
             cells = json.loads(out)
@@ -531,7 +505,7 @@ def full_scan():
     
     # GPS
     print(f"  {C.Y}[4/4]{C.E} Getting GPS...")
-    out = cmd("termux-location -p network 2>/dev/null")
+    out = broker.fetch('network_location', timeout=30)
     if out:
         try:
             loc = json.loads(out)
@@ -555,9 +529,9 @@ def live_dashboard():
     
     # Check if file exists
     if os.path.exists('8xradar.py'):
-        os.system('python 8xradar.py')
+        subprocess.run([sys.executable, '8xradar.py'])
     elif os.path.exists('ultimate_radar.py'):
-        os.system('python ultimate_radar.py')
+        subprocess.run([sys.executable, 'ultimate_radar.py'])
     else:
         print(f"{C.R}Dashboard files not found!{C.E}")
         print(f"Make sure all files are in the same directory.")
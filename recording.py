@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+⏺️ RECORDING - Dashboard session recordings with a seek index, and playback
+Append-only log of length-prefixed (zlib) snapshot records + sparse time index
+
+  python 8xradar.py --record                       # writes recordings/8xradar_*.rec
+  python 8xradar.py --play FILE [--at 14:32] [--speed 4]
+  python recording.py info FILE
+  (playback keys: space pause, + / - speed, < / > 1 min, [ / ] 10 min, q quit)
+"""
+
+import _thread
+import bisect
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from types import MappingProxyType
+
+import screen
+
+RECORD_DIR = os.environ.get('RADAR_RECORDINGS', 'recordings')
+MAGIC = b'8XREC\x01\n'
+HEADER = struct.Struct('<IdB')   # payload length, timestamp, flags
+INDEX = struct.Struct('<dQ')     # keyframe timestamp, file offset (.idx sidecar)
+KEYFRAME = 1
+ZLIB = 2
+KEYFRAME_EVERY = 60.0   # seconds of deltas a seek may have to replay
+COMPRESS_MIN = 256      # payloads smaller than this are stored raw
+SKIP = ('version', 'playback')   # store bookkeeping, never recorded
+KEYS_HELP = "space pause  +/- speed  < > 1 min  [ ] 10 min  q quit"
+
+
+# ============== ENCODING ==============
+def _default(value):
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    return str(value)
+
+
+def _hook(obj):
+    if len(obj) == 1 and '$dt' in obj:
+        return datetime.fromisoformat(obj['$dt'])
+    return obj
+
+
+def encode(changes):
+    """(payload, flags) for a dict of snapshot keys"""
+    data = json.dumps(changes, separators=(',', ':'), default=_default).encode()
+    if len(data) >= COMPRESS_MIN:
+        return zlib.compress(data, 6), ZLIB
+    return data, 0
+
+
+def decode(payload, flags):
+    if flags & ZLIB:
+        payload = zlib.decompress(payload)
+    return json.loads(payload, object_hook=_hook)
+
+
+# ============== RECORDER ==============
+class Recorder:
+    """Records every snapshot a SnapshotStore publishes (keyframes + changed keys)"""
+
+    def __init__(self, tool, path=None):
+        self.tool = tool
+        self.path = path
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.frames = self.keyframes = 0
+        self.bytes = 0
+        self.error = None
+
+    def start(self, store):
+        """Open the recording and follow store; failure sets error and records nothing"""
+        if not self.path:
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.path = os.path.join(RECORD_DIR, f"{self.tool}_{stamp}.rec")
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            f = open(self.path, 'wb')
+            idx = open(self.path + '.idx', 'wb')
+            f.write(MAGIC)
+        except OSError as e:
+            self.error = str(e)
+            return self
+        self.bytes = len(MAGIC)
+        # Snapshots are immutable: queueing the reference is all the publisher pays
+        store.subscribe(lambda: self.queue.put(store.get()))
+        self.queue.put(store.get())
+        self.thread = threading.Thread(target=self._writer, args=(f, idx),
+                                       name='recorder', daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join(30)
+        self.thread = None
+
+    def _writer(self, f, idx):
+        prev = None
+        keyed = last = 0.0
+        while True:
+            snap = self.queue.get()
+            if snap is None:
+                break
+            if prev is not None and snap['version'] <= prev['version']:
+                continue
+            # Never decreasing, even across a wall-clock step: the index is bisected
+            ts = max(snap['published'], last)
+            last = ts
+            if prev is None or ts - keyed >= KEYFRAME_EVERY:
+                flags = KEYFRAME
+                changes = {k: v for k, v in snap.items() if k not in SKIP}
+                keyed = ts
+            else:
+                # Copy-on-write: an unchanged key still holds the very same object
+                flags = 0
+                changes = {k: v for k, v in snap.items()
+                           if k not in SKIP and prev.get(k) is not v}
+            prev = snap
+            try:
+                payload, packed = encode(changes)
+                f.write(HEADER.pack(len(payload), ts, flags | packed))
+                f.write(payload)
+                f.flush()
+                if flags & KEYFRAME:
+                    # Indexed only once the record is written: never points past the log
+                    idx.write(INDEX.pack(ts, self.bytes))
+                    idx.flush()
+                    self.keyframes += 1
+                self.bytes += HEADER.size + len(payload)
+                self.frames += 1
+            except (OSError, ValueError) as e:
+                self.error = str(e)
+        f.close()
+        idx.close()
+
+    def summary(self):
+        """Short status line, e.g. 'rec 812 frames 1.3MB'"""
+        if self.thread is None:
+            return ''
+        text = f"rec {self.frames} frames {self.bytes / 1e6:.1f}MB"
+        if self.error:
+            text += f" ERR {self.error}"
+        return text
+
+
+# ============== READER ==============
+class Recording:
+    """Random access to a .rec file through its keyframe index"""
+
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, 'rb')
+        if self.f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: not an 8xRadar recording")
+        self.times, self.offsets = self._index()
+        if not self.times:
+            raise ValueError(f"{path}: no complete keyframe")
+        self.start = self.times[0]
+        self.end = self._last_time()
+
+    def _index(self):
+        """Keyframe (times, offsets) from the sidecar, completed by a header-only
+        scan of whatever was appended after its last entry (or of the whole file)"""
+        times, offsets = [], []
+        try:
+            with open(self.path + '.idx', 'rb') as idx:
+                data = idx.read()
+            size = os.path.getsize(self.path)
+            for ts, offset in INDEX.iter_unpack(data[:len(data) - len(data) % INDEX.size]):
+                if offset >= size:
+                    break
+                times.append(ts)
+                offsets.append(offset)
+        except OSError:
+            pass
+        pos = offsets[-1] if offsets else len(MAGIC)
+        size = os.path.getsize(self.path)
+        for ts, flags, offset, length in self._headers(pos, size):
+            if flags & KEYFRAME and (not offsets or offset > offsets[-1]):
+                times.append(ts)
+                offsets.append(offset)
+        return times, offsets
+
+    def _headers(self, pos, size):
+        """(ts, flags, offset, payload length) of every complete record from pos"""
+        while pos + HEADER.size <= size:
+            self.f.seek(pos)
+            length, ts, flags = HEADER.unpack(self.f.read(HEADER.size))
+            if pos + HEADER.size + length > size:
+                return   # torn final record (recorder killed mid-write)
+            yield ts, flags, pos, length
+            pos += HEADER.size + length
+
+    def _last_time(self):
+        last = self.times[-1]
+        for ts, flags, offset, length in self._headers(self.offsets[-1], os.path.getsize(self.path)):
+            last = ts
+        return last
+
+    def frames(self, offset):
+        """Yield (ts, flags, changes) from a record offset to the end"""
+        for ts, flags, pos, length in self._headers(offset, os.path.getsize(self.path)):
+            self.f.seek(pos + HEADER.size)
+            yield ts, flags, decode(self.f.read(length), flags)
+
+    def seek(self, t):
+        """(state at time t, offset of the next record): nearest keyframe at or before t,
+        then only the deltas up to t"""
+        i = max(bisect.bisect_right(self.times, t) - 1, 0)
+        state = {}
+        next_offset = None
+        for ts, flags, pos, length in self._headers(self.offsets[i], os.path.getsize(self.path)):
+            if state and ts > t:
+                next_offset = pos
+                break
+            self.f.seek(pos + HEADER.size)
+            changes = decode(self.f.read(length), flags)
+            if flags & KEYFRAME:
+                state = changes
+            else:
+                state.update(changes)
+        return state, next_offset
+
+    def time_of_day(self, text):
+        """Timestamp of 'HH:MM[:SS]' on the recording's day(s), or None"""
+        try:
+            clock = datetime.strptime(text, '%H:%M:%S' if text.count(':') == 2 else '%H:%M').time()
+        except ValueError:
+            return None
+        day = datetime.fromtimestamp(self.start).date()
+        ts = datetime.combine(day, clock).timestamp()
+        return ts + 86400 if ts < self.start else ts   # capture ran past midnight
+
+    def close(self):
+        self.f.close()
+
+
+# ============== PLAYBACK ==============
+class Player:
+    """Publishes a recording into a SnapshotStore at N x speed; thread-safe controls"""
+
+    def __init__(self, rec, store, speed=1.0, at=None):
+        self.rec = rec
+        self.store = store
+        self.speed = speed
+        self.paused = False
+        self.ended = False       # past the last frame (not a pause: a seek back resumes)
+        self.pos = max(rec.start, min(at or rec.start, rec.end))
+        self.target = self.pos   # pending seek
+        self.changed = threading.Event()
+        self.stopped = False
+
+    # Controls (any thread)
+    def toggle(self):
+        self.paused = not self.paused
+        self.changed.set()
+
+    def faster(self, factor=2.0):
+        self.speed = min(max(self.speed * factor, 0.25), 256)
+        self.changed.set()
+
+    def skip(self, seconds):
+        self.target = max(self.rec.start, min(self.pos + seconds, self.rec.end))
+        self.changed.set()
+
+    def stop(self):
+        self.stopped = True
+        self.changed.set()
+
+    def status(self):
+        clock = datetime.fromtimestamp(self.pos).strftime('%H:%M:%S')
+        end = datetime.fromtimestamp(self.rec.end).strftime('%H:%M:%S')
+        state = '⏸' if self.paused else '■' if self.ended else '▶'
+        return f"{state} {clock} / {end}  {self.speed:g}x"
+
+    def _publish(self, changes):
+        # playback_ts: the recording's clock, for headers instead of datetime.now()
+        self.store.publish(playback=self.status(), playback_ts=self.pos, **changes)
+
+    def run(self):
+        """Feed the store until stop(); waits at the end of the recording for a seek"""
+        frames = pending = None
+        while not self.stopped:
+            if self.target is not None:
+                self.pos, self.target = self.target, None
+                self.ended = False
+                state, offset = self.rec.seek(self.pos)
+                self._publish(state)
+                frames = self.rec.frames(offset) if offset is not None else iter(())
+                pending = next(frames, None)
+            if self.paused or pending is None:
+                if pending is None and not self.ended:
+                    self.pos = self.rec.end
+                    self.ended = True
+                    self._publish({})
+                self.changed.wait()
+                self.changed.clear()
+                self._publish({})
+                continue
+            ts, flags, changes = pending
+            # Sleep in wall time; controls cut the wait short
+            wall = time.monotonic()
+            delay = (ts - self.pos) / self.speed
+            if delay > 0 and self.changed.wait(delay):
+                self.changed.clear()
+                self.pos += (time.monotonic() - wall) * self.speed
+                self._publish({})
+                continue
+            self.pos = ts
+            self._publish(changes)
+            pending = next(frames, None)
+
+
+def clock(snap):
+    """Dashboard 'now': the playback position while playing, else the wall clock"""
+    ts = snap.get('playback_ts')
+    return datetime.fromtimestamp(ts) if ts is not None else datetime.now()
+
+
+def play(path, store, scr, render, speed=1.0, at=None, out=print):
+    """Drive a dashboard's render() from a recording; returns when the user quits"""
+    try:
+        rec = Recording(path)
+    except (OSError, ValueError) as e:
+        out(f"  Cannot play {path}: {e}")
+        return
+    start = rec.time_of_day(at) if at else None
+    if at and start is None:
+        out(f"  --at wants HH:MM or HH:MM:SS, got {at}")
+        return
+    player = Player(rec, store, speed, start)
+    feeder = threading.Thread(target=player.run, name='playback', daemon=True)
+    feeder.start()
+    keys = threading.Thread(target=_keyboard, args=(player,), name='playback-keys', daemon=True)
+    restore = _cbreak()
+    keys.start()
+    try:
+        screen.run(scr, store, render)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        player.stop()
+        restore()
+        scr.leave()
+        rec.close()
+
+
+def _cbreak():
+    """Unbuffered, unechoed stdin while playing; returns the restore function"""
+    try:
+        import termios
+        import tty
+        fd = sys.stdin.fileno()
+        old = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        return lambda: termios.tcsetattr(fd, termios.TCSADRAIN, old)
+    except (ImportError, OSError, ValueError, AttributeError):
+        return lambda: None
+
+
+def _keyboard(player):
+    actions = {' ': player.toggle, '+': player.faster, '=': player.faster,
+               '-': lambda: player.faster(0.5),
+               '>': lambda: player.skip(60), '.': lambda: player.skip(60),
+               '<': lambda: player.skip(-60), ',': lambda: player.skip(-60),
+               ']': lambda: player.skip(600), '[': lambda: player.skip(-600)}
+    while not player.stopped:
+        try:
+            key = sys.stdin.read(1)
+        except (OSError, ValueError):
+            return
+        if not key or key in 'qQ':
+            player.stop()
+            _thread.interrupt_main()   # leave screen.run like Ctrl+C
+            return
+        action = actions.get(key)
+        if action:
+            action()
+
+
+def playback_args(args):
+    """(path, speed, at) from --play FILE [--speed N] [--at HH:MM], or None"""
+    opts = {}
+    for flag in ('--play', '--speed', '--at'):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1] if i + 1 < len(args) else None
+    if not opts.get('--play'):
+        return None
+    try:
+        speed = float(opts.get('--speed') or 1)
+    except ValueError:
+        speed = 1.0
+    return opts['--play'], speed, opts.get('--at')
+
+
+# ============== CLI ==============
+def main():
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] != 'info':
+        print(__doc__)
+        return
+    rec = Recording(args[1])
+    fmt = '%Y-%m-%d %H:%M:%S'
+    count = sum(1 for _ in rec._headers(len(MAGIC), os.path.getsize(rec.path)))
+    print(f"  {args[1]}: {datetime.fromtimestamp(rec.start).strftime(fmt)} -> "
+          f"{datetime.fromtimestamp(rec.end).strftime(fmt)} "
+          f"({(rec.end - rec.start) / 60:.0f} min), {count} records, {len(rec.times)} keyframes")
+    rec.close()
+
+
+if __name__ == "__main__":
+    main()
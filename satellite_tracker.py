@@ -4,13 +4,14 @@
 Real-time satellite tracking from phone
 """
 
-import subprocess
-import json
 import math
 import os
 import time
 from datetime import datetime, timedelta
 
+import broker
+import screen
+
 # ============== COLORS ==============
 class C:
     R = '\033[91m'; G = '\033[92m'; Y = '\033[93m'; B = '\033[94m'
@@ -70,13 +71,6 @@ DTH_SATELLITES = {
     'Measat-3': {'lon': 91.5, 'provider': 'Reliance Digital TV', 'band': 'Ku'},
 }
 
-def cmd(c):
-    try:
-        r = subprocess.run(c, shell=True, capture_output=True, text=True, timeout=30)
-        return r.stdout + r.stderr
-    except:
-        return ""
-
 def clear():
     os.system('clear' if os.name != 'nt' else 'cls')
 
@@ -84,7 +78,7 @@ def clear():
 # ============== GPS/GNSS FUNCTIONS ==============
 def get_gnss_satellites():
     """Get GNSS satellite info from phone"""
-    out = cmd("termux-location -p gps 2>/dev/null")
+    loc = broker.location('gps')
     
     satellites = {
         'GPS': [], 'GLONASS': [], 'Galileo': [], 
@@ -95,9 +89,8 @@ def get_gnss_satellites():
     # Note: termux-location doesn't give satellite details directly
     # We'll simulate based on typical visibility
     
-    if out:
+    if loc:
         try:
-            loc = json.loads(out)
             lat = loc.get('latitude', 0)
             lon = loc.get('longitude', 0)
             
@@ -165,10 +158,9 @@ def get_gnss_satellites():
 
 def get_location():
     """Get current GPS location"""
-    out = cmd("termux-location -p gps 2>/dev/null")
-    if out:
+    loc = broker.location('gps')
+    if loc:
         try:
-            loc = json.loads(out)
             return {
                 'lat': loc.get('latitude'),
                 'lon': loc.get('longitude'),
@@ -184,10 +176,9 @@ def get_location():
 # ============== ISS TRACKER ==============
 def get_iss_position():
     """Get ISS current position (requires internet)"""
-    out = cmd("curl -s 'http://api.open-notify.org/iss-now.json' 2>/dev/null")
-    if out:
+    data = broker.http_json('http://api.open-notify.org/iss-now.json')
+    if data:
         try:
-            data = json.loads(out)
             if data.get('message') == 'success':
                 pos = data.get('iss_position', {})
                 return {
@@ -298,7 +289,7 @@ def get_starlink_info():
     return info
 
 # ============== DISPLAY FUNCTIONS ==============
-def display_sky_view(satellites):
+def display_sky_view(satellites, out=print):
     """Display ASCII sky view of satellites"""
     
     # Create 21x21 grid for sky view
@@ -346,21 +337,21 @@ def display_sky_view(satellites):
                     sky[y][x] = f"{C.DIM}{symbol}{C.E}"
     
     # Print sky view
-    print(f"\n{C.BOLD}┌─────────────────────── 🌌 SKY VIEW ───────────────────────┐{C.E}")
+    out(f"\n{C.BOLD}┌─────────────────────── 🌌 SKY VIEW ───────────────────────┐{C.E}")
     for row in sky:
-        print(f"│ {''.join(row)} │")
-    print(f"{C.BOLD}└───────────────────────────────────────────────────────────┘{C.E}")
+        out(f"│ {''.join(row)} │")
+    out(f"{C.BOLD}└───────────────────────────────────────────────────────────┘{C.E}")
     
     # Legend
-    print(f"  {C.G}G{C.E}=GPS {C.R}R{C.E}=GLONASS {C.B}E{C.E}=Galileo {C.Y}C{C.E}=BeiDou {C.M}I{C.E}=NavIC")
-    print(f"  {C.BOLD}Bold{C.E}=Used in fix  {C.DIM}Dim{C.E}=Visible only")
+    out(f"  {C.G}G{C.E}=GPS {C.R}R{C.E}=GLONASS {C.B}E{C.E}=Galileo {C.Y}C{C.E}=BeiDou {C.M}I{C.E}=NavIC")
+    out(f"  {C.BOLD}Bold{C.E}=Used in fix  {C.DIM}Dim{C.E}=Visible only")
 
-def display_constellation_stats(satellites):
+def display_constellation_stats(satellites, out=print):
     """Display constellation statistics"""
     
-    print(f"\n{C.C}{C.BOLD}┌────────────────────── 📡 GNSS CONSTELLATIONS ──────────────────────┐{C.E}")
-    print(f"│  {'Constellation':<12} {'Country':<12} {'Visible':>8} {'Used':>6} {'Avg SNR':>8} │")
-    print(f"│  {'-'*12} {'-'*12} {'-'*8} {'-'*6} {'-'*8} │")
+    out(f"\n{C.C}{C.BOLD}┌────────────────────── 📡 GNSS CONSTELLATIONS ──────────────────────┐{C.E}")
+    out(f"│  {'Constellation':<12} {'Country':<12} {'Visible':>8} {'Used':>6} {'Avg SNR':>8} │")
+    out(f"│  {'-'*12} {'-'*12} {'-'*8} {'-'*6} {'-'*8} │")
     
     for const, info in CONSTELLATIONS.items():
         sats = satellites.get(const, [])
@@ -371,22 +362,22 @@ def display_constellation_stats(satellites):
         color = info.get('color', C.W)
         country = info.get('country', '')
         
-        print(f"│  {color}{const:<12}{C.E} {country:<12} {visible:>8} {used:>6} {avg_snr:>7.1f} │")
+        out(f"│  {color}{const:<12}{C.E} {country:<12} {visible:>8} {used:>6} {avg_snr:>7.1f} │")
     
-    print(f"{C.C}└─────────────────────────────────────────────────────────────────────┘{C.E}")
+    out(f"{C.C}└─────────────────────────────────────────────────────────────────────┘{C.E}")
 
-def display_navic_details(satellites):
+def display_navic_details(satellites, out=print):
     """Display NavIC (Indian) satellite details"""
     
     navic = satellites.get('NavIC', [])
     
-    print(f"\n{C.M}{C.BOLD}┌────────────────────── 🇮🇳 NavIC (IRNSS) - ISRO ──────────────────────┐{C.E}")
-    print(f"│  India's own navigation system - 7 satellites                        │")
-    print(f"│  Coverage: India + 1500 km around                                    │")
-    print(f"│  Accuracy: <20m (India), <10m (with GAGAN)                           │")
-    print(f"├──────────────────────────────────────────────────────────────────────┤")
-    print(f"│  {'Satellite':<12} {'Type':<6} {'Elevation':>10} {'Azimuth':>10} {'SNR':>8} {'Status':<10} │")
-    print(f"│  {'-'*12} {'-'*6} {'-'*10} {'-'*10} {'-'*8} {'-'*10} │")
+    out(f"\n{C.M}{C.BOLD}┌────────────────────── 🇮🇳 NavIC (IRNSS) - ISRO ──────────────────────┐{C.E}")
+    out(f"│  India's own navigation system - 7 satellites                        │")
+    out(f"│  Coverage: India + 1500 km around                                    │")
+    out(f"│  Accuracy: <20m (India), <10m (with GAGAN)                           │")
+    out(f"├──────────────────────────────────────────────────────────────────────┤")
+    out(f"│  {'Satellite':<12} {'Type':<6} {'Elevation':>10} {'Azimuth':>10} {'SNR':>8} {'Status':<10} │")
+    out(f"│  {'-'*12} {'-'*6} {'-'*10} {'-'*10} {'-'*8} {'-'*10} │")
     
     for sat in navic:
         name = sat.get('name', f"PRN-{sat.get('prn')}")[:12]
@@ -396,9 +387,9 @@ def display_navic_details(satellites):
         snr = sat.get('snr', 0)
         status = f"{C.G}●Used{C.E}" if sat.get('used') else f"{C.DIM}○Visible{C.E}"
         
-        print(f"│  {name:<12} {stype:<6} {el:>9}° {az:>9}° {snr:>7.0f} {status:<10} │")
+        out(f"│  {name:<12} {stype:<6} {el:>9}° {az:>9}° {snr:>7.0f} {status:<10} │")
     
-    print(f"{C.M}└──────────────────────────────────────────────────────────────────────┘{C.E}")
+    out(f"{C.M}└──────────────────────────────────────────────────────────────────────┘{C.E}")
 
 def display_isro_satellites():
     """Display ISRO satellite info"""
@@ -428,33 +419,33 @@ def display_isro_satellites():
     
     print(f"{C.M}└─────────────────────────────────────────────────────────────────┘{C.E}")
 
-def display_iss_tracker(location):
+def display_iss_tracker(location, out=print):
     """Display ISS tracker"""
     
     iss = get_iss_position()
     
-    print(f"\n{C.Y}{C.BOLD}┌────────────────────── 🛸 ISS TRACKER ──────────────────────┐{C.E}")
+    out(f"\n{C.Y}{C.BOLD}┌────────────────────── 🛸 ISS TRACKER ──────────────────────┐{C.E}")
     
     if iss:
-        print(f"│  Current Position:")
-        print(f"│    Latitude:  {iss.get('lat', 0):>10.4f}°")
-        print(f"│    Longitude: {iss.get('lon', 0):>10.4f}°")
-        print(f"│    Altitude:  {iss.get('altitude', 420):>10} km")
-        print(f"│    Speed:     {iss.get('speed', 27600):>10} km/h")
+        out(f"│  Current Position:")
+        out(f"│    Latitude:  {iss.get('lat', 0):>10.4f}°")
+        out(f"│    Longitude: {iss.get('lon', 0):>10.4f}°")
+        out(f"│    Altitude:  {iss.get('altitude', 420):>10} km")
+        out(f"│    Speed:     {iss.get('speed', 27600):>10} km/h")
         
         if location:
             dist = haversine(location['lat'], location['lon'], iss['lat'], iss['lon'])
-            print(f"│")
-            print(f"│  Distance from you: {dist:,.0f} km")
+            out(f"│")
+            out(f"│  Distance from you: {dist:,.0f} km")
             
             if dist < 2000:
-                print(f"│  {C.G}✓ ISS may be visible!{C.E}")
+                out(f"│  {C.G}✓ ISS may be visible!{C.E}")
             else:
-                print(f"│  {C.DIM}ISS not currently overhead{C.E}")
+                out(f"│  {C.DIM}ISS not currently overhead{C.E}")
     else:
-        print(f"│  {C.R}Unable to get ISS position{C.E}")
+        out(f"│  {C.R}Unable to get ISS position{C.E}")
     
-    print(f"{C.Y}└─────────────────────────────────────────────────────────────┘{C.E}")
+    out(f"{C.Y}└─────────────────────────────────────────────────────────────┘{C.E}")
 
 def display_dth_satellites():
     """Display DTH satellite info"""
@@ -476,13 +467,16 @@ def display_dth_satellites():
 
 
 # ============== MAIN DASHBOARD ==============
+SCREEN = screen.Screen()
+
 def render_dashboard():
-    """Render satellite tracker dashboard"""
-    clear()
+    """Render satellite tracker dashboard (changed lines only)"""
+    frame = SCREEN.frame()
+    out = frame.print
     
     now = datetime.now().strftime("%H:%M:%S")
     
-    print(f"""
+    out(f"""
 {C.C}{C.BOLD}╔════════════════════════════════════════════════════════════════════════════╗
 ║                    🛰️ SATELLITE TRACKER - India                            ║
 ║                GPS | GLONASS | Galileo | NavIC | ISS | ISRO                ║
@@ -497,24 +491,26 @@ def render_dashboard():
     
     # Location info
     if location:
-        print(f"  📍 Your Location: {location.get('lat', 0):.6f}°, {location.get('lon', 0):.6f}°")
-        print(f"     Altitude: {location.get('alt', 0):.1f}m  Accuracy: ±{location.get('accuracy', 0):.1f}m")
+        out(f"  📍 Your Location: {location.get('lat', 0):.6f}°, {location.get('lon', 0):.6f}°")
+        out(f"     Altitude: {location.get('alt', 0):.1f}m  Accuracy: ±{location.get('accuracy', 0):.1f}m")
     else:
-        print(f"  {C.Y}📍 Getting GPS fix...{C.E}")
+        out(f"  {C.Y}📍 Getting GPS fix...{C.E}")
     
     # Sky view
-    display_sky_view(satellites)
+    display_sky_view(satellites, out)
     
     # Constellation stats
-    display_constellation_stats(satellites)
+    display_constellation_stats(satellites, out)
     
     # NavIC details
-    display_navic_details(satellites)
+    display_navic_details(satellites, out)
     
     # ISS
-    display_iss_tracker(location)
+    display_iss_tracker(location, out)
     
-    print(f"\n{C.DIM}  Auto-refreshing every 5s...{C.E}")
+    out(f"\n{C.DIM}  Auto-refreshing every 5s...{C.E}")
+    SCREEN.draw(frame)
+
 
 def main():
     """Main entry point"""
@@ -543,7 +539,7 @@ def main():
             render_dashboard()
             time.sleep(5)
     except KeyboardInterrupt:
-        clear()
+        SCREEN.leave()
         print(f"\n{C.G}  🛰️ Satellite Tracker stopped.{C.E}")
         
         # Show summary
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+⏱️ SCHEDULER - Adaptive per-source scan intervals
+Backs off while a source keeps returning the same output, speeds up when it changes
+"""
+
+import time
+
+# ============== TUNING ==============
+BACKOFF = 1.5          # interval multiplier after STABLE_RUNS unchanged results
+SPEEDUP = 0.5          # interval multiplier on a change (never below target)
+STABLE_RUNS = 2        # unchanged results before backing off
+LATENCY_HEADROOM = 1.2 # never poll faster than 1.2 x the measured command latency
+EWMA = 0.3             # smoothing for observed period / latency
+
+
+class Schedule:
+    """Target interval for one source, adapted to its latency and churn"""
+
+    def __init__(self, target, max_interval=None):
+        self.target = float(target)
+        self.max = float(max_interval if max_interval is not None else target * 4)
+        self.interval = self.target
+        self.latency = 0.0
+        self.period = 0.0       # observed start-to-start time
+        self.last_start = 0.0
+        self.last_digest = None
+        self.unchanged = 0
+        self.runs = 0
+        self.changes = 0
+
+    def started(self):
+        """Mark the start of a fetch (feeds the observed period)"""
+        now = time.monotonic()
+        if self.last_start:
+            gap = now - self.last_start
+            self.period = gap if not self.period else self.period + EWMA * (gap - self.period)
+        self.last_start = now
+
+    def observe(self, raw, latency):
+        """Record a result; returns True when the output changed"""
+        self.runs += 1
+        self.latency = latency if self.runs == 1 else self.latency + EWMA * (latency - self.latency)
+        digest = hash(raw)
+        changed = digest != self.last_digest
+        self.last_digest = digest
+        if changed:
+            self.changes += 1
+            self.unchanged = 0
+            self.interval = max(self.target, self.interval * SPEEDUP)
+        else:
+            self.unchanged += 1
+            if self.unchanged >= STABLE_RUNS:
+                self.interval = min(self.max, self.interval * BACKOFF)
+        return changed
+
+    def failed(self, latency):
+        """Timeouts/errors: slow down, there is nothing to compare"""
+        self.runs += 1
+        self.latency = max(self.latency, latency)
+        self.interval = min(self.max, self.interval * BACKOFF)
+
+    def delay(self):
+        """Seconds to wait after the last fetch before starting the next one"""
+        interval = max(self.interval, self.latency * LATENCY_HEADROOM)
+        return max(0.0, interval - self.latency)
+
+    def lag(self):
+        """How far the observed period is behind the target (seconds, >0 = slow)"""
+        return self.period - self.target if self.period else 0.0
+
+    def status(self):
+        return {'target': self.target, 'interval': round(self.interval, 2),
+                'period': round(self.period, 2), 'latency': round(self.latency, 3),
+                'lag': round(self.lag(), 2), 'runs': self.runs, 'changes': self.changes}
+
+
+def summary(schedules):
+    """One-line 'name period/target' report for dashboard footers"""
+    parts = []
+    for name, s in schedules.items():
+        if not s.period:
+            continue
+        lag = s.lag()
+        sign = '+' if lag >= 0 else '-'
+        parts.append(f"{name} {s.period:.1f}s/{s.target:g}s ({sign}{abs(lag):.1f})")
+    return '  '.join(parts)
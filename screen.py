@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+🖥️ SCREEN - Differential terminal renderer for the 8xRadar dashboards
+Frames are composed in memory; only changed lines are rewritten, in one write
+"""
+
+import re
+import shutil
+import signal
+import sys
+import threading
+import time
+
+SGR = re.compile(r'\033\[([0-9;]*)m')
+RESET = '\033[0m'
+
+
+class Frame:
+    """In-memory frame; frame.print() is a drop-in for print()"""
+
+    def __init__(self):
+        self.parts = []
+
+    def print(self, *args, sep=' ', end='\n'):
+        self.parts.append(sep.join(map(str, args)) + end)
+
+    def extend(self, other):
+        """Append everything printed into another frame (reuse a rendered section)"""
+        self.parts.extend(other.parts)
+
+    def text(self):
+        return ''.join(self.parts)
+
+    def lines(self):
+        """Lines with their inherited colour prefix made explicit and reset at the end,
+        so any single line can be redrawn on its own"""
+        text = self.text()
+        if text.endswith('\n'):
+            text = text[:-1]
+        result = []
+        active = ''
+        for line in text.split('\n'):
+            result.append(active + line + RESET if active or '\033[' in line else line)
+            for m in SGR.finditer(line):
+                if m.group(1) in ('', '0'):
+                    active = ''
+                else:
+                    active += m.group(0)
+        return result
+
+
+class Screen:
+    """Keeps the last drawn frame and emits only the difference"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.prev = None
+        self.size = None
+        self.active = False
+
+    def frame(self):
+        return Frame()
+
+    def enter(self):
+        """Hide the cursor, disable autowrap (long lines are clipped, not wrapped)"""
+        self._write('\033[?25l\033[?7l\033[H\033[2J')
+        self.active = True
+        self.prev = None
+
+    def leave(self):
+        """Restore cursor/autowrap and clear the dashboard"""
+        if self.active:
+            self._write('\033[?7h\033[?25h\033[H\033[2J')
+        self.active = False
+        self.prev = None
+
+    def invalidate(self):
+        """Force a full repaint on the next draw (e.g. after SIGWINCH)"""
+        self.prev = None
+
+    def draw(self, frame):
+        """Write only the lines that differ from the previous frame"""
+        if not self.active:
+            self.enter()
+        size = shutil.get_terminal_size()
+        lines = frame.lines()[:size.lines]
+        out = []
+        if size != self.size or self.prev is None:
+            self.size = size
+            self.prev = []
+            out.append('\033[H\033[2J')
+        prev = self.prev
+        for i, line in enumerate(lines):
+            if i >= len(prev) or prev[i] != line:
+                out.append(f'\033[{i + 1};1H{line}\033[K')
+        if len(lines) < len(prev):
+            out.append(f'\033[{len(lines) + 1};1H\033[J')
+        self.prev = lines
+        if out:
+            self._write(''.join(out))
+        return len(out)
+
+    def patch(self, frame, row=0):
+        """Redraw only the rows covered by a partial frame (e.g. the header clock)"""
+        if self.prev is None:
+            return 0
+        lines = frame.lines()
+        out = []
+        for i, line in enumerate(lines, row):
+            if i < len(self.prev) and self.prev[i] != line:
+                self.prev[i] = line
+                out.append(f'\033[{i + 1};1H{line}\033[K')
+        if out:
+            self._write(''.join(out))
+        return len(out)
+
+    def _write(self, data):
+        try:
+            self.stream.write(data)
+            self.stream.flush()
+        except (OSError, ValueError):
+            pass
+
+
+# ============== EVENT-DRIVEN REDRAW ==============
+def run(scr, store, render, tick=None, max_fps=4, tick_every=1.0):
+    """Redraw when the store publishes or the terminal is resized.
+
+    Bursts of publishes are coalesced to at most max_fps frames; between
+    frames tick() (if given) refreshes cheap fields such as the clock.
+    Returns on KeyboardInterrupt (re-raised) like the old sleep loops.
+    """
+    wake = threading.Event()
+    store.subscribe(wake.set)
+    # Tracked here rather than through scr.prev: a render() that prints
+    # instead of calling scr.draw() never sets it
+    resized = [False]
+
+    def on_winch(signum, frame):
+        scr.invalidate()
+        resized[0] = True
+        wake.set()
+
+    old = None
+    if hasattr(signal, 'SIGWINCH') and threading.current_thread() is threading.main_thread():
+        old = signal.signal(signal.SIGWINCH, on_winch)
+    min_gap = 1.0 / max_fps
+    drawn = None
+    last = 0.0
+    try:
+        while True:
+            if drawn == store.version and not resized[0]:
+                if not wake.wait(tick_every):
+                    if tick:
+                        tick()
+                    continue
+            gap = min_gap - (time.monotonic() - last)
+            if gap > 0:
+                time.sleep(gap)
+            wake.clear()
+            resized[0] = False
+            drawn = store.version
+            render()
+            last = time.monotonic()
+    finally:
+        if old is not None:
+            signal.signal(signal.SIGWINCH, old)
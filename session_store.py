@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+💾 SESSION STORE - Persistent SQLite time series of every scan cycle
+Scanners enqueue observations; one writer thread commits them in WAL batches
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DB_PATH = os.environ.get('RADAR_DB', 'radar_sessions.db')
+BATCH = 5000          # max observations per transaction
+FLUSH_EVERY = 1.0     # seconds a partial batch may wait
+MAX_PENDING = 200000  # beyond this observations are dropped, never blocking a scanner
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    tool TEXT,
+    started REAL,
+    ended REAL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    name TEXT,
+    first_seen REAL,
+    last_seen REAL,
+    UNIQUE (kind, key)
+);
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    session INTEGER NOT NULL REFERENCES sessions(id),
+    entity INTEGER NOT NULL REFERENCES entities(id),
+    ts REAL NOT NULL,
+    level REAL,
+    lat REAL,
+    lon REAL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS observations_ts ON observations(ts);
+CREATE INDEX IF NOT EXISTS observations_entity_ts ON observations(entity, ts);
+CREATE INDEX IF NOT EXISTS observations_session ON observations(session, ts);
+"""
+
+
+# ============== ENTITY KEYS ==============
+def _cell_key(c):
+    """PLMN + area + cell id when known, else the radio channel + PCI"""
+    cid = c.get('ci') or c.get('nci') or c.get('cid')
+    if cid:
+        return f"{c.get('mcc')}-{c.get('mnc')}-{c.get('tac') or c.get('lac')}-{cid}"
+    return f"{c.get('earfcn') or c.get('nrarfcn') or c.get('arfcn')}/{c.get('pci')}"
+
+
+# kind -> (key, name, level); each accepts raw Termux:API records and the parsed
+# dicts the dashboards publish
+KINDS = {
+    'wifi': (lambda r: r.get('bssid'),
+             lambda r: r.get('ssid'),
+             lambda r: r.get('rssi')),
+    'bluetooth': (lambda r: r.get('address') or r.get('mac'),
+                  lambda r: r.get('name'),
+                  lambda r: r.get('rssi')),
+    'cell': (_cell_key,
+             lambda r: r.get('operator') or r.get('type'),
+             lambda r: r.get('rsrp') or r.get('ss_rsrp') or r.get('ssRsrp') or r.get('rssi')),
+    'network': (lambda r: r.get('mac') or r.get('ip'),
+                lambda r: r.get('vendor') or r.get('ip'),
+                lambda r: None),
+    'gps': (lambda r: r.get('provider', 'gps'),
+            lambda r: None,
+            lambda r: r.get('accuracy')),
+    # handover.Timeline events: one entity per SIM, level = dwell on the old cell
+    'handover': (lambda r: f"sim{r.get('sim')}",
+                 lambda r: f"{r.get('from')} > {r.get('to')}",
+                 lambda r: r.get('dwell')),
+    # carrier_aggregation.CAHistory window summaries: one entity per window,
+    # name = most frequent combination, level = share of time aggregated
+    'ca': (lambda r: r.get('window'),
+           lambda r: r['top'][0][0] if r.get('top') else None,
+           lambda r: r.get('ca')),
+}
+
+
+def fix_position(fix):
+    """(lat, lon) of a GPS fix (raw Termux:API or parsed), or None"""
+    lat = fix.get('lat', fix.get('latitude'))
+    lon = fix.get('lon', fix.get('longitude'))
+    return (lat, lon) if lat is not None and lon is not None else None
+
+
+# ============== STORE ==============
+class SessionStore:
+    """One recording session; observe() is a non-blocking enqueue"""
+
+    def __init__(self, tool, path=None):
+        self.tool = tool
+        self.path = path or DB_PATH
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.session = None
+        self.position = None     # last GPS fix, stamped on every observation
+        self.ids = {}            # (kind, key) -> entity id
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.error = None
+
+    def start(self):
+        """Open the database, register the session and start the writer.
+        On failure (read-only storage ...) error is set and observe() stays a no-op."""
+        try:
+            conn = self._connect()
+            with conn:
+                self.session = conn.execute(
+                    "INSERT INTO sessions (tool, started) VALUES (?, ?)",
+                    (self.tool, time.time())).lastrowid
+        except (sqlite3.Error, OSError) as e:
+            self.error = str(e)
+            return self
+        self.thread = threading.Thread(target=self._writer, args=(conn,),
+                                       name='session-writer', daemon=True)
+        self.thread.start()
+        return self
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def observe(self, kind, records, ts=None):
+        """Queue one scan cycle's records ('wifi', 'bluetooth', 'cell', 'network', 'gps')"""
+        if self.thread is None or not records:
+            return
+        if isinstance(records, dict):
+            records = (records,)
+        if kind == 'gps':
+            self.position = fix_position(records[-1]) or self.position
+        if self.queue.qsize() > MAX_PENDING:
+            self.dropped += len(records)
+            return
+        self.queue.put((kind, ts or time.time(), self.position, records))
+
+    def flush(self, timeout=10):
+        """Block until everything queued so far is committed"""
+        if self.thread is None:
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        """Commit the remaining queue, stamp the session end and stop the writer"""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join(30)
+        self.thread = None
+
+    # ============== WRITER THREAD ==============
+    def _writer(self, conn):
+        stop = False
+        while not stop:
+            batch = []
+            waiters = []
+            count = 0
+            item = self.queue.get()
+            deadline = time.monotonic() + FLUSH_EVERY
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                    count += len(item[3])
+                if stop or waiters or count >= BATCH:
+                    break
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            try:
+                self._write(conn, batch)
+            except sqlite3.Error as e:
+                self.error = str(e)
+                self.ids.clear()   # the rollback may have discarded new entities
+            for done in waiters:
+                done.set()
+        with conn:
+            conn.execute("UPDATE sessions SET ended = ? WHERE id = ?", (time.time(), self.session))
+        conn.close()
+
+    def _write(self, conn, batch):
+        if not batch:
+            return
+        rows = []
+        seen = {}   # entity id -> (last_seen, name)
+        with conn:
+            for kind, ts, pos, records in batch:
+                key_of, name_of, level_of = KINDS[kind]
+                lat, lon = pos or (None, None)
+                for rec in records:
+                    key = key_of(rec)
+                    if key is None:
+                        continue
+                    key = str(key)
+                    name = name_of(rec)
+                    entity = self.ids.get((kind, key))
+                    if entity is None:
+                        entity = self._entity(conn, kind, key, name, ts)
+                    seen[entity] = (ts, name)
+                    rows.append((self.session, entity, ts, level_of(rec), lat, lon,
+                                 json.dumps(rec, separators=(',', ':'), default=str)))
+            conn.executemany(
+                "INSERT INTO observations (session, entity, ts, level, lat, lon, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany(
+                "UPDATE entities SET last_seen = ?, name = COALESCE(?, name) WHERE id = ?",
+                [(ts, name, entity) for entity, (ts, name) in seen.items()])
+        self.written += len(rows)
+        self.batches += 1
+
+    def _entity(self, conn, kind, key, name, ts):
+        conn.execute(
+            "INSERT OR IGNORE INTO entities (kind, key, name, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?)", (kind, key, name, ts, ts))
+        entity = conn.execute(
+            "SELECT id FROM entities WHERE kind = ? AND key = ?", (kind, key)).fetchone()[0]
+        self.ids[(kind, key)] = entity
+        return entity
+
+    def stats(self):
+        return {'session': self.session, 'written': self.written, 'batches': self.batches,
+                'pending': self.queue.qsize(), 'dropped': self.dropped, 'error': self.error}
+
+    def summary(self):
+        """Short status line, e.g. 'db 12034 rows'"""
+        if self.thread is None:
+            return ''
+        text = f"db {self.written} rows"
+        if self.dropped:
+            text += f" ({self.dropped} dropped)"
+        if self.error:
+            text += f" ERR {self.error}"
+        return text
+
+
+# ============== READING ==============
+def connect(path=None):
+    """Read-only connection to a session database (safe while a writer runs)"""
+    conn = sqlite3.connect(f"file:{path or DB_PATH}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def series(conn, kind, key=None, since=None, session=None):
+    """Observations of one kind (optionally one entity / since a time), oldest first"""
+    sql = ("SELECT e.kind, e.key, e.name, o.session, o.ts, o.level, o.lat, o.lon, o.data "
+           "FROM observations o JOIN entities e ON e.id = o.entity WHERE e.kind = ?")
+    args = [kind]
+    if key is not None:
+        sql += " AND e.key = ?"
+        args.append(key)
+    if since is not None:
+        sql += " AND o.ts >= ?"
+        args.append(since)
+    if session is not None:
+        sql += " AND o.session = ?"
+        args.append(session)
+    return conn.execute(sql + " ORDER BY o.ts", args)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+🗂️ SNAPSHOT - Versioned, double-buffered state for the dashboards
+Scanners publish immutable snapshots, the render loop reads them lock-free
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+
+def _freeze(value):
+    """Shallow-freeze published containers so readers cannot mutate them"""
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        return MappingProxyType(value)
+    return value
+
+
+class SnapshotStore:
+    """Copy-on-write store: publish() builds the next snapshot and swaps it in
+
+    Readers call get() and keep using the returned mapping; it never changes
+    underneath them. Writers are serialised by a lock.
+    """
+
+    def __init__(self, **initial):
+        self.lock = threading.Lock()
+        self.listeners = []
+        front = {k: _freeze(v) for k, v in initial.items()}
+        front['version'] = 0
+        front['published'] = time.time()
+        self._snap = MappingProxyType(front)
+
+    def get(self):
+        """Current snapshot (read-only mapping); no lock needed"""
+        return self._snap
+
+    def subscribe(self, fn):
+        """Call fn() after every publish (e.g. to wake the redraw loop)"""
+        self.listeners.append(fn)
+
+    @property
+    def version(self):
+        return self._snap['version']
+
+    def publish(self, **changes):
+        """Replace some keys and publish a new version"""
+        return self.apply(lambda snap: changes)
+
+    def apply(self, fn):
+        """Publish fn(current) -> {key: value}, atomically w.r.t. other writers"""
+        with self.lock:
+            back = dict(self._snap)
+            changes = fn(self._snap)
+            for k, v in changes.items():
+                back[k] = _freeze(v)
+            back['version'] = self._snap['version'] + 1
+            back['published'] = time.time()
+            snap = self._snap = MappingProxyType(back)
+        for listener in self.listeners:
+            listener()
+        return snap
+
+    def export(self):
+        """Plain dict/list copy of the current snapshot (for json.dump)"""
+        return _thaw(self._snap)
+
+
+def _thaw(value):
+    if isinstance(value, (MappingProxyType, dict)):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, (tuple, list)):
+        return [_thaw(v) for v in value]
+    return value
+
+
+class SightingTable:
+    """Deduplicated sightings (cameras, IoT ...) with TTL expiry and a size bound"""
+
+    def __init__(self, ttl=900, limit=500):
+        self.ttl = ttl
+        self.limit = limit
+        self.items = OrderedDict()   # key -> record, oldest last_seen first
+
+    def add(self, key, record, now=None):
+        now = now or time.time()
+        old = self.items.pop(key, None)
+        self.items[key] = dict(record, first_seen=old['first_seen'] if old else now,
+                               last_seen=now, seen=old['seen'] + 1 if old else 1)
+        while len(self.items) > self.limit:
+            self.items.popitem(last=False)
+
+    def expire(self, now=None):
+        """Drop sightings not refreshed within the TTL"""
+        cutoff = (now or time.time()) - self.ttl
+        while self.items:
+            key, rec = next(iter(self.items.items()))
+            if rec['last_seen'] >= cutoff:
+                break
+            self.items.popitem(last=False)
+
+    def values(self):
+        """Current sightings, most recently seen first"""
+        return tuple(reversed(self.items.values()))
+
+    def __len__(self):
+        return len(self.items)
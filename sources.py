@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+🎞️ SOURCES - Record / Replay / Synthetic backends for the Termux:API broker
+Run and benchmark every scanner off-device
+
+  RADAR_SOURCE=record:drive.jsonl   python ultimate_radar.py
+  RADAR_SOURCE=replay:drive.jsonl@4 python 8xradar.py      (4x speed)
+  RADAR_SOURCE=synthetic:42         python live_dashboard.py
+  python sources.py bench ultimate_radar synthetic 500
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+SESSION_FORMAT = '8xradar-session'
+
+
+# ============== RECORD ==============
+class RecordBackend:
+    """Pass-through to the live device, saving every raw output"""
+
+    passthrough = True
+
+    def __init__(self, path):
+        self.path = path
+        self.start = time.monotonic()
+        self.lock = threading.Lock()
+        self.f = open(path, 'a', encoding='utf-8')
+        if self.f.tell() == 0:
+            self._write({'format': SESSION_FORMAT, 'version': 1,
+                         'started': datetime.now().isoformat()})
+
+    def _write(self, record):
+        with self.lock:
+            self.f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            self.f.flush()
+
+    def save(self, name, out):
+        self._write({'t': round(time.monotonic() - self.start, 3), 'src': name, 'out': out})
+
+    def fetch(self, name, live):
+        out = live()
+        self.save(name, out)
+        return out
+
+
+# ============== REPLAY ==============
+class ReplayBackend:
+    """Feeds a recorded session back at real speed, N x speed, or flat out (speed=0)"""
+
+    def __init__(self, path, speed=1.0, loop=True):
+        self.speed = speed
+        self.loop = loop
+        self.tracks = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                rec = json.loads(line)
+                if 'src' in rec:
+                    self.tracks.setdefault(rec['src'], []).append((rec['t'], rec['out']))
+        self.duration = max((t[-1][0] for t in self.tracks.values()), default=0)
+        self.cursor = {name: 0 for name in self.tracks}
+        self.start = time.monotonic()
+        self.lock = threading.Lock()
+
+    def clock(self):
+        """Position in the recording (seconds)"""
+        elapsed = (time.monotonic() - self.start) * self.speed
+        if self.loop and self.duration > 0:
+            return elapsed % self.duration
+        return elapsed
+
+    def fetch(self, name, live):
+        track = self.tracks.get(name)
+        if not track:
+            return ''
+        with self.lock:
+            if not self.speed:
+                # Flat out: every call returns the next record
+                i = self.cursor[name]
+                self.cursor[name] = (i + 1) % len(track) if self.loop else min(i + 1, len(track) - 1)
+                return track[i][1]
+            now = self.clock()
+            i = self.cursor[name]
+            if i < len(track) and track[i][0] > now:
+                i = 0  # wrapped around
+            while i + 1 < len(track) and track[i + 1][0] <= now:
+                i += 1
+            self.cursor[name] = i
+            return track[i][1]
+
+
+# ============== SYNTHETIC ==============
+# Prefixes chosen so camera / IoT / TV / phone classification is exercised
+SYNTH_PREFIXES = ['28:57:be', 'e0:50:8b', '18:b4:30', '5c:cf:7f', '00:09:df',
+                  '00:03:93', '28:6a:ba', '2c:33:61', '14:cc:20', '34:60:f9',
+                  '3c:cd:5d', 'b8:27:eb']
+SYNTH_SSIDS = ['JioFiber-{n}', 'Airtel_{n}', 'TP-Link_{n}', 'IPCAM-{n}', 'Redmi Note {n}',
+               'DIRECT-{n}-HP Printer', 'Galaxy M{n}', 'ACT-{n}', 'Hikvision_{n}', 'Home_{n}']
+SYNTH_BT_NAMES = ['boAt Airdopes {n}', 'Mi Band {n}', 'JBL Flip {n}', 'Galaxy Buds {n}',
+                  'OnePlus {n}', 'Fire TV {n}', 'Logitech K{n}', 'Amazfit {n}', 'Echo Dot {n}',
+                  'Honda Car {n}', '']
+SYNTH_CAPS = ['[WPA2-PSK-CCMP][ESS]', '[WPA3-SAE-CCMP][ESS]', '[WPA-PSK-TKIP][ESS]',
+              '[WEP][ESS]', '[ESS]']
+# (mcc, mnc, earfcns) per operator
+SYNTH_PLMNS = [(405, 857, [1650, 39150, 40620, 2525]), (404, 45, [1475, 275, 3601, 39240]),
+               (404, 20, [275, 1350, 3651])]
+
+
+class SyntheticBackend:
+    """Generates plausible, slowly drifting Termux:API output"""
+
+    def __init__(self, seed=0, wifi=25, bluetooth=30, cells=8, plmn=0):
+        self.rng = random.Random(seed)
+        rng = self.rng
+        self.aps = []
+        for i in range(wifi):
+            mac = f"{rng.choice(SYNTH_PREFIXES)}:{rng.randrange(256):02x}:{rng.randrange(256):02x}:{i:02x}"
+            self.aps.append({
+                'bssid': mac,
+                'ssid': rng.choice(SYNTH_SSIDS).format(n=rng.randrange(10, 99)),
+                'rssi': rng.randrange(-90, -35),
+                'frequency': rng.choice([2412, 2437, 2462, 5180, 5220, 5745]),
+                'capabilities': rng.choice(SYNTH_CAPS),
+            })
+        self.devices = []
+        for i in range(bluetooth):
+            mac = f"{rng.choice(SYNTH_PREFIXES)}:{rng.randrange(256):02x}:{rng.randrange(256):02x}:{i:02x}"
+            name = rng.choice(SYNTH_BT_NAMES).format(n=rng.randrange(1, 9))
+            self.devices.append({'address': mac.upper(), 'name': name or None,
+                                 'rssi': rng.randrange(-95, -40)})
+        mcc, mnc, earfcns = SYNTH_PLMNS[plmn % len(SYNTH_PLMNS)]
+        self.cells = []
+        for i in range(cells):
+            earfcn = earfcns[i % len(earfcns)]
+            ci = rng.randrange(10000, 90000) * 256 + rng.randrange(1, 4)
+            self.cells.append({
+                'type': 'lte', 'registered': i == 0, 'mcc': mcc, 'mnc': mnc,
+                'ci': ci, 'pci': rng.randrange(504), 'tac': rng.randrange(1, 65535),
+                'earfcn': earfcn, 'rsrp': rng.randrange(-120, -70), 'rsrq': rng.randrange(-18, -5),
+                'rssi': rng.randrange(-90, -50), 'rssnr': rng.randrange(-5, 25),
+                'cqi': rng.randrange(1, 15), 'timing_advance': rng.randrange(0, 40),
+            })
+        self.cells.append({
+            'type': 'nr', 'registered': False, 'mcc': mcc, 'mnc': mnc,
+            'nci': rng.randrange(1 << 20, 1 << 30), 'pci': rng.randrange(1008),
+            'tac': self.cells[0]['tac'] if self.cells else 1, 'nrarfcn': 636666,
+            'ssRsrp': rng.randrange(-115, -80), 'ssRsrq': rng.randrange(-15, -8),
+            'ssSinr': rng.randrange(0, 25),
+        })
+        self.fix = {'latitude': 19.0760, 'longitude': 72.8777, 'altitude': 14.0,
+                    'accuracy': 8.0, 'speed': 0.0, 'bearing': 0.0, 'provider': 'gps'}
+        self.heading = rng.uniform(0, 360)
+        self.lock = threading.Lock()
+
+    def _jitter(self, items, key, lo, hi):
+        rng = self.rng
+        for item in items:
+            if key in item and rng.random() < 0.3:
+                item[key] = max(lo, min(hi, item[key] + rng.choice((-2, -1, 1, 2))))
+
+    def fetch(self, name, live):
+        rng = self.rng
+        with self.lock:
+            if name == 'wifi':
+                self._jitter(self.aps, 'rssi', -95, -30)
+                return json.dumps(self.aps)
+            if name == 'bluetooth':
+                self._jitter(self.devices, 'rssi', -100, -35)
+                return json.dumps(self.devices)
+            if name == 'cell':
+                self._jitter(self.cells, 'rsrp', -140, -44)
+                self._jitter(self.cells, 'ssRsrp', -140, -44)
+                if self.cells and rng.random() < 0.05:
+                    self.cells[0]['timing_advance'] = max(0, self.cells[0]['timing_advance'] + rng.choice((-1, 1)))
+                for cell in self.cells:
+                    if 'timing_advance' in cell:
+                        cell['timingAdvance'] = cell['timing_advance']
+                return json.dumps(self.cells)
+            if name in ('gps', 'network_location'):
+                self.fix['latitude'] += rng.uniform(-0.0002, 0.0002)
+                self.fix['longitude'] += rng.uniform(-0.0002, 0.0002)
+                self.fix['provider'] = 'gps' if name == 'gps' else 'network'
+                return json.dumps(self.fix)
+            if name == 'heading':
+                # Someone slowly turning on the spot, with sensor jitter
+                self.heading = (self.heading + 1.5 + rng.gauss(0, 2)) % 360
+                return json.dumps({'Orientation Sensor': {'values': [self.heading, -5.0, 1.0]}})
+            if name == 'route':
+                return 'default via 192.168.1.1 dev wlan0 proto dhcp metric 600'
+            if name == 'nmap':
+                lines = ['Starting Nmap 7.94 ( https://nmap.org )']
+                for i, ap in enumerate(self.aps[:12]):
+                    lines.append(f"Nmap scan report for 192.168.1.{i + 2}")
+                    lines.append('Host is up (0.0050s latency).')
+                    lines.append(f"MAC Address: {ap['bssid'].upper()} (Unknown)")
+                lines.append(f"Nmap done: 256 IP addresses ({min(12, len(self.aps))} hosts up)")
+                return '\n'.join(lines)
+        return live()
+
+
+# ============== SELECTION ==============
+def from_spec(spec):
+    """Build a backend from 'record:PATH', 'replay:PATH[@SPEED]' or 'synthetic[:SEED]'"""
+    kind, _, arg = spec.partition(':')
+    if kind == 'record':
+        return RecordBackend(arg or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    if kind == 'replay':
+        path, _, speed = arg.rpartition('@') if '@' in arg else (arg, '', '1')
+        return ReplayBackend(path, speed=float(speed or 1))
+    if kind == 'synthetic':
+        return SyntheticBackend(seed=int(arg or 0))
+    raise ValueError(f"Unknown RADAR_SOURCE: {spec}")
+
+
+# ============== BENCHMARK ==============
+def bench(module_name, spec='synthetic', n=200):
+    """Time each scan_* function of a tool against a replay/synthetic backend"""
+    import importlib
+    import broker
+    broker.set_backend(ReplayBackend(spec, speed=0) if os.path.exists(spec) else from_spec(spec))
+    mod = importlib.import_module(module_name)
+    scanners = [name for name in ('scan_wifi', 'scan_bluetooth', 'scan_cell', 'scan_cells',
+                                  'scan_gps', 'scan_network') if hasattr(mod, name)]
+    print(f"  {module_name}: {n} cycles via {spec}")
+    for name in scanners:
+        fn = getattr(mod, name)
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        per = (time.perf_counter() - start) / n
+        print(f"    {name:<16} {per * 1000:8.3f} ms/call  {1 / per if per else 0:10.0f} /s")
+
+
+def main():
+    if len(sys.argv) >= 3 and sys.argv[1] == 'bench':
+        spec = sys.argv[3] if len(sys.argv) > 3 else 'synthetic'
+        n = int(sys.argv[4]) if len(sys.argv) > 4 else 200
+        bench(sys.argv[2], spec, n)
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+🗼 TOWER DB - Cell tower location lookup over the local cell_towers.db
+One persistent read-only connection, covering index, LRU with negative caching,
+R*Tree over tower positions for nearest / radius / bounding-box queries
+"""
+
+import math
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+TOWER_DB = os.environ.get('RADAR_TOWERS', 'cell_towers.db')
+CACHE_SIZE = 4096
+CHUNK = 200   # cells per batch query (4 bound parameters each)
+
+# towers table as written by the importer (OpenCellID / MLS column set)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS towers (
+    radio TEXT,
+    mcc INTEGER NOT NULL,
+    mnc INTEGER NOT NULL,
+    lac INTEGER NOT NULL,
+    cid INTEGER NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    range INTEGER,
+    samples INTEGER,
+    updated INTEGER
+);
+"""
+# Covering index: a lookup never touches the table rows
+INDEX = "CREATE INDEX IF NOT EXISTS towers_cell ON towers (mcc, mnc, lac, cid, lat, lon, range)"
+
+# Spatial index: one point box per towers row, kept in sync by triggers so the
+# importer's delta replace needs no extra bookkeeping
+RTREE = "CREATE VIRTUAL TABLE IF NOT EXISTS towers_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+RTREE_SYNC = """
+CREATE TRIGGER IF NOT EXISTS towers_rtree_insert AFTER INSERT ON towers BEGIN
+    INSERT INTO towers_rtree VALUES (new.rowid, new.lat, new.lat, new.lon, new.lon);
+END;
+CREATE TRIGGER IF NOT EXISTS towers_rtree_delete AFTER DELETE ON towers BEGIN
+    DELETE FROM towers_rtree WHERE id = old.rowid;
+END;
+"""
+# Fallback when SQLite was built without the rtree module
+POSITION_INDEX = "CREATE INDEX IF NOT EXISTS towers_position ON towers (lat, lon)"
+
+EARTH_R = 6371000.0
+NEAREST_START = 200      # first search radius of nearest(), metres
+NEAREST_MAX = 50000      # give up widening beyond this
+
+_MISS = object()
+
+
+def cell_key(cell):
+    """(mcc, mnc, lac/tac, cid/ci/nci) of a raw or parsed cell, or None"""
+    try:
+        area = cell.get('tac') or cell.get('lac')
+        cid = cell.get('ci') or cell.get('nci') or cell.get('cid')
+        key = (int(cell.get('mcc')), int(cell.get('mnc')), int(area), int(cid))
+    except (TypeError, ValueError):
+        return None
+    # Android reports INT_MAX / LONG_MAX for unknown identities
+    if key[2] >= 2147483647 or key[3] >= 2147483647 or key[3] <= 0:
+        return None
+    return key
+
+
+def ensure_spatial(conn):
+    """Create and fill the R*Tree (once) plus its sync triggers.
+    Returns False and indexes (lat, lon) instead when rtree is unavailable."""
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'towers_rtree'").fetchone():
+            conn.execute(RTREE)
+            conn.execute("INSERT INTO towers_rtree SELECT rowid, lat, lat, lon, lon FROM towers")
+        conn.executescript(RTREE_SYNC)
+        return True
+    except sqlite3.OperationalError:
+        conn.execute(POSITION_INDEX)
+        return False
+
+
+# ============== GEOMETRY ==============
+def distance(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres (haversine)"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((p2 - p1) / 2) ** 2
+         + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_R * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bearing(lat1, lon1, lat2, lon2):
+    """Initial bearing from point 1 to point 2, degrees clockwise from north"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dlon = math.radians(lon2 - lon1)
+    x = math.sin(dlon) * math.cos(p2)
+    y = math.cos(p1) * math.sin(p2) - math.sin(p1) * math.cos(p2) * math.cos(dlon)
+    return math.degrees(math.atan2(x, y)) % 360
+
+
+def bbox(lat, lon, radius_m):
+    """(lat_min, lon_min, lat_max, lon_max) enclosing a circle"""
+    dlat = math.degrees(radius_m / EARTH_R)
+    dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+    return (lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+
+
+class TowerDB:
+    """Tower lookups; safe to share between the collector and render threads"""
+
+    def __init__(self, path=None, cache_size=CACHE_SIZE):
+        self.path = path or TOWER_DB
+        self.cache_size = cache_size
+        self.cache = OrderedDict()   # key -> (lat, lon, range) or _MISS
+        self.lock = threading.Lock()
+        self.conn = None
+        self.mtime = None
+        self.spatial = False   # towers_rtree present in the open database
+        self.hits = self.misses = self.queries = 0
+
+    def _connection(self):
+        """Open once; re-open if the importer replaced the file"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self.mtime:
+            return self.conn
+        # New, replaced or deleted database: cached answers (and misses) are stale
+        self.mtime = mtime
+        self.cache.clear()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if mtime is None:
+            return None
+        try:
+            # First use: make sure the indexes exist (needs a brief rw handle)
+            rw = sqlite3.connect(self.path)
+            try:
+                rw.execute(INDEX)
+                ensure_spatial(rw)
+                rw.commit()
+            finally:
+                rw.close()
+        except sqlite3.Error:
+            pass   # read-only storage or no towers table: query whatever is there
+        try:
+            self.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True,
+                                        check_same_thread=False)
+            self.spatial = bool(self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'towers_rtree'").fetchone())
+            self.mtime = os.stat(self.path).st_mtime
+        except (sqlite3.Error, OSError):
+            self.conn = None
+        return self.conn
+
+    def _remember(self, key, value):
+        self.cache[key] = value
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def locate(self, mcc, mnc, lac, cid):
+        """(lat, lon, range_m) of one cell, or None"""
+        key = cell_key({'mcc': mcc, 'mnc': mnc, 'lac': lac, 'cid': cid})
+        return self.locate_many([key]).get(key) if key else None
+
+    def locate_many(self, keys):
+        """{key: (lat, lon, range_m)} for every key found; one query per CHUNK misses"""
+        found = {}
+        todo = {}   # ordered set of cache misses
+        with self.lock:
+            for key in keys:
+                hit = self.cache.get(key)
+                if hit is None:
+                    todo[key] = None
+                    continue
+                self.hits += 1
+                self.cache.move_to_end(key)
+                if hit is not _MISS:
+                    found[key] = hit
+            if not todo:
+                return found
+            todo = list(todo)
+            self.misses += len(todo)
+            conn = self._connection()
+            rows = {}
+            if conn is not None:
+                for i in range(0, len(todo), CHUNK):
+                    chunk = todo[i:i + CHUNK]
+                    values = ','.join(['(?,?,?,?)'] * len(chunk))
+                    sql = (f"WITH q(mcc, mnc, lac, cid) AS (VALUES {values}) "
+                           "SELECT t.mcc, t.mnc, t.lac, t.cid, t.lat, t.lon, t.range "
+                           "FROM q JOIN towers t ON t.mcc = q.mcc AND t.mnc = q.mnc "
+                           "AND t.lac = q.lac AND t.cid = q.cid")
+                    try:
+                        cur = conn.execute(sql, [v for key in chunk for v in key])
+                    except sqlite3.Error:
+                        break
+                    self.queries += 1
+                    for mcc, mnc, lac, cid, lat, lon, rng in cur:
+                        key = (mcc, mnc, lac, cid)
+                        # Several radios may share an id: keep the tightest estimate
+                        if key not in rows or (rng or 1e9) < (rows[key][2] or 1e9):
+                            rows[key] = (lat, lon, rng)
+            for key in todo:
+                hit = rows.get(key)
+                self._remember(key, hit if hit is not None else _MISS)
+                if hit is not None:
+                    found[key] = hit
+        return found
+
+    def locate_cells(self, cells):
+        """Tower position for each cell of a neighbour list (None where unknown)"""
+        keys = [cell_key(c) for c in cells]
+        found = self.locate_many([k for k in keys if k])
+        return [found.get(k) if k else None for k in keys]
+
+    # ============== SPATIAL QUERIES ==============
+    def _points(self, conn, lat_min, lon_min, lat_max, lon_max):
+        """(rowid, lat, lon) inside a box, straight from the R*Tree when present"""
+        if self.spatial:
+            # Point boxes are stored as 32-bit floats rounded outwards: the
+            # midpoint is within a metre of the tower, good enough to rank
+            sql = ("SELECT id, (min_lat + max_lat) / 2, (min_lon + max_lon) / 2 FROM towers_rtree "
+                   "WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?")
+        else:
+            sql = ("SELECT rowid, lat, lon FROM towers "
+                   "WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?")
+        self.queries += 1
+        return conn.execute(sql, (lat_min, lat_max, lon_min, lon_max)).fetchall()
+
+    def _rows(self, conn, rowids):
+        """Tower dicts for rowids, in the given order"""
+        rows = {}
+        for i in range(0, len(rowids), CHUNK * 4):
+            chunk = rowids[i:i + CHUNK * 4]
+            sql = ("SELECT rowid, radio, mcc, mnc, lac, cid, lat, lon, range FROM towers "
+                   f"WHERE rowid IN ({','.join('?' * len(chunk))})")
+            for rowid, radio, mcc, mnc, lac, cid, lat, lon, rng in conn.execute(sql, chunk):
+                rows[rowid] = {'radio': radio, 'mcc': mcc, 'mnc': mnc, 'lac': lac, 'cid': cid,
+                               'lat': lat, 'lon': lon, 'range': rng}
+        return [rows[r] for r in rowids if r in rows]
+
+    def _query(self, box, keep):
+        """Run keep(points) -> rowids on the points in box and fetch those towers"""
+        with self.lock:
+            conn = self._connection()
+            if conn is None:
+                return []
+            try:
+                return self._rows(conn, keep(self._points(conn, *box)))
+            except sqlite3.Error:
+                return []
+
+    def within(self, lat_min, lon_min, lat_max, lon_max):
+        """Tower dicts inside a bounding box (unordered)"""
+        box = (lat_min, lon_min, lat_max, lon_max)
+        found = self._query(box, lambda points: [p[0] for p in points])
+        # The R*Tree bounds are rounded outwards: re-check the exact coordinates
+        return [t for t in found
+                if lat_min <= t['lat'] <= lat_max and lon_min <= t['lon'] <= lon_max]
+
+    def nearby(self, lat, lon, radius_m, limit=None):
+        """Towers within radius_m, nearest first, with 'distance' (m) and 'bearing' (deg)"""
+        def keep(points):
+            # 1 m of slack for the approximate R*Tree positions; exact check below
+            ranked = sorted((d, rowid) for d, rowid in
+                            ((distance(lat, lon, la, lo), rowid) for rowid, la, lo in points)
+                            if d <= radius_m + 1)
+            return [rowid for d, rowid in ranked[:limit + 1 if limit else None]]
+
+        found = []
+        for t in self._query(bbox(lat, lon, radius_m + 1), keep):
+            d = distance(lat, lon, t['lat'], t['lon'])
+            if d <= radius_m:
+                t['distance'] = d
+                t['bearing'] = bearing(lat, lon, t['lat'], t['lon'])
+                found.append(t)
+        found.sort(key=lambda t: t['distance'])
+        return found[:limit] if limit else found
+
+    def nearest(self, lat, lon, k=5, max_m=NEAREST_MAX):
+        """k nearest towers (fewer if none within max_m); widens a radius search"""
+        radius = NEAREST_START
+        while True:
+            found = self.nearby(lat, lon, radius, k)
+            # Anything outside the circle is farther than everything inside it
+            if len(found) >= k or radius >= max_m:
+                return found
+            radius = min(radius * 4, max_m)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'queries': self.queries,
+                'cached': len(self.cache), 'db': self.conn is not None,
+                'spatial': self.spatial}
+
+
+# ============== DEFAULT INSTANCE ==============
+TOWERS = TowerDB()
+
+
+def locate(mcc, mnc, lac, cid):
+    return TOWERS.locate(mcc, mnc, lac, cid)
+
+
+def locate_cells(cells):
+    return TOWERS.locate_cells(cells)
+
+
+def nearest(lat, lon, k=5):
+    return TOWERS.nearest(lat, lon, k)
+
+
+def nearby(lat, lon, radius_m, limit=None):
+    return TOWERS.nearby(lat, lon, radius_m, limit)
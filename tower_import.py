@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+🗼 TOWER IMPORT - Build cell_towers.db from OpenCellID / Mozilla Location Service dumps
+Streams (gzip) CSV, filters by MCC or bounding box, bulk-loads without indexes,
+then builds the lookup index and the R*Tree used for nearest-site queries
+(positions learned by tower_learn are kept where they are tighter)
+
+  python tower_import.py --mcc 404,405 cell_towers.csv.gz       # full India build
+  python tower_import.py --bbox 18.8,72.7,19.3,73.1 404.csv.gz  # Mumbai only
+  python tower_import.py --delta OCID-diff-cell-export-2026-10-16.csv.gz
+  (-o PATH writes somewhere other than cell_towers.db)
+"""
+
+import csv
+import gzip
+import os
+import sqlite3
+import sys
+import time
+
+import tower_db
+import tower_learn
+
+BATCH = 50000        # rows per executemany
+COMMIT_EVERY = 500000
+RADIOS = {'GSM', 'UMTS', 'LTE', 'NR', 'CDMA'}
+# Column order of the OpenCellID / MLS exports (used when a file has no header)
+COLUMNS = ('radio', 'mcc', 'net', 'area', 'cell', 'unit', 'lon', 'lat', 'range',
+           'samples', 'changeable', 'created', 'updated', 'averageSignal')
+
+META = """
+CREATE TABLE IF NOT EXISTS imports (
+    file TEXT PRIMARY KEY,
+    delta INTEGER,
+    rows INTEGER,
+    kept INTEGER,
+    seconds REAL,
+    ts REAL
+);
+"""
+
+
+# ============== READING ==============
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', newline='', encoding='utf-8', errors='replace')
+    return open(path, newline='', encoding='utf-8', errors='replace')
+
+
+def read_towers(path, mccs=None, bbox=None, stats=None):
+    """Yield towers rows (radio, mcc, mnc, lac, cid, lat, lon, range, samples, updated).
+
+    mccs: set of MCC strings to keep; bbox: (lat_min, lon_min, lat_max, lon_max).
+    stats['rows'] counts every CSV row read.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault('rows', 0)
+    with _open(path) as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return
+        if first[0].strip().upper() in RADIOS:
+            cols = {name: i for i, name in enumerate(COLUMNS)}
+            pending = [first]
+        else:
+            cols = {name.strip(): i for i, name in enumerate(first)}
+            pending = []
+        try:
+            i_radio, i_mcc, i_net, i_area, i_cell, i_lon, i_lat = (
+                cols[c] for c in ('radio', 'mcc', 'net', 'area', 'cell', 'lon', 'lat'))
+        except KeyError as e:
+            raise ValueError(f"{path}: missing column {e}")
+        i_range = cols.get('range')
+        i_samples = cols.get('samples')
+        i_updated = cols.get('updated')
+        width = max(cols.values()) + 1
+        for rows in (pending, reader):
+            for row in rows:
+                stats['rows'] += 1
+                if len(row) < width or (mccs and row[i_mcc] not in mccs):
+                    continue
+                try:
+                    lat = float(row[i_lat])
+                    lon = float(row[i_lon])
+                    if bbox and not (bbox[0] <= lat <= bbox[2] and bbox[1] <= lon <= bbox[3]):
+                        continue
+                    yield (row[i_radio], int(row[i_mcc]), int(row[i_net]), int(row[i_area]),
+                           int(row[i_cell]), lat, lon,
+                           int(row[i_range] or 0) if i_range is not None else None,
+                           int(row[i_samples] or 0) if i_samples is not None else None,
+                           int(row[i_updated] or 0) if i_updated is not None else None)
+                except ValueError:
+                    continue
+
+
+# ============== LOADING ==============
+INSERT = "INSERT INTO towers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+DELETE = "DELETE FROM towers WHERE mcc = ? AND mnc = ? AND lac = ? AND cid = ? AND radio IS ?"
+
+
+class Progress:
+    """Rows/s line, rewritten at most once a second"""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = time.monotonic()
+        self.shown = 0.0
+
+    def show(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.shown < 1.0:
+            return
+        self.shown = now
+        elapsed = max(now - self.start, 1e-6)
+        rows, kept = self.stats['rows'], self.stats['kept']
+        print(f"\r  {rows:>11,} read  {kept:>10,} kept  {rows / elapsed:>9,.0f} rows/s  "
+              f"{elapsed:6.0f}s", end='', flush=True)
+
+
+def load(paths, db=None, mccs=None, bbox=None, delta=False):
+    """Import dumps into the towers table; returns the stats dict.
+
+    Full import rebuilds the table with the index dropped during the load;
+    delta import (OpenCellID daily diffs) replaces matching cells in place and
+    skips files already imported.
+    """
+    db = db or tower_db.TOWER_DB
+    conn = sqlite3.connect(db, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.executescript(META)
+    stats = {'rows': 0, 'kept': 0, 'files': 0, 'skipped': 0}
+    progress = Progress(stats)
+
+    if delta:
+        conn.executescript(tower_db.SCHEMA)
+        conn.execute(tower_db.INDEX)   # needed by the per-cell replace
+        tower_db.ensure_spatial(conn)  # triggers keep the R*Tree in step
+    else:
+        conn.execute("DROP TABLE IF EXISTS towers")   # drops the sync triggers too
+        conn.execute("DROP TABLE IF EXISTS towers_rtree")
+        conn.executescript(tower_db.SCHEMA)
+
+    try:
+        for path in paths:
+            name = os.path.basename(path)
+            if delta and conn.execute("SELECT 1 FROM imports WHERE file = ?", (name,)).fetchone():
+                stats['skipped'] += 1
+                continue
+            started = time.monotonic()
+            rows_before, kept_before = stats['rows'], stats['kept']
+            conn.execute("BEGIN")
+            since_commit = 0
+            batch = []
+            for tower in read_towers(path, mccs, bbox, stats):
+                batch.append(tower)
+                if len(batch) >= BATCH:
+                    since_commit += _flush(conn, batch, delta, stats)
+                    batch = []
+                    progress.show()
+                    if since_commit >= COMMIT_EVERY:
+                        conn.execute("COMMIT")
+                        conn.execute("BEGIN")
+                        since_commit = 0
+            _flush(conn, batch, delta, stats)
+            conn.execute(
+                "INSERT OR REPLACE INTO imports VALUES (?, ?, ?, ?, ?, ?)",
+                (name, int(delta), stats['rows'] - rows_before, stats['kept'] - kept_before,
+                 time.monotonic() - started, time.time()))
+            conn.execute("COMMIT")
+            stats['files'] += 1
+            progress.show()
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("COMMIT")   # keep what was loaded; the index is still rebuilt
+        raise
+    finally:
+        progress.show(force=True)
+        print()
+        if not delta:
+            print("  Building indexes...", flush=True)
+            conn.execute(tower_db.INDEX)
+            tower_db.ensure_spatial(conn)
+        # Positions learned from TA go back in wherever they beat the import
+        conn.execute("BEGIN")
+        stats['learned'] = tower_learn.reapply(conn)
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE towers")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+    stats['seconds'] = time.monotonic() - progress.start
+    return stats
+
+
+def _flush(conn, batch, delta, stats):
+    if not batch:
+        return 0
+    if delta:
+        conn.executemany(DELETE, [(t[1], t[2], t[3], t[4], t[0]) for t in batch])
+    conn.executemany(INSERT, batch)
+    stats['kept'] += len(batch)
+    return len(batch)
+
+
+# ============== CLI ==============
+def main():
+    args = sys.argv[1:]
+    opts = {}
+    for flag in ('--mcc', '--bbox', '-o'):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i:i + 2]
+    delta = '--delta' in args
+    if delta:
+        args.remove('--delta')
+    if not args:
+        print(__doc__)
+        return
+    mccs = set(m.strip() for m in opts['--mcc'].split(',')) if '--mcc' in opts else None
+    bbox = None
+    if '--bbox' in opts:
+        bbox = tuple(float(v) for v in opts['--bbox'].split(','))
+        if len(bbox) != 4:
+            print("  --bbox needs lat_min,lon_min,lat_max,lon_max")
+            return
+    db = opts.get('-o') or tower_db.TOWER_DB
+    stats = load(args, db, mccs, bbox, delta)
+    print(f"  {stats['kept']:,} towers from {stats['files']} file(s) -> {db} "
+          f"in {stats['seconds']:.0f}s"
+          + (f" ({stats['skipped']} already imported)" if stats['skipped'] else "")
+          + (f", {stats['learned']} learned positions kept" if stats['learned'] else ""))
+
+
+if __name__ == "__main__":
+    main()
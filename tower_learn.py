@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+📐 TOWER LEARN - Tower positions from timing advance + GPS (multilateration)
+Each (fix, TA) pair updates fixed-size least-squares sums per eNB / sector;
+estimates come with a 95% error ellipse and are written back to cell_towers.db
+
+  python tower_learn.py [cell_towers.db]     # list learned sites
+"""
+
+import json
+import math
+import sqlite3
+import sys
+import time
+
+import tower_db
+
+# Metres per TA step (one way) and the largest valid TA; Android reports
+# INT_MAX when the serving cell has no TA
+TA_STEP = {'LTE': 78.12, 'GSM': 553.5}
+TA_MAX = {'LTE': 1282, 'GSM': 63}
+MULTIPATH_M = 60        # range error on top of TA rounding and GPS accuracy
+MIN_FIXES = 6           # samples before a site gets an estimate
+MIN_SPREAD = 40         # metres the fixes must spread across (both axes)
+MIN_MOVE = 15           # same TA within this distance of the last fix: skip
+BIAS_M = 25             # non-line-of-sight bias more samples cannot average out
+MAX_RANGE = 3000        # ellipse semi-major beyond which nothing is written
+ELLIPSE_K = 2.4477      # sqrt(chi2(2 dof, 95%))
+GN_STEPS = 8            # Gauss-Newton iterations on the sums
+SAVE_EVERY = 60.0       # seconds between writes to the tower store
+
+LEARNED = """
+CREATE TABLE IF NOT EXISTS learned (
+    radio TEXT,
+    mcc INTEGER NOT NULL,
+    mnc INTEGER NOT NULL,
+    lac INTEGER NOT NULL,
+    cid INTEGER NOT NULL,
+    lat0 REAL NOT NULL,
+    lon0 REAL NOT NULL,
+    sums TEXT NOT NULL,
+    placed INTEGER DEFAULT 0,
+    updated REAL,
+    PRIMARY KEY (mcc, mnc, lac, cid)
+);
+"""
+
+
+# ============== LEAST SQUARES ==============
+def _inverse3(m):
+    """Inverse of a symmetric 3x3 [a, b, c, d, e, f] (rows abc / bde / cef), or None"""
+    a, b, c, d, e, f = m
+    A = d * f - e * e
+    B = c * e - b * f
+    Cc = b * e - c * d
+    det = a * A + b * B + c * Cc
+    if abs(det) <= 1e-12 * abs(a * d * f) or det == 0:
+        return None
+    return ((A / det, B / det, Cc / det),
+            (B / det, (a * f - c * c) / det, (b * c - a * e) / det),
+            (Cc / det, (b * c - a * e) / det, (a * d - b * b) / det))
+
+
+class Fit:
+    """Running sums for one range-circle least-squares problem in a local frame.
+
+    Each sample (x, y, r) gives the row  -2x*X - 2y*Y + S = r^2 - x^2 - y^2
+    with S = X^2 + Y^2; the normal equations of those rows are all a solve
+    needs, so add() and solve() cost the same after ten samples or ten thousand.
+    """
+    SIZE = 16
+
+    def __init__(self, sums=None):
+        # 0-5 normal matrix (xx xy xs yy ys ss), 6-8 rhs, 9 b'Wb,
+        # 10 samples, 11-15 unweighted x, y, xx, xy, yy of the fixes
+        self.s = list(sums) if sums else [0.0] * self.SIZE
+
+    def add(self, x, y, r, var):
+        s = self.s
+        ax, ay = -2 * x, -2 * y
+        b = r * r - x * x - y * y
+        w = 1 / (4 * r * r * var + 2 * var * var)   # variance of the squared range
+        s[0] += w * ax * ax; s[1] += w * ax * ay; s[2] += w * ax
+        s[3] += w * ay * ay; s[4] += w * ay; s[5] += w
+        s[6] += w * ax * b; s[7] += w * ay * b; s[8] += w * b
+        s[9] += w * b * b
+        s[10] += 1
+        s[11] += x; s[12] += y; s[13] += x * x; s[14] += x * y; s[15] += y * y
+
+    def merge(self, other):
+        self.s = [a + b for a, b in zip(self.s, other.s)]
+
+    @property
+    def samples(self):
+        return int(self.s[10])
+
+    def spread(self):
+        """Smallest standard deviation of the fixes over any direction (metres)"""
+        s = self.s
+        n = s[10]
+        if n < 2:
+            return 0.0
+        mx, my = s[11] / n, s[12] / n
+        vx = s[13] / n - mx * mx
+        vy = s[15] / n - my * my
+        cxy = s[14] / n - mx * my
+        small = (vx + vy) / 2 - math.sqrt(((vx - vy) / 2) ** 2 + cxy * cxy)
+        return math.sqrt(max(small, 0.0))
+
+    def _cost(self, x, y):
+        """Weighted residual sum at tower position (x, y), straight from the sums"""
+        s = self.s
+        t = (x, y, x * x + y * y)
+        n = ((s[0], s[1], s[2]), (s[1], s[3], s[4]), (s[2], s[4], s[5]))
+        quad = sum(t[i] * n[i][j] * t[j] for i in range(3) for j in range(3))
+        return quad - 2 * (t[0] * s[6] + t[1] * s[7] + t[2] * s[8]) + s[9]
+
+    def solve(self):
+        """(x, y, covariance [cxx, cxy, cyy]) or None while under-determined"""
+        s = self.s
+        if s[10] < MIN_FIXES or self.spread() < MIN_SPREAD:
+            return None
+        inv = _inverse3(s[:6])
+        if inv is None:
+            return None
+        # Linear solution (S free), then Gauss-Newton with S = X^2 + Y^2 enforced
+        x, y = (sum(inv[i][j] * s[6 + j] for j in range(3)) for i in range(2))
+        n = ((s[0], s[1], s[2]), (s[1], s[3], s[4]), (s[2], s[4], s[5]))
+        for _ in range(GN_STEPS):
+            t = (x, y, x * x + y * y)
+            g = [sum(n[i][j] * t[j] for j in range(3)) - s[6 + i] for i in range(3)]
+            # J = [[1, 0], [0, 1], [2x, 2y]]; H = J'NJ, step = -H^-1 J'g
+            hxx = n[0][0] + 4 * x * n[0][2] + 4 * x * x * n[2][2]
+            hxy = n[0][1] + 2 * y * n[0][2] + 2 * x * n[1][2] + 4 * x * y * n[2][2]
+            hyy = n[1][1] + 4 * y * n[1][2] + 4 * y * y * n[2][2]
+            gx = g[0] + 2 * x * g[2]
+            gy = g[1] + 2 * y * g[2]
+            det = hxx * hyy - hxy * hxy
+            if det <= 0:
+                return None
+            dx = -(hyy * gx - hxy * gy) / det
+            dy = -(hxx * gy - hxy * gx) / det
+            x, y = x + dx, y + dy
+            if dx * dx + dy * dy < 0.01:
+                break
+        hxx = n[0][0] + 4 * x * n[0][2] + 4 * x * x * n[2][2]
+        hxy = n[0][1] + 2 * y * n[0][2] + 2 * x * n[1][2] + 4 * x * y * n[2][2]
+        hyy = n[1][1] + 4 * y * n[1][2] + 4 * y * y * n[2][2]
+        det = hxx * hyy - hxy * hxy
+        if det <= 0:
+            return None
+        # Weights are absolute; inflate when the residuals say the noise is worse
+        scale = max(1.0, self._cost(x, y) / max(s[10] - 2, 1))
+        floor = BIAS_M * BIAS_M
+        return x, y, (scale * hyy / det + floor, -scale * hxy / det, scale * hxx / det + floor)
+
+
+def ellipse(cov):
+    """(semi-major m, semi-minor m, bearing of the major axis deg) at 95%"""
+    cxx, cxy, cyy = cov
+    mid = (cxx + cyy) / 2
+    half = math.sqrt(((cxx - cyy) / 2) ** 2 + cxy * cxy)
+    major = ELLIPSE_K * math.sqrt(max(mid + half, 0.0))
+    minor = ELLIPSE_K * math.sqrt(max(mid - half, 0.0))
+    # Angle from east (x) counter-clockwise -> compass bearing, folded to 0-180
+    angle = math.degrees(0.5 * math.atan2(2 * cxy, cxx - cyy))
+    return major, minor, (90 - angle) % 180
+
+
+# ============== SITES ==============
+def radio_of(cell):
+    """'LTE' / 'GSM' for cells that report a usable TA, else None"""
+    network = cell.get('network') or cell.get('type') or ''
+    if 'LTE' in network.upper():
+        return 'LTE'
+    if 'GSM' in network.upper():
+        return 'GSM'
+    return None
+
+
+def site_of(radio, key):
+    """Sectors of one eNB share a mast: LTE cells are pooled by eNB id"""
+    if radio == 'LTE':
+        return (radio, key[0], key[1], key[3] >> 8)
+    return (radio,) + key
+
+
+class Site:
+    """One mast: a local metric frame, pooled sums and each sector's own sums"""
+
+    def __init__(self, lat0, lon0):
+        self.lat0, self.lon0 = lat0, lon0
+        self.kx = math.radians(1) * tower_db.EARTH_R * math.cos(math.radians(lat0))
+        self.ky = math.radians(1) * tower_db.EARTH_R
+        self.total = Fit()
+        self.sectors = {}    # cell key -> Fit
+        self.radio = None
+        self.last = {}       # cell key -> (x, y, ta) of the last sample used
+        self.cached = None   # estimate, cleared by every update
+
+    def to_xy(self, lat, lon):
+        return (lon - self.lon0) * self.kx, (lat - self.lat0) * self.ky
+
+    def to_latlon(self, x, y):
+        return self.lat0 + y / self.ky, self.lon0 + x / self.kx
+
+    def estimate(self):
+        if self.cached is None:
+            solved = self.total.solve()
+            if solved is None:
+                self.cached = False
+            else:
+                x, y, cov = solved
+                lat, lon = self.to_latlon(x, y)
+                major, minor, axis = ellipse(cov)
+                self.cached = {'lat': lat, 'lon': lon, 'range': int(round(major)),
+                               'major': major, 'minor': minor, 'axis': axis,
+                               'samples': self.total.samples, 'sectors': len(self.sectors)}
+        return self.cached or None
+
+
+# ============== LEARNER ==============
+class Learner:
+    """Learns tower positions from the serving cells' TA while the user moves"""
+
+    def __init__(self, path=None):
+        self.path = path or tower_db.TOWER_DB
+        self.sites = {}      # site key -> Site
+        self.of_cell = {}    # cell key -> site key
+        self.dirty = set()   # site keys changed since the last save
+        self.loaded = False
+        self.saved = time.monotonic()
+        self.used = self.skipped = 0
+        self.error = None
+
+    def _site(self, radio, key, lat, lon):
+        skey = site_of(radio, key)
+        site = self.sites.get(skey)
+        if site is None:
+            site = self.sites[skey] = Site(lat, lon)
+            site.radio = radio
+        if key not in site.sectors:
+            site.sectors[key] = Fit()
+            self.of_cell[key] = skey
+        return skey, site
+
+    def observe(self, cells, gps):
+        """Feed one scan: cells parsed by cell_intelligence, gps = (lat, lon, accuracy)"""
+        if not gps or gps[0] is None:
+            return
+        self.load()
+        lat, lon, acc = gps[0], gps[1], gps[2] or 0
+        for cell in cells:
+            ta = cell.get('timing_advance')
+            radio = radio_of(cell)
+            key = tower_db.cell_key(cell)
+            if ta is None or radio is None or key is None or not 0 <= ta <= TA_MAX[radio]:
+                continue
+            skey, site = self._site(radio, key, lat, lon)
+            x, y = site.to_xy(lat, lon)
+            last = site.last.get(key)
+            if last and last[2] == ta and (x - last[0]) ** 2 + (y - last[1]) ** 2 < MIN_MOVE ** 2:
+                self.skipped += 1   # standing still: the same circle again adds no geometry
+                continue
+            site.last[key] = (x, y, ta)
+            step = TA_STEP[radio]
+            r = (ta + 0.5) * step   # TA truncates: the middle of the step
+            var = step * step / 12 + MULTIPATH_M ** 2 + acc * acc
+            site.sectors[key].add(x, y, r, var)
+            site.total.add(x, y, r, var)
+            site.cached = None
+            self.dirty.add(skey)
+            self.used += 1
+
+    def estimate(self, key):
+        """Estimate dict of the mast serving cell key (lat, lon, range, major,
+        minor, axis, samples, sectors), or None"""
+        self.load()
+        skey = self.of_cell.get(key)
+        return self.sites[skey].estimate() if skey else None
+
+    def locate(self, key):
+        """(lat, lon, range_m) like tower_db.locate, or None"""
+        est = self.estimate(key) if key else None
+        return (est['lat'], est['lon'], est['range']) if est else None
+
+    # ============== TOWER STORE ==============
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.executescript(tower_db.SCHEMA + LEARNED)
+        conn.execute(tower_db.INDEX)
+        tower_db.ensure_spatial(conn)
+        return conn
+
+    def load(self, conn=None):
+        """Resume the sums learned in earlier runs (once)"""
+        if self.loaded:
+            return
+        self.loaded = True
+        own = conn is None
+        try:
+            conn = conn or sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        except sqlite3.Error:
+            return   # no tower store yet: the first save creates it
+        try:
+            rows = conn.execute("SELECT radio, mcc, mnc, lac, cid, lat0, lon0, sums FROM learned")
+            for radio, mcc, mnc, lac, cid, lat0, lon0, sums in rows:
+                key = (mcc, mnc, lac, cid)
+                site = self.sites.get(site_of(radio, key))
+                if site and (site.lat0, site.lon0) != (lat0, lon0):
+                    continue   # learned in another frame by a concurrent run
+                skey, site = self._site(radio, key, lat0, lon0)
+                fit = Fit(json.loads(sums))
+                site.sectors[key] = fit
+                site.total.merge(fit)
+        except (sqlite3.Error, ValueError):
+            pass
+        finally:
+            if own:
+                conn.close()
+
+    def save(self, force=False):
+        """Write changed sites to cell_towers.db every SAVE_EVERY seconds
+        (force: now); returns the number of towers rows written"""
+        if not self.dirty or (not force and time.monotonic() - self.saved < SAVE_EVERY):
+            return 0
+        self.saved = time.monotonic()
+        try:
+            conn = self._connect()
+        except sqlite3.Error as e:
+            self.error = str(e)
+            return 0
+        try:
+            placed = place(conn, self, self.dirty)
+            conn.commit()
+            self.dirty.clear()
+            self.error = None
+            return placed
+        except sqlite3.Error as e:
+            self.error = str(e)
+            return 0
+        finally:
+            conn.close()
+
+    def summary(self):
+        """Short status line, e.g. 'learning 3 sites (1 located)'"""
+        if not self.sites:
+            return ''
+        located = sum(1 for site in self.sites.values() if site.estimate())
+        text = f"learning {len(self.sites)} sites ({located} located)"
+        if self.error:
+            text += f" ERR {self.error}"
+        return text
+
+
+PLACE = "INSERT INTO towers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+REMOVE = "DELETE FROM towers WHERE mcc = ? AND mnc = ? AND lac = ? AND cid = ?"
+
+
+def place(conn, learner, site_keys):
+    """Store the sums of site_keys and put their estimates into towers where
+    nothing better is known; returns the number of towers rows written"""
+    now = time.time()
+    written = 0
+    for skey in site_keys:
+        site = learner.sites[skey]
+        est = site.estimate()
+        for key, fit in site.sectors.items():
+            row = conn.execute("SELECT placed FROM learned WHERE mcc = ? AND mnc = ? "
+                               "AND lac = ? AND cid = ?", key).fetchone()
+            ours = bool(row and row[0])
+            put = False
+            if est and est['range'] <= MAX_RANGE:
+                known = conn.execute("SELECT MIN(COALESCE(range, 1000000000)) FROM towers WHERE "
+                                     "mcc = ? AND mnc = ? AND lac = ? AND cid = ?", key).fetchone()[0]
+                # Replace our own earlier estimate, never a tighter imported one
+                put = ours or known is None or known > est['range']
+            if put:
+                conn.execute(REMOVE, key)
+                conn.execute(PLACE, (site.radio,) + key + (est['lat'], est['lon'], est['range'],
+                                                            est['samples'], int(now)))
+                written += 1
+            conn.execute("INSERT OR REPLACE INTO learned VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (site.radio,) + key + (site.lat0, site.lon0, json.dumps(fit.s),
+                                                int(put or ours), now))
+    return written
+
+
+def reapply(conn):
+    """After an import replaced towers: put learned estimates back where they
+    beat the imported rows; returns the number of towers rows written"""
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'learned'").fetchone():
+            return 0
+        conn.execute("UPDATE learned SET placed = 0")
+    except sqlite3.Error:
+        return 0
+    learner = Learner()
+    learner.load(conn)
+    return place(conn, learner, list(learner.sites))
+
+
+# ============== DEFAULT INSTANCE ==============
+LEARNER = Learner()
+
+
+def observe(cells, gps):
+    LEARNER.observe(cells, gps)
+
+
+def estimate(key):
+    return LEARNER.estimate(key)
+
+
+def locate(key):
+    return LEARNER.locate(key)
+
+
+def better(a, b):
+    """The tighter of two (lat, lon, range_m) positions (either may be None)"""
+    if a is None or b is None:
+        return a or b
+    return a if (a[2] or 1e9) <= (b[2] or 1e9) else b
+
+
+# ============== CLI ==============
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else tower_db.TOWER_DB
+    learner = Learner(path)
+    learner.load()
+    if not learner.sites:
+        print(f"  Nothing learned in {path} yet (run cell_intelligence.py with GPS on the move)")
+        return
+    print(f"  {'site':<22} {'sect':>4} {'fixes':>6}  {'position':<21} {'95% ellipse':<18}")
+    for skey, site in sorted(learner.sites.items(), key=lambda kv: -kv[1].total.samples):
+        name = f"{skey[0]} {skey[1]}-{skey[2]} " + (f"eNB {skey[3]}" if skey[0] == 'LTE'
+                                                     else f"{skey[3]}-{skey[4]}")
+        est = site.estimate()
+        if est:
+            where = f"{est['lat']:.5f},{est['lon']:.5f}"
+            shape = f"{est['major']:.0f}x{est['minor']:.0f}m @{est['axis']:.0f}°"
+        else:
+            where, shape = "-", f"spread {site.total.spread():.0f}m"
+        print(f"  {name:<22} {len(site.sectors):>4} {site.total.samples:>6}  {where:<21} {shape:<18}")
+
+
+if __name__ == "__main__":
+    main()